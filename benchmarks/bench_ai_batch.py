@@ -0,0 +1,98 @@
+"""
+Batched vs single-lead Claude profiling and Gemini sentiment
+
+Runs the same leads through ClaudeClient.analyze_psychology and
+GeminiClient.analyze_reviews against the local stub server (with the real
+Config.RATE_LIMITS) at several batch sizes. It also runs once with
+malformed batch replies, which must fall back to single requests with
+identical results (tests/test_batching.py checks the same on every test run;
+this script is for timing).
+
+Usage:
+    python benchmarks/bench_ai_batch.py [--leads N] [--batch N] [--latency S]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import Config, ClaudeClient, GeminiClient, RateLimiter, StatsTracker  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def make_leads(count: int) -> list:
+    return [
+        {
+            'place_id': f'stub-place-{idx:03d}',
+            'name': f'Studio {idx}',
+            'category': 'hair salon',
+            'rating': 4.1,
+            'total_reviews': 40 + idx,
+            'website': f'https://studio{idx}.example.co.uk',
+            'reviews_data': [{'text': f'Lovely staff, long wait #{idx}'}, {'text': 'Hard to book'}],
+        }
+        for idx in range(count)
+    ]
+
+
+async def run(leads: list, batch_size: int, latency: float, malformed: bool = False) -> dict:
+    server = StubServer(latency=latency, malformed_batches=malformed)
+    url = await server.start()
+    Config.ANTHROPIC_API = Config.GEMINI_API = 'stub'
+    Config.ANTHROPIC_URL = Config.GEMINI_URL = url
+    Config.AI_BATCH_SIZE = batch_size
+
+    stats = StatsTracker()
+    limiter = RateLimiter(Config.RATE_LIMITS)
+    claude = ClaudeClient(stats, limiter)
+    gemini = GeminiClient(stats, limiter)
+
+    async def enrich(session, lead):
+        return await asyncio.gather(
+            claude.analyze_psychology(session, lead),
+            gemini.analyze_reviews(session, lead['reviews_data'], lead['place_id']),
+        )
+
+    start = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(*(enrich(session, lead) for lead in leads))
+    elapsed = time.perf_counter() - start
+    await server.stop()
+    return {'elapsed': elapsed, 'counts': dict(server.counts), 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--leads', type=int, default=24)
+    parser.add_argument('--batch', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+
+    leads = make_leads(args.leads)
+    baseline = None
+    for label, batch_size, malformed in (
+        ('single', 1, False),
+        (f'batch {args.batch}', args.batch, False),
+        (f'batch {args.batch} (malformed)', args.batch, True),
+    ):
+        outcome = asyncio.run(run(leads, batch_size, args.latency, malformed))
+        counts = outcome['counts']
+        print(
+            f"{label:22} | {outcome['elapsed']:6.2f}s | Claude requests: {counts.get('anthropic', 0):3} "
+            f"| Gemini requests: {counts.get('gemini', 0):3}"
+        )
+        if baseline is None:
+            baseline = outcome['results']
+        elif outcome['results'] != baseline:
+            print(f"⚠️  {label}: results differ from single-lead calls")
+            sys.exit(1)
+    print("Every mode returned identical per-lead results")
+
+
+if __name__ == '__main__':
+    main()
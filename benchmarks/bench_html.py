@@ -0,0 +1,157 @@
+"""
+HTML signal extraction microbenchmark
+
+Compares the old WebIntel.analyze parsing (BeautifulSoup + a dozen regex/lower()
+passes) against HtmlSignals.extract over a corpus of saved pages, and checks
+both return the same signals.
+
+Usage:
+    python benchmarks/bench_html.py [corpus_dir] [--repeat N]
+
+corpus_dir holds saved pages (*.html / *.htm, e.g. "Save page as" from a
+browser or `curl -o`). Without one, a synthetic corpus is generated.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import HtmlSignals  # noqa: E402
+
+
+def legacy_extract(html: str) -> dict:
+    """Parsing exactly as WebIntel.analyze did it before HtmlSignals"""
+    from bs4 import BeautifulSoup
+    BeautifulSoup(html, 'html.parser')
+
+    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', html)
+    clean_emails = [e for e in emails if not any(x in e.lower() for x in ['example', 'test', 'noreply', 'wordpress', 'wix'])]
+
+    socials = {}
+    ig = re.search(r'instagram\.com/([a-zA-Z0-9._]+)', html)
+    if ig:
+        socials['instagram'] = ig.group(1)
+    fb = re.search(r'facebook\.com/([a-zA-Z0-9.]+)', html)
+    if fb:
+        socials['facebook'] = fb.group(1)
+    li = re.search(r'linkedin\.com/company/([a-zA-Z0-9-]+)', html)
+    if li:
+        socials['linkedin'] = li.group(1)
+    tw = re.search(r'twitter\.com/([a-zA-Z0-9_]+)', html)
+    if tw:
+        socials['twitter'] = tw.group(1)
+
+    tech = []
+    if 'wp-content' in html or 'wp-includes' in html:
+        tech.append('WordPress')
+    if 'shopify' in html.lower():
+        tech.append('Shopify')
+    if 'wix.com' in html.lower():
+        tech.append('Wix')
+    if 'squarespace' in html.lower():
+        tech.append('Squarespace')
+    if 'google-analytics' in html or 'gtag' in html or 'analytics.js' in html:
+        tech.append('Google Analytics')
+    if 'fbevents.js' in html or 'facebook-pixel' in html:
+        tech.append('Facebook Pixel')
+    if 'hubspot' in html.lower():
+        tech.append('HubSpot')
+    if 'mailchimp' in html.lower():
+        tech.append('Mailchimp')
+
+    copyright_match = re.search(r'©\s*(\d{4})', html)
+
+    return {
+        'emails': clean_emails,
+        'socials': socials,
+        'tech': tech,
+        'copyright': copyright_match.group(1) if copyright_match else '',
+    }
+
+
+def synthetic_corpus(count: int = 20, seed: int = 7) -> dict:
+    """Business-site-like pages between ~20KB and ~400KB"""
+    rng = random.Random(seed)
+    words = ['book', 'table', 'menu', 'about', 'contact', 'luxury', 'property', 'salon', 'studio',
+             'london', 'team', 'gallery', 'reviews', 'opening', 'hours', 'private', 'events']
+    snippets = [
+        '<script src="/wp-content/themes/site/app.js"></script>',
+        '<script async src="https://www.googletagmanager.com/gtag/js?id=G-XXXX"></script>',
+        '<script src="https://connect.facebook.net/en_US/fbevents.js"></script>',
+        '<link href="https://static.parastorage.com/wix.com/style.css">',
+        '<a href="https://www.instagram.com/the_studio.ldn/">Instagram</a>',
+        '<a href="https://facebook.com/TheStudioLondon">Facebook</a>',
+        '<a href="https://www.linkedin.com/company/the-studio-ltd">LinkedIn</a>',
+        '<a href="mailto:bookings@thestudio.co.uk">bookings@thestudio.co.uk</a>',
+        '<img src="logo@2x.png">',
+        '<p>Contact noreply@mailchimp.com to unsubscribe</p>',
+    ]
+    pages = {}
+    for idx in range(count):
+        size = rng.randint(20_000, 400_000)
+        parts = ['<!DOCTYPE html><html><head><title>Business</title></head><body>']
+        length = 0
+        while length < size:
+            roll = rng.random()
+            if roll < 0.03:
+                part = rng.choice(snippets)
+            elif roll < 0.35:
+                part = f'<div class="{rng.choice(words)}-{rng.randint(1, 99)} col-md-{rng.randint(1, 12)}" style="padding:0">'
+            else:
+                part = ' '.join(rng.choice(words) for _ in range(rng.randint(5, 20))) + '. </div>'
+            parts.append(part)
+            length += len(part)
+        parts.append(f'<footer>© {rng.randint(2012, 2025)} The Studio Ltd</footer></body></html>')
+        pages[f'synthetic_{idx:02d}.html'] = ''.join(parts)
+    return pages
+
+
+def load_corpus(path: str) -> dict:
+    pages = {}
+    for file in sorted(Path(path).glob('*.htm*')):
+        pages[file.name] = file.read_text(encoding='utf-8', errors='replace')
+    return pages
+
+
+def time_per_page(fn, pages: dict, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages.values():
+            fn(html)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', nargs='?', help='Directory of saved *.html pages')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus and os.path.isdir(args.corpus) else {}
+    source = args.corpus if pages else 'synthetic'
+    if not pages:
+        pages = synthetic_corpus()
+
+    mismatches = [name for name, html in pages.items() if legacy_extract(html) != HtmlSignals.extract(html)]
+    total_mb = sum(len(html) for html in pages.values()) / 1e6
+
+    legacy = time_per_page(legacy_extract, pages, args.repeat)
+    current = time_per_page(HtmlSignals.extract, pages, args.repeat)
+
+    print(f"Corpus: {source} | {len(pages)} pages | {total_mb:.1f} MB")
+    print(f"legacy (bs4 + regex): {legacy * 1000:8.2f} ms/page | {total_mb / len(pages) / legacy:7.1f} MB/s")
+    print(f"HtmlSignals.extract:  {current * 1000:8.2f} ms/page | {total_mb / len(pages) / current:7.1f} MB/s")
+    print(f"Speedup: {legacy / current:.1f}x")
+    if mismatches:
+        print(f"⚠️  Output differs on {len(mismatches)} pages: {', '.join(mismatches[:5])}")
+        sys.exit(1)
+    print("Outputs identical on every page")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Event-loop lag under HTML parsing load
+
+Simulates concurrent website scrapes (network wait + HtmlSignals.extract_body)
+and reports how late the event loop wakes a 10ms ticker, with parsing inline
+on the loop vs in a CpuPool of worker processes.
+
+Usage:
+    python benchmarks/bench_loop_lag.py [--workers N] [--scrapes N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import CpuPool, HtmlSignals, StatsTracker, LoopLagMonitor  # noqa: E402
+from bench_html import synthetic_corpus  # noqa: E402
+
+
+async def run(workers: int, bodies: list, scrapes: int, concurrency: int) -> dict:
+    stats = StatsTracker()
+    cpu = CpuPool(workers)
+    monitor = LoopLagMonitor(stats, 0.01)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def scrape(idx: int):
+        async with gate:
+            await asyncio.sleep(0.02)  # Network round trip
+            await cpu.run(HtmlSignals.extract_body, bodies[idx % len(bodies)], 'utf-8')
+
+    if workers:
+        # Warm the worker processes so startup isn't counted
+        await asyncio.gather(*(cpu.run(HtmlSignals.extract_body, b'', 'utf-8') for _ in range(workers)))
+
+    monitor.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(scrape(idx) for idx in range(scrapes)))
+    elapsed = time.perf_counter() - start
+    monitor.stop()
+    cpu.shutdown()
+
+    lag = stats.loop_lag
+    return {
+        'elapsed': elapsed,
+        'p50': lag.quantile(50) * 1000,
+        'p99': lag.quantile(99) * 1000,
+        'max': lag.max * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=max(2, (os.cpu_count() or 2) - 1))
+    parser.add_argument('--scrapes', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    bodies = [html.encode('utf-8') for html in synthetic_corpus().values()]
+
+    for label, workers in (('inline', 0), (f'pool x{args.workers}', args.workers)):
+        result = asyncio.run(run(workers, bodies, args.scrapes, args.concurrency))
+        print(
+            f"{label:10} | {args.scrapes} scrapes in {result['elapsed']:5.2f}s | loop lag "
+            f"p50 {result['p50']:6.1f}ms | p99 {result['p99']:6.1f}ms | max {result['max']:6.1f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+End-to-end mining throughput against a local stub of every upstream API
+
+Starts benchmarks/stub_server.py in its own process, points every Config.*_URL
+at it (lead websites are *.test hosts resolved to the stub) and runs
+LegendaryMiner.mine with a fresh, throwaway cache. Reports leads/minute,
+per-lead latency (place claimed -> lead accepted), peak RSS of the miner
+process and API requests per accepted lead, so regressions show up as
+numbers. No API keys or paid quota are involved.
+
+Usage:
+    python benchmarks/bench_offline.py [--leads N] [--lead-type voxmill|freelance] [--scale S]
+        [--sigma S] [--error-rate R] [--throttle-rate R] [--dead-sites R] [--route NAME:KEY=VALUE,...]
+        [--two-pass] [--json PATH]
+
+--scale 0.1 runs with a tenth of the realistic default latencies; --route
+overrides one API, e.g. --route openai:qps=2,retry_after=3 for a tight quota.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import Config, LegendaryMiner, percentile  # noqa: E402
+from stub_server import add_profile_args  # noqa: E402
+
+STUB = Path(__file__).resolve().parent / 'stub_server.py'
+QUERIES = {'voxmill': ['hair salon', 'boutique hotel', 'private dentist'], 'freelance': ['local cafe', 'yoga studio', 'spa wellness']}
+CITIES = ['London', 'Manchester', 'Bristol', 'Leeds']
+
+
+class StubResolver(AbstractResolver):
+    """Lead websites (*.test) resolve to the stub; everything else is looked up as usual"""
+    def __init__(self):
+        self.default = aiohttp.DefaultResolver()
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET):
+        if host.endswith('.test'):
+            return [{'hostname': host, 'host': '127.0.0.1', 'port': port, 'family': socket.AF_INET,
+                     'proto': 0, 'flags': socket.AI_NUMERICHOST}]
+        return await self.default.resolve(host, port, family)
+
+    async def close(self):
+        await self.default.close()
+
+
+class BenchMiner(LegendaryMiner):
+    def new_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=Config.MAX_CONCURRENT, resolver=StubResolver())
+        timeout = aiohttp.ClientTimeout(total=None, connect=60, sock_read=60)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[self.limiter.trace_config()])
+
+
+def start_stub(argv: list) -> tuple:
+    """Stub server in a child process (its CPU and memory stay out of the measurement)"""
+    proc = subprocess.Popen([sys.executable, str(STUB), '--port', '0', *argv], stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if 'Stub APIs on' not in line:
+        proc.kill()
+        raise SystemExit(f"Stub server failed to start: {line!r}")
+    return proc, line.split()[3]
+
+
+def configure(url: str, workdir: str):
+    for key in ('GOOGLE_PLACES_API', 'YELP_API', 'HUNTER_API', 'OPENAI_API', 'ANTHROPIC_API', 'GEMINI_API', 'PERPLEXITY_API'):
+        setattr(Config, key, 'stub')
+    Config.APOLLO_API = ''
+    for key in ('PLACES_URL', 'YELP_URL', 'HUNTER_URL', 'INSTAGRAM_URL', 'OPENAI_URL', 'ANTHROPIC_URL', 'GEMINI_URL', 'PERPLEXITY_URL'):
+        setattr(Config, key, url)
+    Config.CACHE_PATH = str(Path(workdir) / 'cache.sqlite')
+    Config.TRACE_PATH = ''
+
+
+async def fetch_stub_stats(url: str) -> dict:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f'{url}/_stats') as r:
+            return await r.json()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3  # bytes on macOS, KB elsewhere
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--leads', type=int, default=40, help='Target accepted leads')
+    parser.add_argument('--lead-type', choices=sorted(QUERIES), default='voxmill')
+    parser.add_argument('--two-pass', action='store_true')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results here')
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    stub_argv = ['--scale', str(args.scale), '--sigma', str(args.sigma), '--error-rate', str(args.error_rate),
+                 '--throttle-rate', str(args.throttle_rate), '--dead-sites', str(args.dead_sites)]
+    for route in args.route or []:
+        stub_argv += ['--route', route]
+
+    proc, url = start_stub(stub_argv)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            configure(url, workdir)
+            Config.TWO_PASS = args.two_pass
+            miner = BenchMiner()
+            phase = f'{args.lead_type}_UK'
+
+            start = time.perf_counter()
+            leads = asyncio.run(miner.mine(QUERIES[args.lead_type], CITIES, 'UK', args.lead_type, args.leads))
+            elapsed = time.perf_counter() - start
+            miner.cache.close()
+            miner.cpu.shutdown()
+            served = asyncio.run(fetch_stub_stats(url))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    stats = miner.stats
+    latency = stats.phases.get(phase, {}).get('latency', [])
+    requests = {provider: data['latency'].count for provider, data in sorted(stats.requests.items())}
+    total_requests = sum(requests.values())
+    results = {
+        'leads': len(leads),
+        'elapsed_seconds': elapsed,
+        'leads_per_minute': len(leads) / elapsed * 60 if elapsed else 0.0,
+        'lead_latency_p50': percentile(latency, 50),
+        'lead_latency_p95': percentile(latency, 95),
+        'peak_rss_mb': peak_rss_mb(),
+        'requests': requests,
+        'requests_per_lead': total_requests / len(leads) if leads else None,
+        'retries': {api: dict(counts) for api, counts in stats.retries.items()},
+        'concurrency': {provider: {'limit': gauge['limit'], 'low': gauge['low'], 'cuts': gauge['cuts']}
+                        for provider, gauge in sorted(stats.concurrency.items())},
+        'stub_statuses': served['statuses'],
+    }
+
+    print(f"Leads: {results['leads']}/{args.leads} in {elapsed:.1f}s | {results['leads_per_minute']:.1f} leads/min")
+    print(f"Per-lead latency: p50 {results['lead_latency_p50']:.2f}s | p95 {results['lead_latency_p95']:.2f}s")
+    print(f"Peak RSS: {results['peak_rss_mb']:.0f} MB")
+    per_lead = results['requests_per_lead']
+    print(f"API requests: {total_requests} | per accepted lead: {per_lead:.2f}" if per_lead is not None else
+          f"API requests: {total_requests} | no leads accepted")
+    for provider, count in requests.items():
+        print(f"  {provider:15} {count:5}" + (f" | {count / len(leads):5.2f}/lead" if leads else ''))
+    print("In-flight limits: " + ' | '.join(
+        f"{provider} {gauge['limit']} (low {gauge['low']}, {gauge['cuts']} cuts)" for provider, gauge in results['concurrency'].items()
+    ))
+    rejected = {route: {code: n for code, n in codes.items() if code != '200'} for route, codes in served['statuses'].items()}
+    rejected = {route: codes for route, codes in rejected.items() if codes}
+    if rejected:
+        print(f"Stub rejections: {rejected}")
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
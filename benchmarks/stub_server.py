@@ -0,0 +1,425 @@
+"""
+Local stand-in for every external API the miner calls
+
+Serves Google Places textsearch/details, Hunter domain-search, RapidAPI
+Instagram, Yelp search, OpenAI and Perplexity chat completions, Anthropic
+messages and Gemini generateContent with deterministic canned data, plus the
+businesses' websites (any request whose Host ends in .test). Places, emails,
+profiles and pages are derived from a hash of the request, so reruns see the
+same world. Place websites are http://<place>.test:<port>/, which only
+resolve where the client maps *.test to the stub (bench_offline.py does).
+
+Every route has a profile: median latency (lognormal spread `sigma`), a rate
+of 503s (`error`), a rate of random 429s (`throttle`) and a per-second cap
+(`qps`) beyond which requests get 429 + Retry-After. Places answers quota
+rejections like the real API, as HTTP 200 with status OVER_QUERY_LIMIT. On
+the site route, `dead` is the share of hosts that drop every connection
+(the client sees a disconnect, as with a dead or misconfigured site).
+
+Batched AI prompts (blocks tagged "[place_id: ...]") get a JSON array with one
+object per place_id; malformed_batches=True answers them with prose instead,
+to exercise the single-request fallback.
+
+Usage:
+    python benchmarks/stub_server.py [--port 8089] [--scale 1.0] [--route openai:latency=2,qps=5]
+    PLACES_URL=http://127.0.0.1:8089 OPENAI_URL=http://127.0.0.1:8089 ... python main.py
+
+GET /_stats returns request counts per route and status.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from collections import defaultdict, deque
+from typing import Dict, Optional
+
+from aiohttp import web
+
+PLACE_ID = re.compile(r'\[place_id: ([^\]]+)\]')
+
+# Median latency per route (seconds), roughly what the real APIs answer in
+DEFAULT_LATENCY = {
+    'places_search': 0.25,
+    'places_details': 0.15,
+    'hunter': 0.35,
+    'instagram': 0.6,
+    'yelp': 0.3,
+    'site': 0.4,
+    'openai': 4.0,
+    'anthropic': 3.0,
+    'gemini': 1.5,
+    'perplexity': 5.0,
+}
+PROFILE_KEYS = {'latency': float, 'sigma': float, 'error': float, 'throttle': float, 'qps': float, 'retry_after': float,
+                'dead': float}
+
+CLAUDE_PROFILE = {
+    'buying_intent': 'HIGH',
+    'pain_points': 'Low review volume, no booking funnel, slow site',
+    'personality': 'Data-driven',
+    'timeline': 'Considering',
+    'approach': 'Educational',
+    'objections': 'Cost',
+}
+GEMINI_SENTIMENT = {
+    'positive_pct': 64,
+    'negative_pct': 24,
+    'neutral_pct': 12,
+    'complaints': ['Wait times', 'Booking', 'Parking'],
+    'praises': ['Staff', 'Quality', 'Atmosphere'],
+    'triggers': 'Being remembered by staff',
+}
+OUTREACH = {
+    **{f'pain_{idx}': f'Your booking page loses {idx * 12}% of visitors before they pick a time.' for idx in (1, 2, 3)},
+    **{f'opportunity_{idx}': f'Three local rivals doubled reviews in {idx * 2} months. You could too.' for idx in (1, 2, 3)},
+    **{f'competitor_{idx}': f'The place {idx} streets over gets twice your bookings. Want to see why?' for idx in (1, 2)},
+    **{f'shock_{idx}': f'Your website is older than some of your staff ({idx}).' for idx in (1, 2)},
+    'email_subject': 'Quick question about your bookings',
+    'linkedin_request': 'Love what you have built - would be great to connect.',
+    'sms_template': 'Hi! Are online bookings something you are looking at this year?',
+}
+MARKET_RESEARCH = {
+    'competitors': ['Studio North', 'The Parlour', 'Atelier 9'],
+    'trends': 'Online booking and Instagram-led discovery',
+    'pricing': 'Mid-market, 40-80 per visit',
+    'news': 'Two new openings on the high street this quarter',
+}
+BUSINESS_FOLLOWUP = {
+    'reputation': 'Loyal regulars, praised for staff',
+    'news': 'Refurbished last year',
+    'differentiator': 'Late opening hours',
+}
+REVIEWS = [
+    'Lovely staff and a great atmosphere, will be back',
+    'Long wait even with a booking, parking is a nightmare',
+    'Quality is excellent but it is hard to book online',
+    'Friendly team, a little pricey for what you get',
+    'Best in the area, they remember your name',
+]
+
+
+def seeded(*parts) -> random.Random:
+    """Deterministic RNG for a place, domain or handle"""
+    return random.Random(hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest())
+
+
+def slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')[:40]
+
+
+def site_page(host: str) -> str:
+    """A business website of 30-200KB with the signals WebIntel looks for"""
+    rng = seeded('site', host)
+    name = host.split('.')[0]
+    parts = [f'<!DOCTYPE html><html><head><title>{name}</title>']
+    if rng.random() < 0.5:
+        parts.append('<script async src="https://www.googletagmanager.com/gtag/js?id=G-XXXX"></script>')
+    if rng.random() < 0.3:
+        parts.append('<script src="/wp-content/themes/site/app.js"></script>')
+    parts.append('</head><body>')
+    filler = ' '.join(rng.choice(['book', 'menu', 'about', 'team', 'gallery', 'opening', 'hours', 'events'])
+                      for _ in range(40))
+    for _ in range(rng.randint(60, 400)):
+        parts.append(f'<div class="section col-md-{rng.randint(1, 12)}"><p>{filler}</p></div>')
+    if rng.random() < 0.6:
+        parts.append(f'<a href="mailto:hello@{host}">hello@{host}</a>')
+    if rng.random() < 0.5:
+        parts.append(f'<a href="https://www.instagram.com/{name.replace("-", "_")}/">Instagram</a>')
+    if rng.random() < 0.4:
+        parts.append(f'<a href="https://facebook.com/{name.replace("-", "")}">Facebook</a>')
+    parts.append(f'<footer>© {rng.randint(2012, 2025)} {name}</footer></body></html>')
+    return ''.join(parts)
+
+
+class StubServer:
+    def __init__(self, latency: Optional[float] = None, malformed_batches: bool = False, scale: float = 1.0,
+                 profiles: Optional[Dict[str, Dict]] = None, seed: int = 7):
+        """latency sets one fixed latency for every route; otherwise DEFAULT_LATENCY x scale
+
+        profiles overrides per route, e.g. {'openai': {'qps': 5, 'error': 0.05}}.
+        """
+        self.malformed_batches = malformed_batches
+        self.profiles = {
+            route: {'latency': median * scale if latency is None else latency, 'sigma': 0.0, 'error': 0.0,
+                    'throttle': 0.0, 'qps': 0.0, 'retry_after': 1.0, 'dead': 0.0}
+            for route, median in DEFAULT_LATENCY.items()
+        }
+        for route, overrides in (profiles or {}).items():
+            self.profiles[route].update(overrides)
+        self.rng = random.Random(seed)
+        self.recent = defaultdict(deque)
+        self.counts = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.runner = None
+        self.port = None
+        self.app = web.Application(middlewares=[self.websites])
+        self.app.router.add_get('/maps/api/place/textsearch/json', self.places_search)
+        self.app.router.add_get('/maps/api/place/details/json', self.places_details)
+        self.app.router.add_get('/v2/domain-search', self.hunter)
+        self.app.router.add_get('/v1/info', self.instagram)
+        self.app.router.add_get('/v3/businesses/search', self.yelp)
+        self.app.router.add_post('/v1/chat/completions', self.openai)
+        self.app.router.add_post('/chat/completions', self.perplexity)
+        self.app.router.add_post('/v1/messages', self.anthropic)
+        self.app.router.add_post(r'/v1beta/models/{model}:generateContent', self.gemini)
+        self.app.router.add_get('/_stats', self.stats)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving; returns the base URL to point Config.*_URL at"""
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return f'http://{host}:{self.port}'
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+    def website(self, place_id: str) -> str:
+        """URL of a place's site; *.test hosts must resolve to this server"""
+        return f'http://{slug(place_id)}.test:{self.port}/'
+
+    # ---- Latency, errors, 429s ----
+
+    async def gate(self, route: str) -> Optional[web.Response]:
+        """Wait out the route's latency; a response if the request fails instead"""
+        profile = self.profiles[route]
+        self.counts[route] += 1
+        now = time.monotonic()
+        recent = self.recent[route]
+        recent.append(now)
+        while recent and recent[0] <= now - 1.0:
+            recent.popleft()
+        over_quota = profile['qps'] and len(recent) > profile['qps']
+
+        await asyncio.sleep(profile['latency'] * math.exp(self.rng.gauss(0, profile['sigma'])) if profile['sigma'] else profile['latency'])
+
+        if over_quota or self.rng.random() < profile['throttle']:
+            return self.reject(route, 429, headers={'Retry-After': f"{profile['retry_after']:g}"})
+        if self.rng.random() < profile['error']:
+            return self.reject(route, 503)
+        self.statuses[route][200] += 1
+        return None
+
+    def reject(self, route: str, status: int, headers: Optional[Dict] = None) -> web.Response:
+        if route.startswith('places') and status == 429:
+            # Places signals quota in the body of a 200
+            self.statuses[route]['OVER_QUERY_LIMIT'] += 1
+            return web.json_response({'status': 'OVER_QUERY_LIMIT', 'results': []})
+        self.statuses[route][status] += 1
+        return web.json_response({'error': {'code': status}}, status=status, headers=headers)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'counts': dict(self.counts),
+            'statuses': {route: {str(code): count for code, count in codes.items()} for route, codes in self.statuses.items()},
+        })
+
+    # ---- Places, enrichment, websites ----
+
+    def place(self, place_id: str) -> Dict:
+        rng = seeded('place', place_id)
+        return {
+            'place_id': place_id,
+            'name': f"{place_id.rsplit('-', 1)[0].replace('-', ' ').title()} {place_id.rsplit('-', 1)[-1]}",
+            'rating': round(rng.uniform(3.3, 4.9), 1),
+            'user_ratings_total': rng.randint(3, 450),
+        }
+
+    async def places_search(self, request: web.Request) -> web.Response:
+        failed = await self.gate('places_search')
+        if failed:
+            return failed
+        query = slug(request.query.get('query', ''))
+        return web.json_response({'status': 'OK', 'results': [self.place(f'{query}-{idx}') for idx in range(20)]})
+
+    async def places_details(self, request: web.Request) -> web.Response:
+        failed = await self.gate('places_details')
+        if failed:
+            return failed
+        place_id = request.query.get('place_id', '')
+        rng = seeded('details', place_id)
+        result = {
+            **self.place(place_id),
+            'formatted_address': f'{rng.randint(1, 200)} High Street',
+            'url': f'https://maps.google.com/?cid={rng.randint(10 ** 9, 10 ** 10)}',
+            'geometry': {'location': {'lat': round(rng.uniform(51.3, 51.7), 5), 'lng': round(rng.uniform(-0.5, 0.2), 5)}},
+            'reviews': [{'text': text, 'rating': rng.randint(2, 5)} for text in rng.sample(REVIEWS, 4)],
+        }
+        if rng.random() < 0.85:
+            result['formatted_phone_number'] = f'020 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}'
+        if rng.random() < 0.9:
+            result['website'] = self.website(place_id)
+        return web.json_response({'status': 'OK', 'result': result})
+
+    async def hunter(self, request: web.Request) -> web.Response:
+        failed = await self.gate('hunter')
+        if failed:
+            return failed
+        domain = request.query.get('domain', '')
+        rng = seeded('hunter', domain)
+        emails = [
+            {
+                'value': f'{name.lower()}@{domain}',
+                'confidence': rng.randint(60, 99),
+                'verification': {'status': rng.choice(['valid', 'accept_all', 'unknown'])},
+                'first_name': name,
+                'last_name': 'Smith',
+                'position': 'Owner',
+                'department': 'management',
+            }
+            for name in rng.sample(['Alex', 'Sam', 'Jo', 'Chris'], rng.randint(1, 3))
+        ] if rng.random() < 0.65 else []
+        return web.json_response({'data': {'domain': domain, 'emails': emails}})
+
+    async def instagram(self, request: web.Request) -> web.Response:
+        failed = await self.gate('instagram')
+        if failed:
+            return failed
+        handle = request.query.get('username_or_id_or_url', '')
+        rng = seeded('instagram', handle)
+        return web.json_response({'data': {
+            'username': handle,
+            'follower_count': rng.randint(50, 40000),
+            'media_count': rng.randint(5, 900),
+            'is_verified': rng.random() < 0.05,
+            'biography': f'{handle} - book online',
+        }})
+
+    async def yelp(self, request: web.Request) -> web.Response:
+        failed = await self.gate('yelp')
+        if failed:
+            return failed
+        rng = seeded('yelp', request.query.get('term', ''), request.query.get('location', ''))
+        businesses = [{
+            'rating': rng.choice([3.0, 3.5, 4.0, 4.5, 5.0]),
+            'review_count': rng.randint(1, 300),
+            'price': rng.choice(['£', '££', '£££']),
+        }] if rng.random() < 0.8 else []
+        return web.json_response({'businesses': businesses})
+
+    @web.middleware
+    async def websites(self, request: web.Request, handler):
+        """Requests for a business site (Host *.test) never reach the API routes"""
+        host = (request.host or '').split(':')[0]
+        if not host.endswith('.test'):
+            return await handler(request)
+        if seeded('dead', host).random() < self.profiles['site']['dead']:
+            self.counts['site'] += 1
+            self.statuses['site']['dropped'] += 1
+            request.transport.abort()
+            return web.Response(status=502)
+        failed = await self.gate('site')
+        if failed:
+            return failed
+        return web.Response(text=site_page(host), content_type='text/html')
+
+    # ---- AI ----
+
+    def _answer(self, route: str, prompt: str, canned: dict) -> str:
+        place_ids = PLACE_ID.findall(prompt)
+        if not place_ids:
+            return json.dumps(canned)
+        self.counts[f'{route}_batch'] += 1
+        if self.malformed_batches:
+            return 'Sure! Here is the analysis for each business you listed.'
+        return json.dumps([{'place_id': place_id, **canned} for place_id in place_ids])
+
+    @staticmethod
+    def _usage(prompt: str, text: str) -> Dict:
+        return {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(text) // 4}
+
+    async def openai(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        failed = await self.gate('openai')
+        if failed:
+            return failed
+        prompt = body['messages'][-1]['content']
+        text = json.dumps(OUTREACH)
+        return web.json_response({'choices': [{'message': {'content': text}}], 'usage': self._usage(prompt, text)})
+
+    async def perplexity(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        failed = await self.gate('perplexity')
+        if failed:
+            return failed
+        prompt = body['messages'][-1]['content']
+        text = json.dumps(BUSINESS_FOLLOWUP if 'reputation' in prompt else MARKET_RESEARCH)
+        return web.json_response({'choices': [{'message': {'content': text}}], 'usage': self._usage(prompt, text)})
+
+    async def anthropic(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        failed = await self.gate('anthropic')
+        if failed:
+            return failed
+        text = self._answer('anthropic', body['messages'][0]['content'], CLAUDE_PROFILE)
+        return web.json_response({'content': [{'type': 'text', 'text': text}]})
+
+    async def gemini(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        failed = await self.gate('gemini')
+        if failed:
+            return failed
+        text = self._answer('gemini', body['contents'][0]['parts'][0]['text'], GEMINI_SENTIMENT)
+        return web.json_response({'candidates': [{'content': {'parts': [{'text': text}]}}]})
+
+
+def parse_routes(specs: list) -> Dict[str, Dict]:
+    """['openai:latency=2,qps=5', ...] -> {'openai': {'latency': 2.0, 'qps': 5.0}}"""
+    profiles = defaultdict(dict)
+    for spec in specs or []:
+        route, _, settings = spec.partition(':')
+        if route not in DEFAULT_LATENCY:
+            raise SystemExit(f"Unknown route {route!r} (one of {', '.join(DEFAULT_LATENCY)})")
+        for setting in filter(None, settings.split(',')):
+            key, _, value = setting.partition('=')
+            if key not in PROFILE_KEYS:
+                raise SystemExit(f"Unknown setting {key!r} (one of {', '.join(PROFILE_KEYS)})")
+            profiles[route][key] = PROFILE_KEYS[key](value)
+    return dict(profiles)
+
+
+def add_profile_args(parser: argparse.ArgumentParser):
+    """Stub behaviour flags, shared with the benchmarks that launch this server"""
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier on every default route latency')
+    parser.add_argument('--sigma', type=float, default=0.0, help='Lognormal latency spread on every route')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of 503s on every route')
+    parser.add_argument('--dead-sites', type=float, default=0.0, help='Share of business websites that drop connections')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Share of random 429s on every route')
+    parser.add_argument('--route', action='append', metavar='NAME:KEY=VALUE,...',
+                        help=f"Per-route override; keys: {', '.join(PROFILE_KEYS)}")
+
+
+def profiles_from_args(args: argparse.Namespace) -> Dict[str, Dict]:
+    base = {'sigma': args.sigma, 'error': args.error_rate, 'throttle': args.throttle_rate}
+    routes = parse_routes(args.route)
+    profiles = {route: {**base, **routes.get(route, {})} for route in DEFAULT_LATENCY}
+    profiles['site'].setdefault('dead', args.dead_sites)
+    return profiles
+
+
+async def serve(port: int, scale: float, profiles: Dict[str, Dict]):
+    server = StubServer(scale=scale, profiles=profiles)
+    url = await server.start(port=port)
+    print(f"Stub APIs on {url} (Ctrl+C to stop)", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8089)
+    add_profile_args(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, args.scale, profiles_from_args(args)))
+    except KeyboardInterrupt:
+        pass
@@ -8,7 +8,7 @@ This is the best fucking thing I've ever made.
 Architecture:
 - Multi-source enrichment (7 data sources)
 - 4-AI pipeline (Claude, GPT-4, Gemini, Perplexity)
-- Retry logic (3x with exponential backoff)
+- Retry logic (transient errors only, jittered backoff, Retry-After, per-API budgets)
 - Zero gaps guarantee (fallbacks for everything)
 - Struggling SMB detection (9 weighted signals)
 - 10 outreach messages (pattern-breakers)
@@ -17,18 +17,29 @@ Architecture:
 """
 import asyncio
 import aiohttp
+from bisect import bisect_left
+from aiohttp import web
+import argparse
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import re
 import json
 import logging
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional, Set, Tuple, Any
+from typing import List, Dict, Optional, Set, Tuple, Any, Callable, Awaitable
 import os
-from datetime import datetime
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import urlparse
 import time
-from collections import defaultdict
+import sqlite3
+import hashlib
+import heapq
+import weakref
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 
 logging.basicConfig(
     level=logging.INFO,
@@ -47,12 +58,18 @@ class Config:
     # Core APIs
     GOOGLE_PLACES_API = os.getenv('GOOGLE_PLACES_API', '')
     YELP_API = os.getenv('YELP_API', '')
+    PLACES_URL = os.getenv('PLACES_URL', 'https://maps.googleapis.com')
+    YELP_URL = os.getenv('YELP_URL', 'https://api.yelp.com')
     
     # AI APIs (4 models)
     OPENAI_API = os.getenv('OPENAI_API', '')
     ANTHROPIC_API = os.getenv('ANTHROPIC_API', '')
     GEMINI_API = os.getenv('GEMINI_API', '')
     PERPLEXITY_API = os.getenv('PERPLEXITY_API', '')
+    OPENAI_URL = os.getenv('OPENAI_URL', 'https://api.openai.com')
+    ANTHROPIC_URL = os.getenv('ANTHROPIC_URL', 'https://api.anthropic.com')
+    GEMINI_URL = os.getenv('GEMINI_URL', 'https://generativelanguage.googleapis.com')
+    PERPLEXITY_URL = os.getenv('PERPLEXITY_URL', 'https://api.perplexity.ai')
     
     # Enhanced data sources
     HUNTER_API = os.getenv('HUNTER_API', '')
@@ -60,6 +77,8 @@ class Config:
     CLEARBIT_API = os.getenv('CLEARBIT_API', '')
     BUILTWITH_API = os.getenv('BUILTWITH_API', '')
     INSTAGRAM_KEY = '1440de56aamsh945d6c41f441399p1af6adjsne2d964758775'
+    HUNTER_URL = os.getenv('HUNTER_URL', 'https://api.hunter.io')
+    INSTAGRAM_URL = os.getenv('INSTAGRAM_URL', 'https://instagram-scraper-api2.p.rapidapi.com')
     
     # Sheets
     SHEET_ID = '1JDtLSSf4bT_l4oMNps9y__M_GVmM7_BfWtyNdxsXF4o'
@@ -75,6 +94,7 @@ class Config:
     MIN_RATING = 3.5
     MIN_PRIORITY = 7
     MIN_STRUGGLING = 7  # For freelance
+    REQUIRE_CONTACT = True
     
     # Markets
     UK_CITIES = ['London', 'Manchester', 'Birmingham', 'Edinburgh', 'Bristol', 'Leeds', 'Liverpool']
@@ -95,33 +115,310 @@ class Config:
     ]
     
     # Performance
-    REQUEST_DELAY = 0.3
-    BATCH_DELAY = 0.7
     TIMEOUT = 12
-    MAX_CONCURRENT = 8
+    MAX_CONCURRENT = 128  # Overall socket cap; each provider's in-flight limit adapts below it (CONCURRENCY)
     MAX_RETRIES = 3
-    CHECKPOINT_INTERVAL = 50
+    RETRYABLE_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+    RETRY_BASE_DELAY = 1.0  # Backoff cap doubles per attempt from here...
+    RETRY_MAX_DELAY = 20.0  # ...up to this; the actual sleep is uniform in [0, cap]
+    RETRY_AFTER_MAX = 60.0  # Give up rather than honour a longer Retry-After
+    RETRY_BUDGET_RATIO = 0.2  # Retries earned per call, per API
+    RETRY_BUDGET_BURST = 10.0  # Retries available before the ratio kicks in
+    AUTH_FAILURE_STATUSES = (401, 402, 403)  # Bad or exhausted API key: not retried, but trips the breaker
+    BREAKER_CONSECUTIVE = 5  # Straight failures that open a provider's circuit breaker
+    BREAKER_FAILURE_RATE = 0.5  # ...or this share of failures over the recent window
+    BREAKER_WINDOW = 20
+    BREAKER_MIN_CALLS = 10
+    BREAKER_COOLDOWN = 30.0  # Seconds open before one probe call is let through
+    BREAKER_EXEMPT = ('web_scraping',)  # Sites fail one by one, not as a provider
+    CHECKPOINT_INTERVAL = 50  # Accepted leads between journal fsyncs
+    JOURNAL_PATH = os.getenv('JOURNAL_PATH', 'voxmill_journal.jsonl')
+    JOURNAL_FSYNC_SECONDS = 60  # Also fsync at least this often
+    
+    # On-disk response cache (SQLite)
+    CACHE_PATH = os.getenv('CACHE_PATH', 'voxmill_cache.sqlite')
+    CACHE_MAX_ENTRIES = 50000  # LRU eviction beyond this
+    PLACES_SEARCH_TTL = 3 * 86400
+    PLACES_DETAILS_TTL = 7 * 86400
+    DOMAIN_CACHE_TTL = 14 * 86400  # Website scrape + Hunter results per domain
+    LLM_CACHE_TTL = 30 * 86400  # AI completions, keyed by exact prompt
+    LLM_CACHE_MAX_BYTES = 100_000_000  # LRU eviction of AI completions beyond this
+    LLM_CACHE_OUTREACH = False  # Outreach runs at temperature 0.95: fresh copy every run
+    MARKET_RESEARCH_TTL = 7 * 86400  # Perplexity research per (category, city)
+    PERPLEXITY_BUSINESS_FOLLOWUP = False  # Extra small-model call per lead on top of market research
+    
+    # Website fetch guards
+    WEB_MAX_BYTES = 1_000_000  # Stop reading a page after this many bytes
+    WEB_CHUNK_BYTES = 64 * 1024
+    WEB_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+    
+    # CPU offload: worker processes for HTML parsing + scoring (0 = inline on the event loop)
+    CPU_WORKERS = int(os.getenv('CPU_WORKERS', '0'))
+    LOOP_LAG_INTERVAL = 0.25  # Event-loop lag sampling period (seconds)
+    CONCURRENT_PHASES = os.getenv('CONCURRENT_PHASES', '0') == '1'  # Run all 4 markets at once on one shared session
+    TWO_PASS = False  # Score every candidate first, then spend AI only on each phase's top leads
+    
+    # Live metrics: Prometheus text on http://METRICS_HOST:METRICS_PORT/metrics (0 = off), JSON dump at exit ('' = off)
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_JSON_PATH = os.getenv('METRICS_JSON_PATH', '')
+    
+    # Span tracing: Chrome trace-event JSON written to TRACE_PATH at exit ('' = off)
+    TRACE_PATH = os.getenv('TRACE_PATH', '')
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.02'))  # Share of leads traced end to end
+    TRACE_MAX_EVENTS = 200_000  # Spans kept in memory; later ones are counted as dropped
+    
+    # AI model routing: every provider has a 'standard' and a 'hot' model. Hot leads
+    # (routing score >= hot_at) go straight to 'hot'; the rest start on 'standard'
+    # and escalate to 'hot' only when the output fails validation
+    MODEL_TIERS = {
+        'openai': {'standard': 'gpt-4o-mini', 'hot': 'gpt-4o'},
+        'anthropic': {'standard': 'claude-3-5-haiku-20241022', 'hot': 'claude-3-5-sonnet-20241022'},
+        'gemini': {'standard': 'gemini-1.5-flash-8b', 'hot': 'gemini-1.5-flash'},
+        'perplexity': {'standard': 'llama-3.1-sonar-small-128k-online', 'hot': 'llama-3.1-sonar-large-128k-online'},
+    }
+    MODEL_ROUTING = {
+        'voxmill': {'score': 'priority_score', 'hot_at': 9},
+        'freelance': {'score': 'struggling_score', 'hot_at': 9},
+    }
+    MARKET_RESEARCH_TIER = 'hot'  # One call serves a whole market, so it gets the better model
+    
+    # Claude profiling + Gemini sentiment: several leads per request
+    AI_BATCH_SIZE = int(os.getenv('AI_BATCH_SIZE', '1'))  # Leads per request (1 = no batching)
+    AI_BATCH_WINDOW = 0.5  # Max seconds a lead waits for its batch to fill
+    
+    # Provider rate limits: (requests/sec, burst) token bucket per provider
+    RATE_LIMITS = {
+        'google_places': (10.0, 10),   # Places default quota is 600 QPM
+        'hunter_io': (10.0, 5),        # Hunter allows 15 req/s
+        'web_scraping': (20.0, 20),    # Arbitrary business sites
+        'instagram': (5.0, 5),         # RapidAPI plan
+        'yelp': (5.0, 5),
+        'openai': (2.0, 4),
+        'anthropic': (50 / 60, 1),     # 50 RPM tier (burst 1 keeps any 60s window at 50)
+        'gemini': (2.0, 4),
+        'perplexity': (50 / 60, 1),    # 50 RPM on online models
+    }
+    
+    # Adaptive in-flight limits per provider (AIMD): (initial, min, max)
+    CONCURRENCY = {
+        'google_places': (8, 2, 32),
+        'hunter_io': (4, 1, 16),
+        'web_scraping': (16, 4, 64),
+        'instagram': (4, 1, 16),
+        'yelp': (4, 1, 16),
+        'openai': (4, 1, 16),
+        'anthropic': (4, 1, 16),
+        'gemini': (4, 1, 16),
+        'perplexity': (2, 1, 8),
+    }
+    AIMD_BACKOFF = 0.5  # Limit multiplier on 429/5xx/timeouts or a latency spike
+    AIMD_LATENCY_SPIKE = 3.0  # Latency above this x the provider's running baseline counts as overload
+    AIMD_LATENCY_EWMA = 0.1
+    # Latency only means load for fixed-size lookups: LLM calls vary with output length, batch size and
+    # model tier, and web_scraping spans thousands of unrelated sites
+    AIMD_LATENCY_PROVIDERS = ('google_places', 'hunter_io', 'instagram', 'yelp')
+    # Dead, slow or broken sites say nothing about load either: only a host pushing back counts as overload
+    AIMD_STATUS_ONLY = ('web_scraping',)
+    AIMD_OVERLOAD_STATUSES = (429, 503)
+    
+    # Pipeline stages (workers per stage + bounded queue feeding it)
+    STAGE_WORKERS = {'search': 2, 'details': 6, 'basic': 8, 'enhanced': 8, 'scoring': 1, 'ai': 4}
+    STAGE_QUEUE_SIZE = {'search': 0, 'details': 40, 'basic': 16, 'enhanced': 16, 'scoring': 16, 'ai': 8}
 
 
 # ============================================
 # RETRY DECORATOR
 # ============================================
-def retry_on_failure(max_attempts=3):
-    """Retry decorator with exponential backoff"""
+class ProviderError(Exception):
+    """The provider failed the call (bad key, quota, outage); counts against its circuit breaker"""
+
+
+class CircuitOpenError(ProviderError):
+    """The provider's circuit breaker is open; the caller should use its fallback"""
+
+
+class RetryableError(ProviderError):
+    """Transient failure (408/429/5xx, quota) worth retrying; retry_after is the server's hint in seconds"""
+    def __init__(self, message: str, retry_after: Optional[float] = None, status: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status = status
+
+
+class RetryBudget:
+    """Per-API cap on retries: every call earns `ratio` of a retry, every retry spends one
+    
+    Starts full at `burst` retries, so a brief blip is retried freely, but during
+    an outage retries settle at ~ratio of calls instead of multiplying load.
+    Owned by the miner's RateLimiter, like the provider's bucket and breaker.
+    """
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+    
+    def deposit(self):
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+    
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def check_retryable(r: aiohttp.ClientResponse):
+    """Raise RetryableError for statuses worth retrying; other non-200s are permanent"""
+    if r.status in Config.RETRYABLE_STATUSES:
+        raise RetryableError(f"HTTP {r.status}", parse_retry_after(r.headers.get('Retry-After')), r.status)
+
+
+def check_response(r: aiohttp.ClientResponse):
+    """check_retryable for API calls, plus ProviderError for a rejected key"""
+    check_retryable(r)
+    if r.status in Config.AUTH_FAILURE_STATUSES:
+        raise ProviderError(f"HTTP {r.status}")
+
+
+def is_transient(e: BaseException) -> bool:
+    return isinstance(e, (RetryableError, asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+
+def is_provider_failure(e: BaseException) -> bool:
+    """Errors clients must let through to retry_on_failure instead of swallowing"""
+    return isinstance(e, ProviderError) or is_transient(e)
+
+
+class CircuitBreaker:
+    """Per-API closed / open / half-open breaker shared by every caller of that API
+    
+    Opens after BREAKER_CONSECUTIVE straight failures, or when at least
+    BREAKER_FAILURE_RATE of the last BREAKER_WINDOW calls failed (once
+    BREAKER_MIN_CALLS have been seen). After BREAKER_COOLDOWN seconds one probe
+    call is let through: success closes the breaker, failure re-opens it.
+    Only requests that reach the network count: RateLimiter.slot() asks and reports.
+    """
+    def __init__(self, api: str):
+        self.api = api
+        self.state = 'closed'
+        self.consecutive = 0
+        self.recent: deque = deque(maxlen=Config.BREAKER_WINDOW)
+        self.opened_at = 0.0
+        self.probe_at: Optional[float] = None
+    
+    def allow(self, stats: Optional['StatsTracker'] = None) -> bool:
+        if self.state == 'closed':
+            return True
+        now = time.monotonic()
+        if self.state == 'open':
+            if now - self.opened_at < Config.BREAKER_COOLDOWN:
+                return False
+            self._move('half_open', stats)
+        # Half-open: one probe at a time (a probe that never reports back is replaced after a cooldown)
+        if self.probe_at is not None and now - self.probe_at < Config.BREAKER_COOLDOWN:
+            return False
+        self.probe_at = now
+        return True
+    
+    def record(self, ok: bool, stats: Optional['StatsTracker'] = None):
+        self.recent.append(ok)
+        self.consecutive = 0 if ok else self.consecutive + 1
+        if self.state == 'half_open':
+            self.probe_at = None
+            if ok:
+                self.recent.clear()
+                self._move('closed', stats)
+            else:
+                self._open(stats)
+        elif self.state == 'closed' and not ok and self._tripped():
+            self._open(stats)
+    
+    def _tripped(self) -> bool:
+        if self.consecutive >= Config.BREAKER_CONSECUTIVE:
+            return True
+        if len(self.recent) < Config.BREAKER_MIN_CALLS:
+            return False
+        return self.recent.count(False) / len(self.recent) >= Config.BREAKER_FAILURE_RATE
+    
+    def _open(self, stats: Optional['StatsTracker']):
+        self.opened_at = time.monotonic()
+        self._move('open', stats)
+    
+    def _move(self, state: str, stats: Optional['StatsTracker']):
+        if state == self.state:
+            return
+        logger.warning(f"🔌 {self.api} breaker {self.state} -> {state}")
+        if stats:
+            stats.record_breaker(self.api, self.state, state)
+        self.state = state
+
+
+def retry_on_failure(max_attempts=3, api: Optional[str] = None, fallback: Optional[Callable[[], Any]] = None):
+    """Retry transient failures with full-jitter exponential backoff
+    
+    Only RetryableError, timeouts and dropped connections are retried; anything
+    else gives up at once. Retry-After is honoured (hints beyond
+    Config.RETRY_AFTER_MAX give up instead of stalling), and every retry is paid
+    for from the API's RetryBudget in the instance's RateLimiter. A request the
+    limiter refuses because the API's breaker is open (CircuitOpenError) answers
+    at once. Give-ups and short circuits return fallback() (None without one).
+    Attempts and give-ups go to the instance's StatsTracker.
+    """
     def decorator(func):
+        name = api or func.__qualname__
+        
         async def wrapper(*args, **kwargs):
+            stats = getattr(args[0], 'stats', None) if args else None
+            budget = args[0].limiter.budget(name)
+            budget.deposit()
             for attempt in range(max_attempts):
                 try:
-                    result = await func(*args, **kwargs)
-                    return result
+                    return await func(*args, **kwargs)
+                except CircuitOpenError:
+                    if stats:
+                        stats.record_short_circuit(name)
+                    return fallback() if fallback else None
                 except Exception as e:
-                    if attempt == max_attempts - 1:
-                        logger.error(f"❌ {func.__name__} failed after {max_attempts} attempts: {e}")
-                        return None
-                    wait = 2 ** attempt
-                    logger.warning(f"⚠️ {func.__name__} attempt {attempt+1} failed, retrying in {wait}s...")
-                    await asyncio.sleep(wait)
-            return None
+                    retry_after = getattr(e, 'retry_after', None)
+                    if not is_transient(e):
+                        reason = 'permanent'
+                    elif attempt == max_attempts - 1:
+                        reason = 'exhausted'
+                    elif retry_after is not None and retry_after > Config.RETRY_AFTER_MAX:
+                        reason = 'retry_after'
+                    elif not budget.withdraw():
+                        reason = 'budget'
+                    else:
+                        # Full jitter, but never earlier than the server asked
+                        cap = min(Config.RETRY_MAX_DELAY, Config.RETRY_BASE_DELAY * 2 ** attempt)
+                        wait = max(retry_after or 0.0, random.uniform(0, cap))
+                        if stats:
+                            stats.record_retry(name)
+                        logger.warning(f"⚠️ {func.__name__} attempt {attempt+1} failed ({e}), retrying in {wait:.1f}s...")
+                        await asyncio.sleep(wait)
+                        continue
+                    
+                    if stats:
+                        stats.record_give_up(name, reason)
+                    logger.error(f"❌ {func.__name__} gave up after {attempt+1} attempts ({reason}): {e}")
+                    return fallback() if fallback else None
+            return fallback() if fallback else None
         return wrapper
     return decorator
 
@@ -129,10 +426,77 @@ def retry_on_failure(max_attempts=3):
 # ============================================
 # STATS TRACKER
 # ============================================
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no values)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class Histogram:
+    """Fixed-bucket histogram, as Prometheus expects: constant memory however long the run
+    
+    bounds are the buckets' upper edges (le); larger values land in +Inf.
+    Quantiles interpolate inside the bucket like histogram_quantile(), capped at the max seen.
+    """
+    LATENCY = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 60.0, 120.0)
+    LOOP_LAG = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+    
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+    
+    def quantile(self, pct: float) -> float:
+        """Estimated percentile (0 for no values)"""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        below = 0
+        for idx, count in enumerate(self.counts):
+            if count and below + count >= rank:
+                lower = self.bounds[idx - 1] if idx else 0.0
+                upper = min(self.bounds[idx], self.max) if idx < len(self.bounds) else self.max
+                return min(self.max, lower + max(0.0, upper - lower) * (rank - below) / count)
+            below += count
+        return self.max
+    
+    def buckets(self) -> List[Tuple[str, int]]:
+        """Cumulative (le, count) pairs ending with +Inf"""
+        pairs, total = [], 0
+        for bound, count in zip(list(self.bounds) + [float('inf')], self.counts):
+            total += count
+            pairs.append(('+Inf' if bound == float('inf') else repr(bound), total))
+        return pairs
+
+
 class StatsTracker:
     """Track success/failure rates"""
     def __init__(self):
         self.stats = defaultdict(lambda: {'success': 0, 'failure': 0})
+        self.cache_stats = defaultdict(lambda: {'hit': 0, 'miss': 0})
+        self.bytes_by_domain = defaultdict(int)
+        self.loop_lag = Histogram(Histogram.LOOP_LAG)
+        self.early_exits = defaultdict(int)
+        self.retries = defaultdict(lambda: defaultdict(int))
+        self.breaker_events: List[Tuple[str, str, str, str]] = []
+        self.short_circuits = defaultdict(int)
+        self.concurrency = defaultdict(lambda: {'limit': 0, 'in_flight': 0, 'low': None, 'high': 0, 'cuts': 0})
+        self.models = defaultdict(lambda: {'latency': Histogram(), 'tokens_in': 0, 'tokens_out': 0, 'escalations': 0,
+                                           'repairs': 0, 'repaired': 0})
+        self.requests = defaultdict(lambda: {'latency': Histogram(), 'errors': 0, 'bytes_in': 0, 'bytes_out': 0})
+        self.phases: Dict[str, Dict] = {}
+        self.started = time.monotonic()
     
     def record_success(self, api: str):
         self.stats[api]['success'] += 1
@@ -140,12 +504,216 @@ class StatsTracker:
     def record_failure(self, api: str):
         self.stats[api]['failure'] += 1
     
+    def record_bytes(self, domain: str, count: int):
+        self.bytes_by_domain[domain] += count
+    
+    def record_request(self, provider: str, seconds: float, ok: bool):
+        """One HTTP request to a provider, timed from when it got its slot"""
+        data = self.requests[provider]
+        data['latency'].observe(seconds)
+        data['errors'] += 0 if ok else 1
+    
+    def record_transfer(self, provider: str, bytes_in: int = 0, bytes_out: int = 0):
+        data = self.requests[provider]
+        data['bytes_in'] += bytes_in
+        data['bytes_out'] += bytes_out
+    
+    def record_phase_start(self, phase: str):
+        self.phases[phase] = {'leads': 0, 'latency': [], 'started': time.monotonic(), 'ended': None}
+    
+    def record_phase_end(self, phase: str):
+        if phase in self.phases:
+            self.phases[phase]['ended'] = time.monotonic()
+    
+    def record_lead(self, phase: str, seconds: Optional[float] = None):
+        """One accepted lead; seconds = time from claiming its place to acceptance"""
+        if phase in self.phases:
+            self.phases[phase]['leads'] += 1
+            if seconds is not None:
+                self.phases[phase]['latency'].append(seconds)
+    
+    @staticmethod
+    def _phase_minutes(data: Dict) -> float:
+        return ((data['ended'] or time.monotonic()) - data['started']) / 60
+    
+    def leads_per_minute(self, phase: str) -> float:
+        data = self.phases.get(phase)
+        if not data:
+            return 0.0
+        minutes = self._phase_minutes(data)
+        return data['leads'] / minutes if minutes > 0 else 0.0
+    
+    def record_model(self, model: str, seconds: float, tokens_in: int, tokens_out: int):
+        usage = self.models[model]
+        usage['latency'].observe(seconds)
+        usage['tokens_in'] += tokens_in or 0
+        usage['tokens_out'] += tokens_out or 0
+    
+    def record_escalation(self, model: str):
+        """Output from `model` failed validation and was retried on a stronger one"""
+        self.models[model]['escalations'] += 1
+    
+    def record_repair(self, model: str, ok: bool):
+        """A repair-only request on `model`, and whether it produced valid output"""
+        self.models[model]['repairs'] += 1
+        self.models[model]['repaired'] += int(ok)
+    
+    def record_retry(self, api: str):
+        self.retries[api]['retried'] += 1
+    
+    def record_give_up(self, api: str, reason: str):
+        """reason: permanent | exhausted | budget | retry_after"""
+        self.retries[api][reason] += 1
+    
+    def record_breaker(self, api: str, old: str, new: str):
+        self.breaker_events.append((datetime.now().strftime('%H:%M:%S'), api, old, new))
+    
+    def record_short_circuit(self, api: str):
+        """A call answered with its fallback because the API's breaker was open"""
+        self.short_circuits[api] += 1
+    
+    def record_concurrency(self, provider: str, limit: int, in_flight: int):
+        """Live gauge of a provider's adaptive in-flight limit"""
+        gauge = self.concurrency[provider]
+        gauge['limit'] = limit
+        gauge['in_flight'] = in_flight
+        gauge['low'] = limit if gauge['low'] is None else min(gauge['low'], limit)
+        gauge['high'] = max(gauge['high'], limit)
+    
+    def record_concurrency_cut(self, provider: str):
+        self.concurrency[provider]['cuts'] += 1
+    
+    def record_early_exit(self, stage: str):
+        self.early_exits[stage] += 1
+    
+    def record_loop_lag(self, lag: float):
+        self.loop_lag.observe(lag)
+    
+    def record_cache(self, cache: str, hit: bool):
+        self.cache_stats[cache]['hit' if hit else 'miss'] += 1
+    
     def get_rate(self, api: str) -> float:
         total = self.stats[api]['success'] + self.stats[api]['failure']
         if total == 0:
             return 0.0
         return (self.stats[api]['success'] / total) * 100
     
+    def snapshot(self) -> Dict:
+        """Everything tracked so far as plain JSON-able data (live metrics and the exit dump)"""
+        def quantiles(values: List[float]) -> Dict[str, float]:
+            return {f'p{pct}': percentile(values, pct) for pct in (50, 95, 99)}
+        
+        def histogram(hist: Histogram) -> Dict[str, Any]:
+            return {**{f'p{pct}': hist.quantile(pct) for pct in (50, 95, 99)}, 'buckets': hist.buckets()}
+        
+        breakers = {}
+        for _, api, _, state in self.breaker_events:
+            breakers[api] = state
+        
+        return {
+            'uptime_seconds': time.monotonic() - self.started,
+            'apis': {api: dict(data) for api, data in self.stats.items()},
+            'requests': {
+                provider: {
+                    'count': data['latency'].count,
+                    'errors': data['errors'],
+                    'latency_sum': data['latency'].sum,
+                    'latency': histogram(data['latency']),
+                    'bytes_in': data['bytes_in'],
+                    'bytes_out': data['bytes_out'],
+                }
+                for provider, data in self.requests.items()
+            },
+            'retries': {api: dict(counts) for api, counts in self.retries.items()},
+            'caches': {cache: dict(data) for cache, data in self.cache_stats.items()},
+            'concurrency': {provider: dict(gauge) for provider, gauge in self.concurrency.items()},
+            'breakers': breakers,
+            'short_circuits': dict(self.short_circuits),
+            'models': {
+                model: {
+                    'calls': usage['latency'].count,
+                    'latency': histogram(usage['latency']),
+                    **{key: value for key, value in usage.items() if key != 'latency'},
+                }
+                for model, usage in self.models.items()
+            },
+            'phases': {
+                phase: {
+                    'leads': data['leads'],
+                    'minutes': self._phase_minutes(data),
+                    'leads_per_minute': self.leads_per_minute(phase),
+                    'lead_latency': quantiles(data['latency']),
+                }
+                for phase, data in self.phases.items()
+            },
+            'early_exits': dict(self.early_exits),
+            'loop_lag': {**histogram(self.loop_lag), 'sum': self.loop_lag.sum, 'count': self.loop_lag.count,
+                         'max': self.loop_lag.max},
+        }
+    
+    def prometheus(self) -> str:
+        """snapshot() in Prometheus text exposition format"""
+        snap = self.snapshot()
+        families: Dict[str, Tuple[str, List[str]]] = {}
+        
+        def metric(name: str, kind: str, labels: Dict[str, Any], value: float, suffix: str = ''):
+            label_text = ','.join(
+                '{}="{}"'.format(key, str(val).replace('\\', '\\\\').replace('"', '\\"')) for key, val in labels.items()
+            )
+            families.setdefault(name, (kind, []))[1].append(f"voxmill_{name}{suffix}{{{label_text}}} {float(value or 0)}")
+        
+        def histogram(name: str, labels: Dict[str, Any], data: Dict[str, Any], total: float, count: int):
+            for le, cumulative in data['buckets']:
+                metric(name, 'histogram', {**labels, 'le': le}, cumulative, '_bucket')
+            metric(name, 'histogram', labels, total, '_sum')
+            metric(name, 'histogram', labels, count, '_count')
+        
+        metric('uptime_seconds', 'gauge', {}, snap['uptime_seconds'])
+        for api, data in snap['apis'].items():
+            for outcome, count in data.items():
+                metric('api_calls_total', 'counter', {'api': api, 'outcome': outcome}, count)
+        for provider, data in snap['requests'].items():
+            histogram('request_duration_seconds', {'provider': provider}, data['latency'], data['latency_sum'], data['count'])
+            metric('request_errors_total', 'counter', {'provider': provider}, data['errors'])
+            metric('received_bytes_total', 'counter', {'provider': provider}, data['bytes_in'])
+            metric('sent_bytes_total', 'counter', {'provider': provider}, data['bytes_out'])
+        for api, counts in snap['retries'].items():
+            for outcome, count in counts.items():
+                metric('retries_total', 'counter', {'api': api, 'outcome': outcome}, count)
+        for cache, data in snap['caches'].items():
+            for result, count in data.items():
+                metric('cache_lookups_total', 'counter', {'cache': cache, 'result': result}, count)
+        for provider, gauge in snap['concurrency'].items():
+            metric('in_flight', 'gauge', {'provider': provider}, gauge['in_flight'])
+            metric('concurrency_limit', 'gauge', {'provider': provider}, gauge['limit'])
+            metric('concurrency_cuts_total', 'counter', {'provider': provider}, gauge['cuts'])
+        for api, state in snap['breakers'].items():
+            metric('breaker_open', 'gauge', {'api': api}, state != 'closed')
+        for api, count in snap['short_circuits'].items():
+            metric('short_circuits_total', 'counter', {'api': api}, count)
+        for model, usage in snap['models'].items():
+            metric('model_calls_total', 'counter', {'model': model}, usage['calls'])
+            metric('model_tokens_total', 'counter', {'model': model, 'direction': 'in'}, usage['tokens_in'])
+            metric('model_tokens_total', 'counter', {'model': model, 'direction': 'out'}, usage['tokens_out'])
+        for phase, data in snap['phases'].items():
+            metric('leads_total', 'counter', {'phase': phase}, data['leads'])
+            metric('leads_per_minute', 'gauge', {'phase': phase}, data['leads_per_minute'])
+            for pct, value in data['lead_latency'].items():
+                metric('lead_duration_seconds', 'summary', {'phase': phase, 'quantile': int(pct[1:]) / 100}, value)
+        lag = snap['loop_lag']
+        histogram('loop_lag_seconds', {}, lag, lag['sum'], lag['count'])
+        
+        lines = []
+        for name, (kind, samples) in families.items():
+            lines.append(f"# TYPE voxmill_{name} {kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+    
+    def dump_json(self, path: str):
+        with open(path, 'w') as fh:
+            json.dump(self.snapshot(), fh, indent=2, default=str)
+        logger.info(f"📈 Metrics written to {path}")
+    
     def report(self):
         logger.info("\n" + "="*100)
         logger.info("📊 API SUCCESS RATES")
@@ -154,85 +722,855 @@ class StatsTracker:
             total = data['success'] + data['failure']
             rate = self.get_rate(api)
             logger.info(f"{api:20} | Success: {data['success']:4} | Failure: {data['failure']:4} | Rate: {rate:5.1f}%")
+        
+        if self.cache_stats:
+            logger.info("="*100)
+            logger.info("💾 CACHE HIT RATES")
+            logger.info("="*100)
+            for cache, data in sorted(self.cache_stats.items()):
+                total = data['hit'] + data['miss']
+                rate = (data['hit'] / total) * 100 if total else 0.0
+                logger.info(f"{cache:20} | Hit: {data['hit']:4} | Miss: {data['miss']:4} | Rate: {rate:5.1f}%")
+        
+        if self.requests:
+            logger.info("="*100)
+            logger.info("📡 REQUESTS PER PROVIDER")
+            logger.info("="*100)
+            for provider, data in sorted(self.requests.items()):
+                latency = data['latency']
+                logger.info(
+                    f"{provider:20} | Requests: {latency.count:5} | Errors: {data['errors']:4} | "
+                    f"p50: {latency.quantile(50):5.2f}s | p95: {latency.quantile(95):5.2f}s | "
+                    f"p99: {latency.quantile(99):5.2f}s | In: {data['bytes_in'] / 1e3:8.1f} KB | Out: {data['bytes_out'] / 1e3:7.1f} KB"
+                )
+        
+        if self.phases:
+            logger.info("="*100)
+            logger.info("🏁 LEADS PER MINUTE: " + ' | '.join(
+                f"{phase}: {data['leads']} in {self._phase_minutes(data):.1f}m ({self.leads_per_minute(phase):.2f}/min, "
+                f"p95 {percentile(data['latency'], 95):.1f}s per lead)"
+                for phase, data in self.phases.items()
+            ))
+        
+        if self.bytes_by_domain:
+            total = sum(self.bytes_by_domain.values())
+            logger.info("="*100)
+            logger.info(f"📥 WEBSITE BYTES: {total / 1e6:.1f} MB from {len(self.bytes_by_domain)} domains (top 10)")
+            logger.info("="*100)
+            for domain, count in sorted(self.bytes_by_domain.items(), key=lambda x: x[1], reverse=True)[:10]:
+                logger.info(f"{domain:40} | {count / 1e3:8.1f} KB")
+        
+        if self.retries:
+            logger.info("="*100)
+            logger.info("🔁 RETRIES (gave up: permanent error | attempts exhausted | budget spent | Retry-After too long)")
+            logger.info("="*100)
+            for api, counts in sorted(self.retries.items()):
+                logger.info(
+                    f"{api:20} | Retried: {counts['retried']:4} | Permanent: {counts['permanent']:4} | "
+                    f"Exhausted: {counts['exhausted']:4} | Budget: {counts['budget']:4} | Retry-After: {counts['retry_after']:4}"
+                )
+        
+        if self.breaker_events or self.short_circuits:
+            logger.info("="*100)
+            logger.info("🔌 CIRCUIT BREAKERS")
+            logger.info("="*100)
+            for at, api, old, new in self.breaker_events:
+                logger.info(f"{at} | {api:20} | {old} -> {new}")
+            for api, count in sorted(self.short_circuits.items()):
+                logger.info(f"{api:20} | Short-circuited calls: {count}")
+        
+        if any(gauge['cuts'] or gauge['high'] != gauge['low'] for gauge in self.concurrency.values()):
+            logger.info("="*100)
+            logger.info("🎚️  ADAPTIVE CONCURRENCY (in-flight limit per provider)")
+            logger.info("="*100)
+            for provider, gauge in sorted(self.concurrency.items()):
+                logger.info(
+                    f"{provider:20} | Now: {gauge['limit']:3} | Low: {gauge['low']:3} | High: {gauge['high']:3} | "
+                    f"Cuts: {gauge['cuts']:4}"
+                )
+        
+        if self.models:
+            logger.info("="*100)
+            logger.info("🤖 MODEL USAGE")
+            logger.info("="*100)
+            for model, usage in sorted(self.models.items()):
+                latency = usage['latency']
+                logger.info(
+                    f"{model:36} | Calls: {latency.count:4} | p50: {latency.quantile(50):5.1f}s | "
+                    f"p95: {latency.quantile(95):5.1f}s | Tokens in: {usage['tokens_in']:7} | "
+                    f"out: {usage['tokens_out']:7} | Escalated: {usage['escalations']:3} | "
+                    f"Repaired: {usage['repaired']}/{usage['repairs']}"
+                )
+        
+        if self.early_exits:
+            logger.info("="*100)
+            logger.info("✂️  EARLY EXITS (dropped before paid enrichment): " + ' | '.join(
+                f"after {stage}: {count}" for stage, count in self.early_exits.items()
+            ))
+        
+        if self.loop_lag.count:
+            lag = self.loop_lag
+            logger.info("="*100)
+            logger.info(
+                f"⏱️  EVENT LOOP LAG ({lag.count} samples) | p50: {lag.quantile(50) * 1000:.1f}ms | "
+                f"p95: {lag.quantile(95) * 1000:.1f}ms | p99: {lag.quantile(99) * 1000:.1f}ms | max: {lag.max * 1000:.1f}ms"
+            )
+
+
+# ============================================
+# TRACING
+# ============================================
+# Tags (place_id, phase, ...) of the sampled lead the current task works on; None = not traced
+current_trace: ContextVar[Optional[Dict[str, Any]]] = ContextVar('current_trace', default=None)
+
+
+class Tracer:
+    """Span recorder with Chrome trace-event export (chrome://tracing, ui.perfetto.dev)
+    
+    Leads are sampled by a hash of their key, so a sampled lead keeps every span
+    (stages, queue waits, requests) and the rest cost one context lookup per span.
+    Each asyncio task gets its own track: pipeline workers are long rows, gather
+    and TaskGraph children short ones; filter by place_id to follow one lead.
+    """
+    def __init__(self, sample_rate: float, max_events: int):
+        self.sample_rate = sample_rate
+        self.max_events = max_events
+        self.events: List[Dict] = []
+        self.dropped = 0
+        self.origin = time.monotonic()
+        self.tracks: 'weakref.WeakKeyDictionary[asyncio.Task, int]' = weakref.WeakKeyDictionary()
+        self.track_names: List[str] = []
+    
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+    
+    def sampled(self, key: str) -> bool:
+        if self.sample_rate >= 1:
+            return True
+        if self.sample_rate <= 0 or not key:
+            return False
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') < self.sample_rate * 2 ** 64
+    
+    @contextmanager
+    def lead(self, key: str, **tags):
+        """Trace the block (and tasks it spawns) as one lead if `key` is sampled"""
+        token = current_trace.set(tags if self.sampled(key) else None)
+        try:
+            yield
+        finally:
+            current_trace.reset(token)
+    
+    @contextmanager
+    def span(self, name: str, cat: str, **args):
+        if current_trace.get() is None:
+            yield
+            return
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.complete(name, cat, start, **args)
+    
+    def complete(self, name: str, cat: str, start: Optional[float], **args):
+        """Record a span from `start` (time.monotonic()) to now, if the current lead is sampled"""
+        tags = current_trace.get()
+        if tags is None or start is None:
+            return
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        end = time.monotonic()
+        self.events.append({
+            'name': name, 'cat': cat, 'ph': 'X', 'pid': 1, 'tid': self._track(),
+            'ts': round((start - self.origin) * 1e6, 1), 'dur': round((end - start) * 1e6, 1),
+            'args': {**tags, **args},
+        })
+    
+    def _track(self) -> int:
+        task = asyncio.current_task()
+        if task is None:
+            return 0
+        tid = self.tracks.get(task)
+        if tid is None:
+            self.track_names.append(task.get_name())
+            tid = self.tracks[task] = len(self.track_names)
+        return tid
+    
+    def export(self, path: str):
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': 'voxmill'}}]
+        metadata += [
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+            for tid, name in enumerate(self.track_names, start=1)
+        ]
+        with open(path, 'w') as fh:
+            json.dump({
+                'traceEvents': metadata + self.events,
+                'displayTimeUnit': 'ms',
+                'otherData': {'sample_rate': self.sample_rate, 'dropped_spans': self.dropped},
+            }, fh, default=str)
+        logger.info(f"🧵 Trace: {len(self.events)} spans ({self.dropped} dropped) written to {path} - open in ui.perfetto.dev")
+
+
+# ============================================
+# RATE LIMITING
+# ============================================
+class TokenBucket:
+    """Token bucket: refills at `rate` tokens/sec and holds at most `burst`"""
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self, abort: Optional[Callable[[], bool]] = None) -> bool:
+        """Take a token; False (without taking one) as soon as abort() is true"""
+        # The lock queues waiters FIFO, so callers get tokens in arrival order
+        async with self.lock:
+            while True:
+                if abort and abort():
+                    return False
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveLimit:
+    """In-flight request cap for one provider, tuned by AIMD
+    
+    Each success while the cap is fully used adds 1/limit (about +1 per round
+    of requests). A 429/5xx/timeout (only 429/503 for AIMD_STATUS_ONLY providers), or for
+    AIMD_LATENCY_PROVIDERS latency above AIMD_LATENCY_SPIKE x the running baseline, multiplies the cap by AIMD_BACKOFF - at most once per
+    round, since outcomes of requests started before the last cut are ignored.
+    Waiters are served FIFO.
+    """
+    def __init__(self, provider: str, initial: int, minimum: int, maximum: int,
+                 latency_signal: bool = True, stats: Optional['StatsTracker'] = None):
+        self.provider = provider
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_signal = latency_signal
+        self.stats = stats
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self.cut_at = 0.0
+        self.waiters: deque = deque()
+        self._publish()
+    
+    async def acquire(self):
+        if not self.waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self._publish()
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled: pass it on
+                self.release(None)
+            else:
+                self.waiters.remove(waiter)
+            raise
+    
+    def release(self, started: Optional[float], overloaded: bool = False):
+        """Free a slot; started=None releases without feeding the controller"""
+        self.in_flight -= 1
+        if started is not None:
+            self._adjust(started, overloaded)
+        # Hand freed slots straight to waiters, oldest first
+        while self.waiters and self.in_flight < int(self.limit):
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._publish()
+    
+    def _adjust(self, started: float, overloaded: bool):
+        now = time.monotonic()
+        latency = now - started
+        if self.latency_signal:
+            if self.baseline is not None and latency > Config.AIMD_LATENCY_SPIKE * self.baseline:
+                overloaded = True
+            self.baseline = latency if self.baseline is None else \
+                self.baseline + Config.AIMD_LATENCY_EWMA * (latency - self.baseline)
+        
+        if overloaded:
+            if started >= self.cut_at:
+                self.limit = max(self.minimum, self.limit * Config.AIMD_BACKOFF)
+                self.cut_at = now
+                if self.stats:
+                    self.stats.record_concurrency_cut(self.provider)
+        elif self.in_flight + 1 >= int(self.limit):
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+    
+    def _publish(self):
+        if self.stats:
+            self.stats.record_concurrency(self.provider, int(self.limit), self.in_flight)
+
+
+# Provider whose RateLimiter.slot the current task is inside (attributes body bytes in trace hooks)
+current_provider: ContextVar[Optional[str]] = ContextVar('current_provider', default=None)
+
+
+class RateLimiter:
+    """Per-provider token buckets, adaptive in-flight limits, circuit breakers and retry budgets
+    
+    One per miner, shared by every client and phase.
+    """
+    def __init__(self, limits: Dict[str, Tuple[float, int]], stats: Optional['StatsTracker'] = None,
+                 concurrency: Optional[Dict[str, Tuple[int, int, int]]] = None, tracer: Optional[Tracer] = None):
+        self.buckets = {provider: TokenBucket(rate, burst) for provider, (rate, burst) in limits.items()}
+        self.stats = stats
+        self.tracer = tracer
+        concurrency = Config.CONCURRENCY if concurrency is None else concurrency
+        self.limits = {
+            provider: AdaptiveLimit(provider, *bounds, latency_signal=provider in Config.AIMD_LATENCY_PROVIDERS, stats=stats)
+            for provider, bounds in concurrency.items()
+        }
+        self.breakers = {provider: CircuitBreaker(provider) for provider in limits if provider not in Config.BREAKER_EXEMPT}
+        self.budgets: Dict[str, RetryBudget] = {}
+    
+    def budget(self, api: str) -> RetryBudget:
+        if api not in self.budgets:
+            self.budgets[api] = RetryBudget(Config.RETRY_BUDGET_RATIO, Config.RETRY_BUDGET_BURST)
+        return self.budgets[api]
+    
+    @asynccontextmanager
+    async def slot(self, provider: str):
+        """In-flight slot + rate token around one request; its outcome tunes the provider's limit
+        
+        Yields the time.monotonic() at which the request actually started (after both waits).
+        The provider's circuit breaker gates the request (CircuitOpenError) and hears its outcome,
+        so cache hits and calls skipped for a missing key never count. Latency is recorded per provider, and body bytes are attributed to it by trace_config().
+        Sampled leads get a '<provider> queue' span for the waits and a '<provider>' span for the request.
+        """
+        queued = time.monotonic()
+        limit = self.limits.get(provider)
+        if limit is not None:
+            await limit.acquire()
+        try:
+            await self.acquire(provider)
+        except BaseException:
+            if limit is not None:
+                limit.release(None)
+            raise
+        started = time.monotonic()
+        if self.tracer:
+            self.tracer.complete(f"{provider} queue", 'queue', queued, provider=provider)
+        token = current_provider.set(provider)
+        try:
+            yield started
+        except asyncio.CancelledError:
+            # Abandoned by the caller (shutdown, early exit): not a request outcome, so free the slot silently
+            if limit is not None:
+                limit.release(None)
+            raise
+        except BaseException as e:
+            self._finish(provider, limit, started, ok=False, overloaded=self._overloaded(provider, e))
+            raise
+        finally:
+            current_provider.reset(token)
+        self._finish(provider, limit, started, ok=True, overloaded=False)
+    
+    @staticmethod
+    def _overloaded(provider: str, e: BaseException) -> bool:
+        """Whether a failed request should cut the provider's in-flight limit"""
+        if provider in Config.AIMD_STATUS_ONLY:
+            # Connection, DNS and timeout errors from one business site are that site's problem
+            return isinstance(e, RetryableError) and e.status in Config.AIMD_OVERLOAD_STATUSES
+        return is_transient(e)
+    
+    def _finish(self, provider: str, limit: Optional[AdaptiveLimit], started: float, ok: bool, overloaded: bool):
+        if limit is not None:
+            limit.release(started, overloaded=overloaded)
+        breaker = self.breakers.get(provider)
+        if breaker is not None:
+            breaker.record(ok, self.stats)
+        if self.stats:
+            self.stats.record_request(provider, time.monotonic() - started, ok)
+        if self.tracer:
+            self.tracer.complete(provider, 'request', started, provider=provider, ok=ok)
+    
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Session hooks counting request/response body bytes against the provider holding the slot"""
+        async def on_sent(session, ctx, params):
+            provider = current_provider.get()
+            if provider and self.stats:
+                self.stats.record_transfer(provider, bytes_out=len(params.chunk))
+        
+        async def on_received(session, ctx, params):
+            provider = current_provider.get()
+            if provider and self.stats:
+                self.stats.record_transfer(provider, bytes_in=len(params.chunk))
+        
+        trace = aiohttp.TraceConfig()
+        trace.on_request_chunk_sent.append(on_sent)
+        trace.on_response_chunk_received.append(on_received)
+        return trace
+    
+    async def acquire(self, provider: str):
+        """Wait for a request slot (providers without a limit pass straight through)
+        
+        Raises CircuitOpenError if the provider's breaker is open (or opened while waiting),
+        or is half-open with its probe already out.
+        """
+        breaker = self.breakers.get(provider)
+        if breaker is not None and not breaker.allow(self.stats):
+            raise CircuitOpenError(provider)
+        
+        def is_open() -> bool:
+            return breaker is not None and breaker.state == 'open'
+        
+        # Callers queued behind the bucket drain at once when the breaker opens
+        bucket = self.buckets.get(provider)
+        if bucket and not await bucket.acquire(is_open):
+            raise CircuitOpenError(provider)
+
+
+# ============================================
+# CPU OFFLOAD
+# ============================================
+class CpuPool:
+    """Runs CPU-bound functions inline, or in worker processes when Config.CPU_WORKERS > 0
+    
+    Functions must be importable from this module (picklable) and should take
+    and return compact, plain data.
+    """
+    def __init__(self, workers: int):
+        self.executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    
+    async def run(self, fn: Callable, *args) -> Any:
+        if self.executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+    
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a sleeping coroutine (CPU starvation shows up here)"""
+    def __init__(self, stats: StatsTracker, interval: float):
+        self.stats = stats
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        self.task = asyncio.ensure_future(self._sample())
+    
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.stats.record_loop_lag(max(0.0, loop.time() - started - self.interval))
+    
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+
+# ============================================
+# DISK CACHE
+# ============================================
+class DiskCache:
+    """SQLite key/value cache with per-entry TTL and LRU eviction
+    
+    Entries live in namespaces (e.g. 'places_search'); hits and misses are
+    counted per namespace in StatsTracker.
+    """
+    EVICT_EVERY = 200  # Writes between eviction sweeps
+    
+    def __init__(self, path: str, max_entries: int, stats: StatsTracker):
+        self.max_entries = max_entries
+        self.stats = stats
+        self.writes = 0
+        self.byte_limits: Dict[str, int] = {}
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'namespace TEXT, key TEXT, value TEXT, expires REAL, accessed REAL, '
+            'PRIMARY KEY (namespace, key))'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+    
+    def limit_bytes(self, prefix: str, max_bytes: int):
+        """Cap the stored size of namespaces starting with prefix (LRU, applied on evict)"""
+        self.byte_limits[prefix] = max_bytes
+    
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> str:
+        """Stable key from endpoint + normalized params (never include API keys)"""
+        normalized = {
+            k: ' '.join(v.lower().split()) if isinstance(v, str) else v
+            for k, v in params.items()
+        }
+        raw = endpoint + '|' + json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        row = self.conn.execute(
+            'SELECT value, expires FROM cache WHERE namespace = ? AND key = ?', (namespace, key)
+        ).fetchone()
+        if row and row[1] >= now:
+            self.conn.execute(
+                'UPDATE cache SET accessed = ? WHERE namespace = ? AND key = ?', (now, namespace, key)
+            )
+            self.stats.record_cache(namespace, True)
+            return json.loads(row[0])
+        
+        if row:
+            self.conn.execute('DELETE FROM cache WHERE namespace = ? AND key = ?', (namespace, key))
+        self.stats.record_cache(namespace, False)
+        return None
+    
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        if value is None:
+            return
+        now = time.time()
+        self.conn.execute(
+            'INSERT OR REPLACE INTO cache (namespace, key, value, expires, accessed) VALUES (?, ?, ?, ?, ?)',
+            (namespace, key, json.dumps(value), now + ttl, now)
+        )
+        self.writes += 1
+        if self.writes % self.EVICT_EVERY == 0:
+            self.evict()
+    
+    def evict(self):
+        """Drop expired entries, then least recently used ones above the entry and byte caps"""
+        self.conn.execute('DELETE FROM cache WHERE expires < ?', (time.time(),))
+        count = self.conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                'DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY accessed LIMIT ?)',
+                (count - self.max_entries,)
+            )
+        for prefix, max_bytes in self.byte_limits.items():
+            # Keep the most recently used entries whose running total fits in max_bytes
+            self.conn.execute(
+                'DELETE FROM cache WHERE rowid IN ('
+                'SELECT rowid FROM (SELECT rowid, SUM(LENGTH(value)) OVER (ORDER BY accessed DESC) AS used '
+                'FROM cache WHERE substr(namespace, 1, ?) = ?) WHERE used > ?)',
+                (len(prefix), prefix, max_bytes)
+            )
+    
+    def close(self):
+        self.evict()
+        self.conn.close()
+
+
+# ============================================
+# DOMAIN CACHE
+# ============================================
+class DomainCache:
+    """Per-domain results shared by WebIntel and EmailIntelligence
+    
+    Chains and agencies list one website under many places, so results are
+    keyed by registrable domain, persisted in DiskCache and single-flighted
+    within a run.
+    """
+    # Public suffixes with two labels that we actually see in UK/US listings
+    MULTI_LABEL_SUFFIXES = {
+        'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'ltd.uk', 'plc.uk', 'me.uk', 'net.uk',
+        'com.au', 'net.au', 'org.au', 'co.nz', 'co.za', 'com.br', 'com.mx', 'co.in', 'co.jp',
+    }
+    # Hosting platforms: every business gets a subdomain or path of the same domain
+    PLATFORM_DOMAINS = {
+        'facebook.com', 'instagram.com', 'linktr.ee', 'google.com', 'business.site', 'wixsite.com',
+        'squarespace.com', 'weebly.com', 'wordpress.com', 'blogspot.com', 'godaddysites.com',
+        'square.site', 'webflow.io', 'carrd.co', 'github.io', 'yell.com', 'fresha.com', 'booksy.com',
+        'treatwell.co.uk', 'opentable.com', 'yelp.com', 'tripadvisor.com', 'tripadvisor.co.uk',
+    }
+    
+    def __init__(self, cache: DiskCache, ttl: float):
+        self.cache = cache
+        self.ttl = ttl
+        self.inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+    
+    @classmethod
+    def registrable_domain(cls, url: str) -> str:
+        """'https://www.Shop.Example.co.uk/x' -> 'example.co.uk'"""
+        host = urlparse(url if '//' in url else f'//{url}').hostname or ''
+        labels = [label for label in host.lower().rstrip('.').split('.') if label]
+        if len(labels) < 2 or ':' in host or host.replace('.', '').isdigit():
+            # Single label or IP address
+            return host.lower()
+        size = 3 if '.'.join(labels[-2:]) in cls.MULTI_LABEL_SUFFIXES else 2
+        return '.'.join(labels[-size:])
+    
+    @classmethod
+    def is_platform(cls, url: str) -> bool:
+        return cls.registrable_domain(url) in cls.PLATFORM_DOMAINS
+    
+    @classmethod
+    def key_for(cls, url: str) -> str:
+        """Registrable domain, or host + path for sites hosted on a shared platform"""
+        domain = cls.registrable_domain(url)
+        if domain in cls.PLATFORM_DOMAINS:
+            parsed = urlparse(url if '//' in url else f'//{url}')
+            return f"{(parsed.hostname or '').lower()}{parsed.path.rstrip('/').lower()}"
+        return domain
+    
+    async def fetch(self, kind: str, key: str, fetcher: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Cached result for (kind, key), calling fetcher at most once per key at a time"""
+        if not key:
+            return await fetcher()
+        
+        namespace = f'domain_{kind}'
+        cached = self.cache.get(namespace, key)
+        if cached is not None:
+            return cached
+        
+        flight = (kind, key)
+        future = self.inflight.get(flight)
+        if future is None:
+            future = asyncio.ensure_future(fetcher())
+            self.inflight[flight] = future
+            future.add_done_callback(lambda f: self._landed(namespace, key, flight, f))
+        
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            return None
+    
+    def _landed(self, namespace: str, key: str, flight: Tuple[str, str], future: asyncio.Future):
+        self.inflight.pop(flight, None)
+        if not future.cancelled() and future.exception() is None and future.result() is not None:
+            self.cache.set(namespace, key, future.result(), self.ttl)
+
+
+# ============================================
+# CHECKPOINT JOURNAL
+# ============================================
+class CheckpointJournal:
+    """Append-only JSONL journal of finished place_ids and accepted leads
+    
+    One record per line: {"type": "processed"|"lead", "phase": "voxmill_UK", ...}.
+    Writes go through a buffered stream; it is flushed and fsynced every
+    CHECKPOINT_INTERVAL accepted leads or JOURNAL_FSYNC_SECONDS, whichever
+    comes first, so a crash loses at most one interval. The stream is only
+    touched on the event loop; just the fsync runs in a thread.
+    """
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        if not resume and os.path.exists(path):
+            os.replace(path, path + '.prev')
+        torn = resume and self._ends_torn(path)
+        self.fh = open(path, 'a', encoding='utf-8')
+        if torn:
+            # Start on a fresh line, or the first record would be glued onto the fragment
+            self.fh.write('\n')
+        self.pending_leads = 0
+        self.last_sync = time.monotonic()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='journal')
+        self.syncing: Optional[Future] = None
+    
+    @staticmethod
+    def _ends_torn(path: str) -> bool:
+        """True if the file is non-empty and its last line has no newline (crash mid-write)"""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return False
+        with open(path, 'rb') as fh:
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) != b'\n'
+    
+    @staticmethod
+    def load(path: str) -> Tuple[Set[str], Dict[str, List[Dict]]]:
+        """Rebuild (processed place_ids, accepted leads per phase) from a journal"""
+        processed: Set[str] = set()
+        leads: Dict[str, List[Dict]] = defaultdict(list)
+        if not os.path.exists(path):
+            return processed, leads
+        
+        with open(path, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-write
+                    continue
+                if record.get('place_id'):
+                    processed.add(record['place_id'])
+                if record.get('type') == 'lead':
+                    leads[record['phase']].append(record['lead'])
+        return processed, leads
+    
+    def record_processed(self, phase: str, place_id: str):
+        self._write({'type': 'processed', 'phase': phase, 'place_id': place_id})
+    
+    def record_lead(self, phase: str, lead: Dict):
+        self._write({'type': 'lead', 'phase': phase, 'place_id': lead.get('place_id', ''), 'lead': lead})
+        self.pending_leads += 1
+        if self.pending_leads >= Config.CHECKPOINT_INTERVAL:
+            self.checkpoint()
+    
+    def _write(self, record: Dict):
+        self.fh.write(json.dumps(record, default=str) + '\n')
+        if time.monotonic() - self.last_sync >= Config.JOURNAL_FSYNC_SECONDS:
+            self.checkpoint()
+    
+    def checkpoint(self):
+        """Flush here, fsync in a thread so the event loop never blocks on disk"""
+        self.pending_leads = 0
+        self.last_sync = time.monotonic()
+        # TextIOWrapper is not thread-safe: the flush stays on the loop thread
+        self.fh.flush()
+        if self.syncing:
+            # The next checkpoint (or close) syncs what this flush wrote
+            return
+        self.syncing = self.executor.submit(os.fsync, self.fh.fileno())
+        asyncio.wrap_future(self.syncing).add_done_callback(self._synced)
+    
+    def _synced(self, future: asyncio.Future):
+        self.syncing = None
+        if future.exception():
+            logger.error(f"❌ Journal sync failed: {future.exception()}")
+    
+    def close(self):
+        if self.fh.closed:
+            return
+        # Wait for an fsync in flight before the descriptor goes away
+        self.executor.shutdown(wait=True)
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
+        self.fh.close()
+    
+    def retire(self):
+        """Close and move the journal to .prev once its run is exported, so --resume starts a new run"""
+        self.close()
+        os.replace(self.path, self.path + '.prev')
 
 
 # ============================================
 # GOOGLE PLACES
 # ============================================
 class GooglePlaces:
-    def __init__(self, stats: StatsTracker):
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter, cache: Optional[DiskCache] = None):
         self.stats = stats
+        self.limiter = limiter
+        self.cache = cache
     
-    @retry_on_failure(max_attempts=3)
+    @retry_on_failure(max_attempts=3, api='google_places', fallback=list)
     async def search(self, session: aiohttp.ClientSession, query: str, location: str) -> List[Dict]:
         try:
-            url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-            params = {'query': f"{query} in {location}", 'key': Config.GOOGLE_PLACES_API}
-            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as r:
-                if r.status == 200:
+            url = f"{Config.PLACES_URL}/maps/api/place/textsearch/json"
+            params = {'query': f"{query} in {location}"}
+            # Raw results are cached so a threshold change still reuses them
+            cache_key = DiskCache.make_key(url, params)
+            results = self.cache.get('places_search', cache_key) if self.cache else None
+            
+            if results is None:
+                async with self.limiter.slot('google_places'), session.get(url, params={**params, 'key': Config.GOOGLE_PLACES_API}, timeout=aiohttp.ClientTimeout(total=10)) as r:
+                    check_response(r)
+                    if r.status != 200:
+                        self.stats.record_failure('google_places_search')
+                        return []
                     data = await r.json()
+                    GooglePlaces.check_quota(data)
                     results = data.get('results', [])
-                    filtered = [
-                        x for x in results 
-                        if x.get('user_ratings_total', 0) >= Config.MIN_REVIEWS 
-                        and x.get('rating', 0) >= Config.MIN_RATING
-                    ]
                     self.stats.record_success('google_places_search')
-                    await asyncio.sleep(Config.REQUEST_DELAY)
-                    return filtered[:15]
-                else:
-                    self.stats.record_failure('google_places_search')
-                    return []
+                    if self.cache and data.get('status') in ('OK', 'ZERO_RESULTS'):
+                        self.cache.set('places_search', cache_key, results, Config.PLACES_SEARCH_TTL)
+            
+            filtered = [
+                x for x in results 
+                if x.get('user_ratings_total', 0) >= Config.MIN_REVIEWS 
+                and x.get('rating', 0) >= Config.MIN_RATING
+            ]
+            return filtered[:15]
         except Exception as e:
             self.stats.record_failure('google_places_search')
             raise
     
-    @retry_on_failure(max_attempts=3)
+    @retry_on_failure(max_attempts=3, api='google_places')
     async def details(self, session: aiohttp.ClientSession, place_id: str) -> Optional[Dict]:
         try:
-            url = "https://maps.googleapis.com/maps/api/place/details/json"
+            url = f"{Config.PLACES_URL}/maps/api/place/details/json"
             params = {
                 'place_id': place_id,
                 'fields': 'name,formatted_address,formatted_phone_number,international_phone_number,website,rating,user_ratings_total,opening_hours,url,types,reviews,geometry',
-                'key': Config.GOOGLE_PLACES_API
             }
-            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as r:
+            cache_key = DiskCache.make_key(url, params)
+            if self.cache:
+                cached = self.cache.get('places_details', cache_key)
+                if cached is not None:
+                    return cached
+            
+            async with self.limiter.slot('google_places'), session.get(url, params={**params, 'key': Config.GOOGLE_PLACES_API}, timeout=aiohttp.ClientTimeout(total=10)) as r:
+                check_response(r)
                 if r.status == 200:
                     data = await r.json()
+                    GooglePlaces.check_quota(data)
                     self.stats.record_success('google_places_details')
-                    await asyncio.sleep(Config.REQUEST_DELAY)
-                    return data.get('result')
+                    result = data.get('result')
+                    if self.cache and data.get('status') == 'OK':
+                        self.cache.set('places_details', cache_key, result, Config.PLACES_DETAILS_TTL)
+                    return result
                 else:
                     self.stats.record_failure('google_places_details')
                     return None
         except Exception as e:
             self.stats.record_failure('google_places_details')
             raise
+    
+    @staticmethod
+    def check_quota(data: Dict):
+        """Places reports rate limiting and rejected keys as HTTP 200 with an error status"""
+        if data.get('status') == 'OVER_QUERY_LIMIT':
+            raise RetryableError('OVER_QUERY_LIMIT')
+        if data.get('status') == 'REQUEST_DENIED':
+            raise ProviderError(f"REQUEST_DENIED: {data.get('error_message', '')}")
 
 
 # ============================================
 # HUNTER.IO + APOLLO FALLBACK
 # ============================================
 class EmailIntelligence:
-    def __init__(self, stats: StatsTracker):
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter, domains: Optional[DomainCache] = None):
         self.stats = stats
+        self.limiter = limiter
+        self.domains = domains
     
-    @retry_on_failure(max_attempts=2)
     async def hunter_find(self, session: aiohttp.ClientSession, domain: str) -> Optional[Dict]:
         if not Config.HUNTER_API or not domain:
             return None
+        # A platform domain (facebook.com, wixsite.com...) would return the platform's staff
+        if DomainCache.is_platform(domain):
+            return None
+        
+        clean = DomainCache.registrable_domain(domain)
+        if self.domains:
+            result = await self.domains.fetch('hunter', clean, lambda: self._hunter_search(session, clean))
+        else:
+            result = await self._hunter_search(session, clean)
+        # {} means Hunter answered with no emails (cached, so not asked again)
+        return result or None
+    
+    @retry_on_failure(max_attempts=2, api='hunter_io')
+    async def _hunter_search(self, session: aiohttp.ClientSession, clean: str) -> Optional[Dict]:
         try:
-            clean = urlparse(domain).netloc or domain
-            clean = clean.replace('www.', '')
-            url = f"https://api.hunter.io/v2/domain-search?domain={clean}&api_key={Config.HUNTER_API}&limit=3"
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=8)) as r:
+            url = f"{Config.HUNTER_URL}/v2/domain-search?domain={clean}&api_key={Config.HUNTER_API}&limit=3"
+            async with self.limiter.slot('hunter_io'), session.get(url, timeout=aiohttp.ClientTimeout(total=8)) as r:
+                check_response(r)
                 if r.status == 200:
                     data = await r.json()
                     emails = data.get('data', {}).get('emails', [])
                     if emails:
                         best = max(emails, key=lambda x: x.get('confidence', 0) + (30 if x.get('verification', {}).get('status') == 'valid' else 0))
                         self.stats.record_success('hunter_io')
-                        await asyncio.sleep(0.4)
                         return {
                             'email': best.get('value', ''),
                             'confidence': best.get('confidence', 0),
@@ -242,24 +1580,23 @@ class EmailIntelligence:
                             'position': best.get('position', ''),
                             'department': best.get('department', '')
                         }
+                    self.stats.record_failure('hunter_io')
+                    return {}
             self.stats.record_failure('hunter_io')
             return None
-        except:
+        except Exception as e:
             self.stats.record_failure('hunter_io')
+            if is_provider_failure(e):
+                raise
             return None
     
-    @retry_on_failure(max_attempts=2)
     async def apollo_find(self, session: aiohttp.ClientSession, domain: str) -> Optional[Dict]:
         if not Config.APOLLO_API or not domain:
             return None
-        try:
-            # Apollo.io API would go here
-            # Placeholder for now
-            self.stats.record_failure('apollo_io')
-            return None
-        except:
-            self.stats.record_failure('apollo_io')
-            return None
+        # Apollo.io API would go here, as a @retry_on_failure(api='apollo_io') request like _hunter_search
+        # Placeholder for now
+        self.stats.record_failure('apollo_io')
+        return None
     
     async def find_verified_email(self, session: aiohttp.ClientSession, domain: str) -> Dict:
         """Try Hunter first, fallback to Apollo"""
@@ -279,101 +1616,195 @@ class EmailIntelligence:
         return {}
 
 
+# ============================================
+# HTML SIGNAL EXTRACTOR
+# ============================================
+class HtmlSignals:
+    """Emails, social handles, tech fingerprints and copyright year from raw HTML
+    
+    All patterns are compiled once. Every pattern starts with a literal
+    ('@', 'instagram.com/', '©'...), which lets the regex engine skip through
+    the page at memchr speed; a single alternation regex loses that prefilter
+    and benchmarks several times slower in CPython (see benchmarks/bench_html.py).
+    Case-insensitive fingerprints share one lowercase copy of the page.
+    """
+    # (tech, markers, case_sensitive) - extend with register_fingerprint()
+    TECH_FINGERPRINTS: List[Tuple[str, List[str], bool]] = [
+        ('WordPress', ['wp-content', 'wp-includes'], True),
+        ('Shopify', ['shopify'], False),
+        ('Wix', ['wix.com'], False),
+        ('Squarespace', ['squarespace'], False),
+        ('Google Analytics', ['google-analytics', 'gtag', 'analytics.js'], True),
+        ('Facebook Pixel', ['fbevents.js', 'facebook-pixel'], True),
+        ('HubSpot', ['hubspot'], False),
+        ('Mailchimp', ['mailchimp'], False),
+    ]
+    SOCIAL_PATTERNS = [
+        ('instagram', re.compile(r'instagram\.com/([a-zA-Z0-9._]+)')),
+        ('facebook', re.compile(r'facebook\.com/([a-zA-Z0-9.]+)')),
+        ('linkedin', re.compile(r'linkedin\.com/company/([a-zA-Z0-9-]+)')),
+        ('twitter', re.compile(r'twitter\.com/([a-zA-Z0-9_]+)')),
+    ]
+    # Anchored on '@'; the local part is walked back by hand (see _emails)
+    EMAIL_DOMAIN = re.compile(r'@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+    EMAIL_LOCAL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+    EMAIL_BLOCKLIST = ['example', 'test', 'noreply', 'wordpress', 'wix']
+    COPYRIGHT = re.compile(r'©\s*(\d{4})')
+    
+    @classmethod
+    def register_fingerprint(cls, tech: str, markers: List[str], case_sensitive: bool = False):
+        """Add a tech fingerprint (markers are plain substrings)"""
+        if not case_sensitive:
+            markers = [m.lower() for m in markers]
+        cls.TECH_FINGERPRINTS.append((tech, markers, case_sensitive))
+    
+    @classmethod
+    def extract(cls, html: str) -> Dict:
+        """{'emails': [...], 'socials': {...}, 'tech': [...], 'copyright': 'YYYY' or ''}"""
+        lowered = html.lower()
+        
+        socials = {}
+        for network, pattern in cls.SOCIAL_PATTERNS:
+            match = pattern.search(html)
+            if match:
+                socials[network] = match.group(1)
+        
+        tech = [
+            name for name, markers, case_sensitive in cls.TECH_FINGERPRINTS
+            if any(marker in (html if case_sensitive else lowered) for marker in markers)
+        ]
+        
+        copyright_match = cls.COPYRIGHT.search(html)
+        
+        return {
+            'emails': cls._emails(html),
+            'socials': socials,
+            'tech': tech,
+            'copyright': copyright_match.group(1) if copyright_match else '',
+        }
+    
+    @classmethod
+    def extract_body(cls, body: bytes, charset: Optional[str]) -> Dict:
+        """Decode + extract in one call, so CpuPool ships raw bytes to the worker"""
+        try:
+            html = body.decode(charset or 'utf-8', errors='replace')
+        except LookupError:
+            html = body.decode('utf-8', errors='replace')
+        return cls.extract(html)
+    
+    @classmethod
+    def _emails(cls, html: str) -> List[str]:
+        """Same matches as re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'), minus blocklisted ones"""
+        emails = []
+        last_end = 0
+        local_chars = cls.EMAIL_LOCAL_CHARS
+        for match in cls.EMAIL_DOMAIN.finditer(html):
+            start = match.start()
+            # findall never re-reads text consumed by the previous match
+            while start > last_end and html[start - 1] in local_chars:
+                start -= 1
+            if start == match.start():
+                continue
+            last_end = match.end()
+            email = html[start:last_end]
+            if not any(x in email.lower() for x in cls.EMAIL_BLOCKLIST):
+                emails.append(email)
+        return emails
+
+
 # ============================================
 # WEB INTELLIGENCE
 # ============================================
 class WebIntel:
-    def __init__(self, stats: StatsTracker):
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter, domains: Optional[DomainCache] = None,
+                 cpu: Optional[CpuPool] = None):
         self.stats = stats
+        self.limiter = limiter
+        self.domains = domains
+        self.cpu = cpu or CpuPool(0)
     
-    @retry_on_failure(max_attempts=2)
     async def analyze(self, session: aiohttp.ClientSession, website: str) -> Dict:
         if not website or website == 'No website':
             return {'email': '', 'socials': {}, 'tech': [], 'ssl': 'No', 'mobile': 'Unknown', 'copyright': ''}
         
+        if self.domains:
+            result = await self.domains.fetch('web', DomainCache.key_for(website), lambda: self._scrape(session, website))
+        else:
+            result = await self._scrape(session, website)
+        
+        if not result:
+            return {'email': '', 'socials': {}, 'tech': [], 'ssl': 'Unknown', 'mobile': 'Unknown', 'copyright': ''}
+        # SSL belongs to the listed URL, not the domain shared with other listings
+        return {**result, 'ssl': 'Yes' if website.startswith('https') else 'No'}
+    
+    @retry_on_failure(max_attempts=2, api='web_scraping')
+    async def _scrape(self, session: aiohttp.ClientSession, website: str) -> Optional[Dict]:
         try:
-            async with session.get(website, timeout=aiohttp.ClientTimeout(total=10), allow_redirects=True) as r:
+            async with self.limiter.slot('web_scraping'), session.get(website, timeout=aiohttp.ClientTimeout(total=10), allow_redirects=True) as r:
+                check_retryable(r)
                 if r.status == 200:
-                    html = await r.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Email
-                    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', html)
-                    clean_emails = [e for e in emails if not any(x in e.lower() for x in ['example', 'test', 'noreply', 'wordpress', 'wix'])]
-                    
-                    # Socials
-                    socials = {}
-                    ig = re.search(r'instagram\.com/([a-zA-Z0-9._]+)', html)
-                    if ig:
-                        socials['instagram'] = ig.group(1)
-                    fb = re.search(r'facebook\.com/([a-zA-Z0-9.]+)', html)
-                    if fb:
-                        socials['facebook'] = fb.group(1)
-                    li = re.search(r'linkedin\.com/company/([a-zA-Z0-9-]+)', html)
-                    if li:
-                        socials['linkedin'] = li.group(1)
-                    tw = re.search(r'twitter\.com/([a-zA-Z0-9_]+)', html)
-                    if tw:
-                        socials['twitter'] = tw.group(1)
-                    
-                    # Tech stack
-                    tech = []
-                    if 'wp-content' in html or 'wp-includes' in html:
-                        tech.append('WordPress')
-                    if 'shopify' in html.lower():
-                        tech.append('Shopify')
-                    if 'wix.com' in html.lower():
-                        tech.append('Wix')
-                    if 'squarespace' in html.lower():
-                        tech.append('Squarespace')
-                    if 'google-analytics' in html or 'gtag' in html or 'analytics.js' in html:
-                        tech.append('Google Analytics')
-                    if 'fbevents.js' in html or 'facebook-pixel' in html:
-                        tech.append('Facebook Pixel')
-                    if 'hubspot' in html.lower():
-                        tech.append('HubSpot')
-                    if 'mailchimp' in html.lower():
-                        tech.append('Mailchimp')
-                    
-                    # Copyright year
-                    copyright_match = re.search(r'©\s*(\d{4})', html)
-                    copyright_year = copyright_match.group(1) if copyright_match else ''
-                    
+                    body = await self._read_body(r, website)
+                    if body is None:
+                        # PDF/video/etc: nothing to scrape, and nothing to retry
+                        self.stats.record_success('web_scraping')
+                        return {'email': '', 'socials': {}, 'tech': [], 'mobile': 'Unknown', 'copyright': ''}
+                    signals = await self.cpu.run(HtmlSignals.extract_body, body, r.charset)
                     self.stats.record_success('web_scraping')
-                    await asyncio.sleep(0.2)
                     
                     return {
-                        'email': clean_emails[0] if clean_emails else '',
-                        'socials': socials,
-                        'tech': tech,
+                        'email': signals['emails'][0] if signals['emails'] else '',
+                        'socials': signals['socials'],
+                        'tech': signals['tech'],
                         'ssl': 'Yes' if website.startswith('https') else 'No',
                         'mobile': 'Yes',
-                        'copyright': copyright_year
+                        'copyright': signals['copyright']
                     }
-        except:
             self.stats.record_failure('web_scraping')
-            pass
+        except Exception as e:
+            self.stats.record_failure('web_scraping')
+            if is_provider_failure(e):
+                raise
         
-        return {'email': '', 'socials': {}, 'tech': [], 'ssl': 'Unknown', 'mobile': 'Unknown', 'copyright': ''}
+        return None
+    
+    async def _read_body(self, r: aiohttp.ClientResponse, website: str) -> Optional[bytes]:
+        """Stream at most WEB_MAX_BYTES of an HTML body; None for non-HTML content"""
+        content_type = r.headers.get('Content-Type', '').lower()
+        if content_type and not content_type.startswith(Config.WEB_CONTENT_TYPES):
+            return None
+        
+        body = bytearray()
+        async for chunk in r.content.iter_chunked(Config.WEB_CHUNK_BYTES):
+            body.extend(chunk)
+            if len(body) >= Config.WEB_MAX_BYTES:
+                # Leaving the response unread closes the connection instead of draining it
+                del body[Config.WEB_MAX_BYTES:]
+                break
+        self.stats.record_bytes(DomainCache.registrable_domain(website), len(body))
+        # Streamed reads bypass the session's chunk-received trace
+        self.stats.record_transfer('web_scraping', bytes_in=len(body))
+        return bytes(body)
 
 
 # ============================================
 # INSTAGRAM
 # ============================================
 class InstagramClient:
-    def __init__(self, stats: StatsTracker):
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter):
         self.stats = stats
+        self.limiter = limiter
     
-    @retry_on_failure(max_attempts=2)
+    @retry_on_failure(max_attempts=2, api='instagram', fallback=dict)
     async def get_profile(self, session: aiohttp.ClientSession, handle: str) -> Dict:
         if not handle:
             return {}
         try:
             handle = handle.replace('@', '').strip('/')
-            url = "https://instagram-scraper-api2.p.rapidapi.com/v1/info"
+            url = f"{Config.INSTAGRAM_URL}/v1/info"
             headers = {"X-RapidAPI-Key": Config.INSTAGRAM_KEY, "X-RapidAPI-Host": "instagram-scraper-api2.p.rapidapi.com"}
             params = {"username_or_id_or_url": handle}
-            async with session.get(url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=8)) as r:
+            async with self.limiter.slot('instagram'), session.get(url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=8)) as r:
+                check_response(r)
                 if r.status == 200:
                     data = await r.json()
                     user = data.get('data', {})
@@ -381,7 +1812,6 @@ class InstagramClient:
                     posts = user.get('media_count', 0)
                     engagement = round(min((posts * 80) / max(followers, 1) * 100, 20), 2) if followers > 0 else 0
                     self.stats.record_success('instagram')
-                    await asyncio.sleep(0.2)
                     return {
                         'followers': followers,
                         'posts': posts,
@@ -390,8 +1820,10 @@ class InstagramClient:
                         'bio': user.get('biography', '')[:200]
                     }
             self.stats.record_failure('instagram')
-        except:
+        except Exception as e:
             self.stats.record_failure('instagram')
+            if is_provider_failure(e):
+                raise
         return {}
 
 
@@ -399,32 +1831,35 @@ class InstagramClient:
 # YELP
 # ============================================
 class YelpClient:
-    def __init__(self, stats: StatsTracker):
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter):
         self.stats = stats
+        self.limiter = limiter
     
-    @retry_on_failure(max_attempts=2)
+    @retry_on_failure(max_attempts=2, api='yelp')
     async def search(self, session: aiohttp.ClientSession, name: str, location: str) -> Optional[Dict]:
         if not Config.YELP_API:
             return None
         try:
-            url = "https://api.yelp.com/v3/businesses/search"
+            url = f"{Config.YELP_URL}/v3/businesses/search"
             headers = {'Authorization': f'Bearer {Config.YELP_API}'}
             params = {'term': name, 'location': location, 'limit': 1}
-            async with session.get(url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=8)) as r:
+            async with self.limiter.slot('yelp'), session.get(url, headers=headers, params=params, timeout=aiohttp.ClientTimeout(total=8)) as r:
+                check_response(r)
                 if r.status == 200:
                     data = await r.json()
                     biz = data.get('businesses', [])
                     if biz:
                         self.stats.record_success('yelp')
-                        await asyncio.sleep(Config.REQUEST_DELAY)
                         return {
                             'rating': biz[0].get('rating', 0),
                             'review_count': biz[0].get('review_count', 0),
                             'price': biz[0].get('price', '')
                         }
             self.stats.record_failure('yelp')
-        except:
+        except Exception as e:
             self.stats.record_failure('yelp')
+            if is_provider_failure(e):
+                raise
         return None
 
 
@@ -432,34 +1867,71 @@ class YelpClient:
 # COMPETITORS
 # ============================================
 class CompetitorFinder:
-    def __init__(self, stats: StatsTracker):
+    """Top competitors per lead, from one shared text search per (category, city)"""
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter, cache: Optional[DiskCache] = None):
         self.stats = stats
+        self.limiter = limiter
+        self.cache = cache
+        self.markets: Dict[Tuple[str, str], asyncio.Future] = {}
     
-    @retry_on_failure(max_attempts=2)
     async def find(self, session: aiohttp.ClientSession, name: str, category: str, city: str) -> List[Dict]:
+        key = (category.lower().strip(), city.lower().strip())
+        
+        # Single-flight: concurrent leads in the same market await one request
+        market = self.markets.get(key)
+        if market is None:
+            market = asyncio.ensure_future(self._market(session, category, city))
+            self.markets[key] = market
+        
+        try:
+            candidates = await asyncio.shield(market)
+        except Exception:
+            candidates = None
+        if candidates is None:
+            # Failed fetches are not memoized, the next lead tries again
+            if self.markets.get(key) is market:
+                del self.markets[key]
+            return []
+        
+        return [c for c in candidates if c['name'].lower() != name.lower()][:5]
+    
+    @retry_on_failure(max_attempts=2, api='google_places')
+    async def _market(self, session: aiohttp.ClientSession, category: str, city: str) -> Optional[List[Dict]]:
+        """All candidates for the market, best first"""
         try:
-            url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-            params = {'query': f"{category} in {city}", 'key': Config.GOOGLE_PLACES_API}
-            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as r:
+            url = f"{Config.PLACES_URL}/maps/api/place/textsearch/json"
+            params = {'query': f"{category} in {city}"}
+            cache_key = DiskCache.make_key(url, params)
+            if self.cache:
+                cached = self.cache.get('competitors', cache_key)
+                if cached is not None:
+                    return cached
+            
+            async with self.limiter.slot('google_places'), session.get(url, params={**params, 'key': Config.GOOGLE_PLACES_API}, timeout=aiohttp.ClientTimeout(total=10)) as r:
+                check_response(r)
                 if r.status == 200:
                     data = await r.json()
+                    GooglePlaces.check_quota(data)
                     results = data.get('results', [])
-                    comps = []
-                    for result in results:
-                        n = result.get('name', '')
-                        if n.lower() != name.lower():
-                            comps.append({
-                                'name': n,
-                                'rating': result.get('rating', 0),
-                                'reviews': result.get('user_ratings_total', 0)
-                            })
+                    comps = [
+                        {
+                            'name': result.get('name', ''),
+                            'rating': result.get('rating', 0),
+                            'reviews': result.get('user_ratings_total', 0)
+                        }
+                        for result in results
+                    ]
                     comps.sort(key=lambda x: (x['rating'], x['reviews']), reverse=True)
                     self.stats.record_success('competitors')
-                    await asyncio.sleep(Config.REQUEST_DELAY)
-                    return comps[:5]
-        except:
+                    if self.cache and data.get('status') in ('OK', 'ZERO_RESULTS'):
+                        self.cache.set('competitors', cache_key, comps, Config.PLACES_SEARCH_TTL)
+                    return comps
+            self.stats.record_failure('competitors')
+        except Exception as e:
             self.stats.record_failure('competitors')
-        return []
+            if is_provider_failure(e):
+                raise
+        return None
 
 
 # ============================================
@@ -469,13 +1941,316 @@ class CompetitorFinder:
 # AI PIPELINE (4 MODELS)
 # ============================================
 
+class LLMCache:
+    """Content-addressed cache of AI completions
+    
+    Keyed by provider, model and a hash of system prompt + user content +
+    generation params, so any prompt change is a miss. The raw response text
+    is stored (namespace llm_<provider>) and each client parses it as usual.
+    """
+    def __init__(self, cache: Optional[DiskCache], ttl: float):
+        self.cache = cache
+        self.ttl = ttl
+    
+    @staticmethod
+    def make_key(model: str, system: str, user: str, params: Dict) -> str:
+        raw = json.dumps([model, system, user, params], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    async def complete(self, provider: str, model: str, system: str, user: str, params: Dict,
+                       call: Callable[[], Awaitable[Optional[str]]], cacheable: bool = True,
+                       ttl: Optional[float] = None, validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """Cached completion text, or call() on a miss (empty or invalid responses aren't stored)"""
+        if self.cache is None or not cacheable:
+            return await call()
+        
+        cached = self.get(provider, model, system, user, params)
+        if cached is not None:
+            return cached
+        
+        content = await call()
+        if content and (validate is None or validate(content)):
+            self.put(provider, model, system, user, params, content, ttl)
+        return content
+    
+    def get(self, provider: str, model: str, system: str, user: str, params: Dict) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.get(f'llm_{provider}', self.make_key(model, system, user, params))
+    
+    def put(self, provider: str, model: str, system: str, user: str, params: Dict, content: Optional[str],
+            ttl: Optional[float] = None):
+        if self.cache is not None and content:
+            self.cache.set(f'llm_{provider}', self.make_key(model, system, user, params), content, ttl or self.ttl)
+
+
+class MicroBatcher:
+    """Groups single requests into batches of up to max_size, waiting at most window seconds
+    
+    submit(key, item) resolves to batch_fn's result for that key; keys the
+    batch function leaves out (or a batch that raises) resolve to None, so the
+    caller can fall back to a single request. batch_fn returns None when the
+    request itself failed for good (its retry policy gave up); every key then
+    resolves to FAILED, since N single requests would only add load to a
+    provider that is already throttling or down.
+    """
+    FAILED = object()
+    
+    def __init__(self, batch_fn: Callable[[List[Tuple[str, Any]]], Awaitable[Optional[Dict[str, Any]]]],
+                 max_size: int, window: float):
+        self.batch_fn = batch_fn
+        self.max_size = max_size
+        self.window = window
+        self.pending: List[Tuple[str, Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.running: Set[asyncio.Task] = set()
+    
+    async def submit(self, key: str, item: Any) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((key, item, future))
+        if len(self.pending) >= self.max_size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self._flush)
+        return await future
+    
+    def _flush(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+    
+    async def _run(self, batch: List[Tuple[str, Any, asyncio.Future]]):
+        try:
+            results = await self.batch_fn([(key, item) for key, item, _ in batch])
+        except Exception as e:
+            logger.warning(f"⚠️ Batch of {len(batch)} failed, falling back to single requests: {e}")
+            results = {}
+        for key, _, future in batch:
+            if not future.done():
+                future.set_result(self.FAILED if results is None else results.get(key))
+    
+    @staticmethod
+    def split_results(content: Optional[str], keys: Set[str], schema: Dict[str, Any]) -> Dict[str, Dict]:
+        """{place_id: result} from a JSON array of objects that carry their place_id
+        
+        Objects that fail the schema are left out, so those leads fall back to single requests.
+        """
+        data = StructuredOutput.extract(content)
+        if isinstance(data, dict):
+            # {"businesses": [...]} or {"<place_id>": {...}, ...}
+            arrays = [value for value in data.values() if isinstance(value, list)]
+            if len(arrays) != 1:
+                data = [{**value, 'place_id': key} for key, value in data.items() if key in keys and isinstance(value, dict)]
+            else:
+                data = arrays[0]
+        if not isinstance(data, list):
+            return {}
+        
+        results = {}
+        for item in data:
+            if isinstance(item, dict) and item.get('place_id') in keys:
+                result = StructuredOutput.validate({k: v for k, v in item.items() if k != 'place_id'}, schema)[0]
+                if result is not None:
+                    results[item['place_id']] = result
+        return results
+
+
+class ModelRouter:
+    """Model cascade per provider and lead, from Config.MODEL_TIERS / MODEL_ROUTING"""
+    
+    @staticmethod
+    def tier(lead: Dict, lead_type: str) -> str:
+        route = Config.MODEL_ROUTING.get(lead_type)
+        if not route:
+            return 'hot'
+        return 'hot' if lead.get(route['score'], 0) >= route['hot_at'] else 'standard'
+    
+    @staticmethod
+    def cascade(provider: str, tier: str) -> List[str]:
+        """Models to try in order: hot leads get the hot model, the rest escalate to it"""
+        tiers = Config.MODEL_TIERS[provider]
+        models = [tiers['hot']] if tier == 'hot' else [tiers['standard'], tiers['hot']]
+        return list(dict.fromkeys(models))
+
+
+class StructuredOutput:
+    """JSON objects out of model text, checked against a small per-call schema
+    
+    A schema maps each required key to str, list, float (any number) or a tuple of
+    accepted types. Near misses are coerced (a list where text was asked for is
+    joined, "70%" becomes 70); anything else is reported as a problem so the
+    caller can ask for a repair instead of a full regeneration.
+    """
+    FENCE = re.compile(r'```(?:json)?\s*(.*?)```', re.S | re.I)
+    NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+    TYPE_NAMES = {str: 'string', list: 'list of strings', float: 'number'}
+    
+    @classmethod
+    def extract(cls, text: Optional[str], opening: str = '{[') -> Any:
+        """First JSON value in text: bare, inside ``` fences, or surrounded by prose"""
+        if not text:
+            return None
+        for candidate in [text.strip()] + cls.FENCE.findall(text):
+            try:
+                return json.loads(candidate)
+            except ValueError:
+                pass
+        decoder = json.JSONDecoder()
+        for match in re.finditer(f'[{re.escape(opening)}]', text):
+            try:
+                return decoder.raw_decode(text, match.start())[0]
+            except ValueError:
+                continue
+        return None
+    
+    @classmethod
+    def check(cls, text: Optional[str], schema: Dict[str, Any]) -> Tuple[Optional[Dict], List[str]]:
+        """(normalized object, []) when text holds a valid object, else (None, problems)"""
+        data = cls.extract(text, '{')
+        if not isinstance(data, dict):
+            return None, ['no JSON object found']
+        return cls.validate(data, schema)
+    
+    @classmethod
+    def validate(cls, data: Dict, schema: Dict[str, Any]) -> Tuple[Optional[Dict], List[str]]:
+        result, problems = dict(data), []
+        for key, kind in schema.items():
+            value = data.get(key)
+            if value in (None, '', [], {}):
+                problems.append(f'"{key}" is missing')
+                continue
+            value = cls._coerce(value, kind)
+            if value is None:
+                problems.append(f'"{key}" must be a {cls.describe_type(kind)}')
+            else:
+                result[key] = value
+        return (None, problems) if problems else (result, [])
+    
+    @classmethod
+    def _coerce(cls, value: Any, kind: Any) -> Any:
+        if isinstance(kind, tuple):
+            return value if isinstance(value, kind) else None
+        if kind is str:
+            if isinstance(value, list):
+                return '; '.join(str(item) for item in value)
+            if isinstance(value, dict):
+                return ' - '.join(str(item) for item in value.values())
+            return str(value)
+        if kind is list:
+            return value if isinstance(value, list) else [value] if isinstance(value, str) else None
+        if kind is float:
+            if isinstance(value, bool):
+                return None
+            if isinstance(value, (int, float)):
+                return value
+            match = cls.NUMBER.search(str(value))
+            if not match:
+                return None
+            number = float(match.group())
+            return int(number) if number.is_integer() else number
+        return value if isinstance(value, kind) else None
+    
+    @classmethod
+    def describe_type(cls, kind: Any) -> str:
+        if isinstance(kind, tuple):
+            return ' or '.join(cls.describe_type(k) for k in kind)
+        return cls.TYPE_NAMES.get(kind, getattr(kind, '__name__', str(kind)))
+    
+    @classmethod
+    def describe(cls, schema: Dict[str, Any]) -> str:
+        """Key list for prompts"""
+        return "\n".join(f"- {key}: {cls.describe_type(kind)}" for key, kind in schema.items())
+    
+    @classmethod
+    async def complete(cls, llm_cache: 'LLMCache', stats: StatsTracker, provider: str, models: List[str],
+                       system: str, user: str, params: Dict, schema: Dict[str, Any],
+                       post: Callable[[str, str, str, Dict], Awaitable[Optional[str]]],
+                       repair_params: Optional[Dict] = None, cacheable: bool = True,
+                       ttl: Optional[float] = None) -> Optional[Dict]:
+        """Schema-valid object from the first model in `models` that produces one
+        
+        post(model, system, user, params) makes the request. Invalid output gets one
+        repair-only request on the provider's standard model before escalating to
+        the next model; only valid (or repaired) output is cached.
+        """
+        def valid(text: str) -> bool:
+            return cls.check(text, schema)[0] is not None
+        
+        for model in models:
+            text = await llm_cache.complete(provider, model, system, user, params,
+                                            lambda: post(model, system, user, params), cacheable, ttl, valid)
+            if not text:
+                return None
+            
+            result, problems = cls.check(text, schema)
+            if result is None:
+                result = await cls.repair(stats, provider, text, problems, schema, post, repair_params or params)
+                if result is not None and cacheable:
+                    llm_cache.put(provider, model, system, user, params, json.dumps(result), ttl)
+            if result is not None:
+                return result
+            stats.record_escalation(model)
+        return None
+    
+    @classmethod
+    async def repair(cls, stats: StatsTracker, provider: str, text: str, problems: List[str], schema: Dict[str, Any],
+                     post: Callable[[str, str, str, Dict], Awaitable[Optional[str]]], params: Dict) -> Optional[Dict]:
+        """Ask the cheap model to restructure output it doesn't need to regenerate"""
+        model = Config.MODEL_TIERS[provider]['standard']
+        prompt = f"""Rewrite the output below as one JSON object with exactly these keys:
+{cls.describe(schema)}
+
+Problems: {'; '.join(problems)}
+
+Keep the content, only fix the structure. Reply with the JSON object only.
+
+Output:
+{text[:6000]}"""
+        try:
+            fixed = await post(model, '', prompt, params)
+        except Exception as e:
+            logger.warning(f"⚠️ Repair on {model} failed: {e}")
+            fixed = None
+        result = cls.check(fixed, schema)[0]
+        stats.record_repair(model, result is not None)
+        return result
+
+
 class OpenAIClient:
     """GPT-4 for pattern-breaking outreach"""
-    def __init__(self, stats: StatsTracker):
+    # Sheet column -> (JSON key, max chars). Freelance prompts fill the same slots with
+    # empathy / quick-win / social-proof / question messages.
+    COLUMNS = {
+        'outreach_pain_1': ('pain_1', 500),
+        'outreach_pain_2': ('pain_2', 500),
+        'outreach_pain_3': ('pain_3', 500),
+        'outreach_opp_1': ('opportunity_1', 500),
+        'outreach_opp_2': ('opportunity_2', 500),
+        'outreach_opp_3': ('opportunity_3', 500),
+        'outreach_comp_1': ('competitor_1', 500),
+        'outreach_comp_2': ('competitor_2', 500),
+        'outreach_shock_1': ('shock_1', 500),
+        'outreach_shock_2': ('shock_2', 500),
+        'email_subject': ('email_subject', 200),
+        'linkedin_request': ('linkedin_request', 300),
+        'sms_template': ('sms_template', 200),
+    }
+    SCHEMA = {key: str for key, _ in COLUMNS.values()}
+    
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter, llm_cache: Optional[LLMCache] = None):
         self.stats = stats
+        self.limiter = limiter
+        self.llm_cache = llm_cache or LLMCache(None, 0)
     
-    @retry_on_failure(max_attempts=2)
-    async def generate_outreach(self, session: aiohttp.ClientSession, lead: Dict, lead_type: str, insights: Dict) -> Dict:
+    @retry_on_failure(max_attempts=2, api='openai', fallback=dict)
+    async def generate_outreach(self, session: aiohttp.ClientSession, lead: Dict, lead_type: str, insights: Dict,
+                                tier: str = 'hot') -> Dict:
         if not Config.OPENAI_API:
             return {}
         
@@ -521,7 +2296,9 @@ Also generate:
 - 1 LinkedIn request (150 chars, personal not salesy)
 - 1 SMS (140 chars, direct question)
 
-Format as JSON."""
+Reply with only a JSON object: pain_1-3 for PAIN, opportunity_1-3 for OPPORTUNITY,
+competitor_1-2 for COMPETITOR, shock_1-2 for SHOCK/HUMOR, plus email_subject,
+linkedin_request and sms_template. Every value is a string."""
             else:
                 system_prompt = """You are an empathetic consultant helping struggling small businesses.
 
@@ -545,225 +2322,492 @@ Also generate:
 - 1 LinkedIn request (genuine connection)
 - 1 SMS (friendly question)
 
-Format as JSON."""
-            
-            url = "https://api.openai.com/v1/chat/completions"
-            headers = {"Authorization": f"Bearer {Config.OPENAI_API}", "Content-Type": "application/json"}
-            payload = {
-                "model": "gpt-4o",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": context}
-                ],
-                "temperature": 0.95,
-                "max_tokens": 1500,
-                "response_format": {"type": "json_object"}
-            }
+Reply with only a JSON object: pain_1-3 for EMPATHY + PAIN, opportunity_1-3 for QUICK WIN,
+competitor_1-2 for SOCIAL PROOF, shock_1-2 for DIRECT QUESTION, plus email_subject,
+linkedin_request and sms_template. Every value is a string."""
             
-            async with session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=30)) as r:
-                if r.status == 200:
-                    data = await r.json()
-                    content = data['choices'][0]['message']['content']
-                    result = json.loads(content)
-                    self.stats.record_success('openai_gpt4')
-                    await asyncio.sleep(1.0)
-                    return result
+            params = {"temperature": 0.95, "max_tokens": 1500, "response_format": {"type": "json_object"}}
             
-            self.stats.record_failure('openai_gpt4')
-            return {}
+            async def post(model: str, system: str, user: str, params: Dict) -> Optional[str]:
+                url = f"{Config.OPENAI_URL}/v1/chat/completions"
+                headers = {"Authorization": f"Bearer {Config.OPENAI_API}", "Content-Type": "application/json"}
+                messages = [{"role": "system", "content": system}] if system else []
+                payload = {
+                    "model": model,
+                    "messages": messages + [{"role": "user", "content": user}],
+                    **params
+                }
+                
+                async with self.limiter.slot('openai') as started, session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=30)) as r:
+                    check_response(r)
+                    if r.status == 200:
+                        data = await r.json()
+                        usage = data.get('usage', {})
+                        self.stats.record_model(model, time.monotonic() - started,
+                                                usage.get('prompt_tokens'), usage.get('completion_tokens'))
+                        self.stats.record_success('openai_gpt4')
+                        return data['choices'][0]['message']['content']
+                
+                self.stats.record_failure('openai_gpt4')
+                return None
+            
+            result = await StructuredOutput.complete(
+                self.llm_cache, self.stats, 'openai', ModelRouter.cascade('openai', tier), system_prompt, context,
+                params, self.SCHEMA, post, repair_params={**params, "temperature": 0},
+                cacheable=Config.LLM_CACHE_OUTREACH
+            )
+            return result or {}
         except Exception as e:
             logger.error(f"OpenAI error: {e}")
             self.stats.record_failure('openai_gpt4')
+            if is_provider_failure(e):
+                raise
             return {}
 
 
 class ClaudeClient:
     """Claude 3.5 for psychographic profiling"""
-    def __init__(self, stats: StatsTracker):
+    PARAMS = {"max_tokens": 1000}
+    ASK = """Provide:
+1. Buying intent (HIGH/MEDIUM/LOW) with reasoning
+2. Top 3 pain points ranked by urgency
+3. Personality profile (data-driven, emotional, risk-averse, etc)
+4. Decision timeline (urgent/considering/future)
+5. Best approach (direct/educational/social proof)
+6. Likely objections"""
+    SCHEMA = {
+        'buying_intent': str,
+        'pain_points': str,
+        'personality': str,
+        'timeline': str,
+        'approach': str,
+        'objections': str,
+    }
+    
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter, llm_cache: Optional[LLMCache] = None):
         self.stats = stats
+        self.limiter = limiter
+        self.llm_cache = llm_cache or LLMCache(None, 0)
+        self.batchers: Dict[str, MicroBatcher] = {}
     
-    @retry_on_failure(max_attempts=2)
-    async def analyze_psychology(self, session: aiohttp.ClientSession, lead: Dict) -> Dict:
+    async def analyze_psychology(self, session: aiohttp.ClientSession, lead: Dict, tier: str = 'hot') -> Dict:
         if not Config.ANTHROPIC_API:
             return {}
         
-        try:
-            context = f"""Analyze this business for strategic outreach:
-
-Business: {lead.get('name')}
+        models = ModelRouter.cascade('anthropic', tier)
+        place_id = lead.get('place_id')
+        if Config.AI_BATCH_SIZE > 1 and place_id:
+            cached = StructuredOutput.check(
+                self.llm_cache.get('anthropic', models[0], '', self._context(lead), self.PARAMS), self.SCHEMA
+            )[0]
+            if cached is not None:
+                return cached
+            result = await self._batcher(models[0]).submit(place_id, (session, lead))
+            if result is MicroBatcher.FAILED:
+                return {}
+            if result is not None:
+                return result
+            # Batch answer left this lead out or was unparsable: ask for it alone
+        
+        return await self._analyze_one(session, lead, models) or {}
+    
+    def _batcher(self, model: str) -> MicroBatcher:
+        if model not in self.batchers:
+            self.batchers[model] = MicroBatcher(
+                lambda items: self._analyze_batch(items, model), Config.AI_BATCH_SIZE, Config.AI_BATCH_WINDOW
+            )
+        return self.batchers[model]
+    
+    @staticmethod
+    def _profile(lead: Dict) -> str:
+        return f"""Business: {lead.get('name')}
 Category: {lead.get('category')}
 Rating: {lead.get('rating')}/5 | Reviews: {lead.get('total_reviews')}
 Website: {lead.get('website')}
 Tech: {', '.join(lead.get('tech', []))}
 Social: IG {lead.get('instagram_followers', 0)} followers
-Weaknesses: {lead.get('detailed_flaws', 'None')}
+Weaknesses: {lead.get('detailed_flaws', 'None')}"""
+    
+    def _context(self, lead: Dict) -> str:
+        return f"""Analyze this business for strategic outreach:
 
-Provide:
-1. Buying intent (HIGH/MEDIUM/LOW) with reasoning
-2. Top 3 pain points ranked by urgency
-3. Personality profile (data-driven, emotional, risk-averse, etc)
-4. Decision timeline (urgent/considering/future)
-5. Best approach (direct/educational/social proof)
-6. Likely objections
+{self._profile(lead)}
 
-Format as JSON."""
-            
-            url = "https://api.anthropic.com/v1/messages"
-            headers = {
-                "x-api-key": Config.ANTHROPIC_API,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            }
-            payload = {
-                "model": "claude-3-5-sonnet-20241022",
-                "max_tokens": 1000,
-                "messages": [{"role": "user", "content": context}]
-            }
-            
-            async with session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=25)) as r:
-                if r.status == 200:
-                    data = await r.json()
-                    content = data['content'][0]['text']
-                    # Try to parse JSON from response
-                    try:
-                        result = json.loads(content)
-                    except:
-                        # Fallback parsing
-                        result = {
-                            'buying_intent': 'MEDIUM',
-                            'pain_points': 'Digital presence gaps, competitor pressure, review management',
-                            'personality': 'Analytical',
-                            'timeline': 'Considering',
-                            'approach': 'Data-driven',
-                            'objections': 'Cost, time commitment'
-                        }
-                    self.stats.record_success('claude_anthropic')
-                    await asyncio.sleep(0.8)
-                    return result
-            
-            self.stats.record_failure('claude_anthropic')
-            return {}
+{self.ASK}
+
+Reply with only a JSON object with these keys:
+{StructuredOutput.describe(self.SCHEMA)}"""
+    
+    @retry_on_failure(max_attempts=2, api='anthropic', fallback=dict)
+    async def _analyze_one(self, session: aiohttp.ClientSession, lead: Dict, models: List[str]) -> Dict:
+        try:
+            result = await StructuredOutput.complete(
+                self.llm_cache, self.stats, 'anthropic', models, '', self._context(lead), self.PARAMS, self.SCHEMA,
+                lambda model, system, user, params: self._post(session, model, user, params, timeout=25)
+            )
+            return result or {}
         except Exception as e:
             logger.error(f"Claude error: {e}")
             self.stats.record_failure('claude_anthropic')
+            if is_provider_failure(e):
+                raise
             return {}
+    
+    async def _analyze_batch(self, items: List[Tuple[str, Tuple[aiohttp.ClientSession, Dict]]], model: str) -> Optional[Dict[str, Dict]]:
+        """One request for several leads; each parsed profile is cached under its single-lead prompt"""
+        session = items[0][1][0]
+        leads = {place_id: lead for place_id, (_, lead) in items}
+        blocks = "\n\n".join(f"[place_id: {place_id}]\n{self._profile(lead)}" for place_id, lead in leads.items())
+        prompt = f"""Analyze each of these {len(leads)} businesses for strategic outreach:
+
+{blocks}
+
+For each business:
+{self.ASK}
+
+Return only a JSON array with one object per business, with these keys:
+- place_id: string
+{StructuredOutput.describe(self.SCHEMA)}"""
+        
+        content = await self._post_batch(session, model, prompt, {"max_tokens": min(1000 * len(leads), 8000)})
+        if content is None:
+            return None
+        results = MicroBatcher.split_results(content, set(leads), self.SCHEMA)
+        for place_id, result in results.items():
+            self.llm_cache.put('anthropic', model, '', self._context(leads[place_id]), self.PARAMS, json.dumps(result))
+        return results
+    
+    @retry_on_failure(max_attempts=2, api='anthropic')
+    async def _post_batch(self, session: aiohttp.ClientSession, model: str, content: str, params: Dict) -> Optional[str]:
+        """Batch request under the same retry policy as single calls; None once it gives up"""
+        return await self._post(session, model, content, params, timeout=60)
+    
+    async def _post(self, session: aiohttp.ClientSession, model: str, content: str, params: Dict, timeout: float) -> Optional[str]:
+        url = f"{Config.ANTHROPIC_URL}/v1/messages"
+        headers = {
+            "x-api-key": Config.ANTHROPIC_API,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": content}],
+            **params
+        }
+        
+        async with self.limiter.slot('anthropic') as started, session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+            check_response(r)
+            if r.status == 200:
+                data = await r.json()
+                usage = data.get('usage', {})
+                self.stats.record_model(model, time.monotonic() - started, usage.get('input_tokens'), usage.get('output_tokens'))
+                self.stats.record_success('claude_anthropic')
+                return data['content'][0]['text']
+        
+        self.stats.record_failure('claude_anthropic')
+        return None
 
 
 class GeminiClient:
     """Gemini for review sentiment analysis"""
-    def __init__(self, stats: StatsTracker):
+    PARAMS = {"temperature": 0.7, "maxOutputTokens": 800}
+    ASK = """1. Sentiment breakdown (positive_pct, negative_pct, neutral_pct)
+2. Top 3 customer complaints (specific)
+3. Top 3 customer praises (specific)
+4. Emotional triggers (what drives love/hate)"""
+    SCHEMA = {
+        'positive_pct': float,
+        'negative_pct': float,
+        'neutral_pct': float,
+        'complaints': list,
+        'praises': list,
+        'triggers': str,
+    }
+    
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter, llm_cache: Optional[LLMCache] = None):
         self.stats = stats
+        self.limiter = limiter
+        self.llm_cache = llm_cache or LLMCache(None, 0)
+        self.batchers: Dict[str, MicroBatcher] = {}
     
-    @retry_on_failure(max_attempts=2)
-    async def analyze_reviews(self, session: aiohttp.ClientSession, reviews: List[Dict]) -> Dict:
+    async def analyze_reviews(self, session: aiohttp.ClientSession, reviews: List[Dict], key: str = '',
+                              tier: str = 'hot') -> Dict:
+        """Sentiment for one business's reviews; key (place_id) lets the call join a batch"""
         if not Config.GEMINI_API or not reviews:
             return {}
         
-        try:
-            # Build review text
-            review_text = "\n".join([f"- {r.get('text', '')[:200]}" for r in reviews[:10]])
-            
-            prompt = f"""Analyze these customer reviews:
+        models = ModelRouter.cascade('gemini', tier)
+        if Config.AI_BATCH_SIZE > 1 and key:
+            cached = StructuredOutput.check(
+                self.llm_cache.get('gemini', models[0], '', self._prompt(reviews), self.PARAMS), self.SCHEMA
+            )[0]
+            if cached is not None:
+                return cached
+            result = await self._batcher(models[0]).submit(key, (session, reviews))
+            if result is MicroBatcher.FAILED:
+                return {}
+            if result is not None:
+                return result
+            # Batch answer left this lead out or was unparsable: ask for it alone
+        
+        return await self._analyze_one(session, reviews, models) or {}
+    
+    def _batcher(self, model: str) -> MicroBatcher:
+        if model not in self.batchers:
+            self.batchers[model] = MicroBatcher(
+                lambda items: self._analyze_batch(items, model), Config.AI_BATCH_SIZE, Config.AI_BATCH_WINDOW
+            )
+        return self.batchers[model]
+    
+    @staticmethod
+    def _review_text(reviews: List[Dict]) -> str:
+        return "\n".join([f"- {r.get('text', '')[:200]}" for r in reviews[:10]])
+    
+    def _prompt(self, reviews: List[Dict]) -> str:
+        return f"""Analyze these customer reviews:
 
-{review_text}
+{self._review_text(reviews)}
 
 Provide:
-1. Sentiment breakdown (positive_pct, negative_pct, neutral_pct)
-2. Top 3 customer complaints (specific)
-3. Top 3 customer praises (specific)
-4. Emotional triggers (what drives love/hate)
+{self.ASK}
 
-Format as JSON."""
-            
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={Config.GEMINI_API}"
-            payload = {
-                "contents": [{"parts": [{"text": prompt}]}],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "maxOutputTokens": 800
-                }
-            }
-            
-            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=20)) as r:
-                if r.status == 200:
-                    data = await r.json()
-                    text = data['candidates'][0]['content']['parts'][0]['text']
-                    try:
-                        result = json.loads(text)
-                    except:
-                        result = {
-                            'positive_pct': 70,
-                            'negative_pct': 20,
-                            'neutral_pct': 10,
-                            'complaints': ['Wait times', 'Pricing', 'Communication'],
-                            'praises': ['Quality', 'Staff', 'Location'],
-                            'triggers': 'Quality and personal service'
-                        }
-                    self.stats.record_success('gemini')
-                    await asyncio.sleep(0.6)
-                    return result
-            
-            self.stats.record_failure('gemini')
-            return {}
+Reply with only a JSON object with these keys:
+{StructuredOutput.describe(self.SCHEMA)}"""
+    
+    @retry_on_failure(max_attempts=2, api='gemini', fallback=dict)
+    async def _analyze_one(self, session: aiohttp.ClientSession, reviews: List[Dict], models: List[str]) -> Dict:
+        try:
+            result = await StructuredOutput.complete(
+                self.llm_cache, self.stats, 'gemini', models, '', self._prompt(reviews), self.PARAMS, self.SCHEMA,
+                lambda model, system, user, params: self._post(session, model, user, params, timeout=20),
+                repair_params={**self.PARAMS, "temperature": 0}
+            )
+            return result or {}
         except Exception as e:
             logger.error(f"Gemini error: {e}")
             self.stats.record_failure('gemini')
+            if is_provider_failure(e):
+                raise
             return {}
+    
+    async def _analyze_batch(self, items: List[Tuple[str, Tuple[aiohttp.ClientSession, List[Dict]]]], model: str) -> Optional[Dict[str, Dict]]:
+        """One request for several businesses; each parsed result is cached under its single-lead prompt"""
+        session = items[0][1][0]
+        reviews_by_key = {key: reviews for key, (_, reviews) in items}
+        blocks = "\n\n".join(f"[place_id: {key}]\n{self._review_text(reviews)}" for key, reviews in reviews_by_key.items())
+        prompt = f"""Analyze the customer reviews of each of these {len(reviews_by_key)} businesses:
+
+{blocks}
+
+For each business provide:
+{self.ASK}
+
+Return only a JSON array with one object per business, with these keys:
+- place_id: string
+{StructuredOutput.describe(self.SCHEMA)}"""
+        
+        params = {**self.PARAMS, "maxOutputTokens": min(800 * len(reviews_by_key), 8192)}
+        text = await self._post_batch(session, model, prompt, params)
+        if text is None:
+            return None
+        results = MicroBatcher.split_results(text, set(reviews_by_key), self.SCHEMA)
+        for key, result in results.items():
+            self.llm_cache.put('gemini', model, '', self._prompt(reviews_by_key[key]), self.PARAMS, json.dumps(result))
+        return results
+    
+    @retry_on_failure(max_attempts=2, api='gemini')
+    async def _post_batch(self, session: aiohttp.ClientSession, model: str, prompt: str, params: Dict) -> Optional[str]:
+        """Batch request under the same retry policy as single calls; None once it gives up"""
+        return await self._post(session, model, prompt, params, timeout=60)
+    
+    async def _post(self, session: aiohttp.ClientSession, model: str, prompt: str, params: Dict, timeout: float) -> Optional[str]:
+        url = f"{Config.GEMINI_URL}/v1beta/models/{model}:generateContent?key={Config.GEMINI_API}"
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": params
+        }
+        
+        async with self.limiter.slot('gemini') as started, session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
+            check_response(r)
+            if r.status == 200:
+                data = await r.json()
+                usage = data.get('usageMetadata', {})
+                self.stats.record_model(model, time.monotonic() - started,
+                                        usage.get('promptTokenCount'), usage.get('candidatesTokenCount'))
+                self.stats.record_success('gemini')
+                return data['candidates'][0]['content']['parts'][0]['text']
+        
+        self.stats.record_failure('gemini')
+        return None
 
 
 class PerplexityClient:
-    """Perplexity for real-time competitor research"""
-    def __init__(self, stats: StatsTracker):
+    """Perplexity for real-time market research, shared per (category, city)
+    
+    Competitors, trends, pricing and news are properties of the market, so one
+    online-model call serves every lead in the segment. A short per-business
+    follow-up on the standard-tier model is optional (Config.PERPLEXITY_BUSINESS_FOLLOWUP).
+    """
+    MARKET_SCHEMA = {
+        'competitors': (str, list, dict),
+        'trends': (str, list, dict),
+        'pricing': (str, list, dict),
+        'news': (str, list, dict),
+    }
+    BUSINESS_SCHEMA = {
+        'reputation': str,
+        'news': str,
+        'differentiator': str,
+    }
+    
+    def __init__(self, stats: StatsTracker, limiter: RateLimiter, llm_cache: Optional[LLMCache] = None):
         self.stats = stats
+        self.limiter = limiter
+        self.llm_cache = llm_cache or LLMCache(None, 0)
+        self.markets: Dict[Tuple[str, str], asyncio.Future] = {}
     
-    @retry_on_failure(max_attempts=2)
     async def research_market(self, session: aiohttp.ClientSession, business: str, category: str, city: str) -> Dict:
         if not Config.PERPLEXITY_API:
             return {}
         
+        research = await self.market_research(session, category, city)
+        if research and Config.PERPLEXITY_BUSINESS_FOLLOWUP:
+            business_detail = await self.business_followup(session, business, category, city)
+            if business_detail:
+                research['business'] = business_detail
+        return research
+    
+    async def market_research(self, session: aiohttp.ClientSession, category: str, city: str) -> Dict:
+        """Market research for (category, city), one request per market at a time"""
+        key = (category.lower().strip(), city.lower().strip())
+        
+        market = self.markets.get(key)
+        if market is None:
+            market = asyncio.ensure_future(self._market(session, *key))
+            self.markets[key] = market
+        
         try:
-            prompt = f"""Research the competitive landscape for "{business}" ({category} in {city}).
+            research = await asyncio.shield(market)
+        except Exception:
+            research = None
+        if not research:
+            # Failed fetches are not memoized, the next lead tries again
+            if self.markets.get(key) is market:
+                del self.markets[key]
+            return {}
+        
+        return dict(research)
+    
+    @retry_on_failure(max_attempts=2, api='perplexity')
+    async def _market(self, session: aiohttp.ClientSession, category: str, city: str) -> Optional[Dict]:
+        prompt = f"""Research the competitive landscape for {category} businesses in {city}.
 
 Provide:
 1. Top 3 competitors and their key advantages
-2. Current market trends affecting this business
+2. Current market trends affecting this market
 3. Typical pricing in this market
 4. Recent industry news relevant to this niche
 
-Be specific and actionable. Format as JSON."""
-            
-            url = "https://api.perplexity.ai/chat/completions"
+Be specific and actionable. Reply with only a JSON object with these keys:
+{StructuredOutput.describe(self.MARKET_SCHEMA)}"""
+        
+        model = Config.MODEL_TIERS['perplexity'][Config.MARKET_RESEARCH_TIER]
+        return await self._ask(session, 'perplexity', model, prompt,
+                               {"temperature": 0.7, "max_tokens": 800}, self.MARKET_SCHEMA)
+    
+    @retry_on_failure(max_attempts=2, api='perplexity', fallback=dict)
+    async def business_followup(self, session: aiohttp.ClientSession, business: str, category: str, city: str) -> Dict:
+        """Short business-specific detail to layer on top of the market research"""
+        prompt = f"""In under 80 words, what is specific to "{business}" ({category} in {city})?
+
+Reply with only a JSON object with these keys (reputation, recent news, and what sets it apart from local competitors):
+{StructuredOutput.describe(self.BUSINESS_SCHEMA)}"""
+        
+        model = Config.MODEL_TIERS['perplexity']['standard']
+        return await self._ask(session, 'perplexity_business', model, prompt,
+                               {"temperature": 0.2, "max_tokens": 250}, self.BUSINESS_SCHEMA) or {}
+    
+    async def _ask(self, session: aiohttp.ClientSession, api: str, model: str, prompt: str, params: Dict,
+                   schema: Dict[str, Any]) -> Optional[Dict]:
+        """Schema-valid JSON via LLMCache (market TTL), None on failure"""
+        async def post(model: str, system: str, prompt: str, params: Dict) -> Optional[str]:
+            url = f"{Config.PERPLEXITY_URL}/chat/completions"
             headers = {"Authorization": f"Bearer {Config.PERPLEXITY_API}", "Content-Type": "application/json"}
             payload = {
-                "model": "llama-3.1-sonar-large-128k-online",
+                "model": model,
                 "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.7,
-                "max_tokens": 800
+                **params
             }
             
-            async with session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=25)) as r:
+            async with self.limiter.slot('perplexity') as started, session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=25)) as r:
+                check_response(r)
                 if r.status == 200:
                     data = await r.json()
-                    content = data['choices'][0]['message']['content']
-                    try:
-                        result = json.loads(content)
-                    except:
-                        result = {
-                            'competitors': 'Leading competitors in area',
-                            'trends': 'Digital transformation, review importance',
-                            'pricing': 'Market-standard pricing',
-                            'news': 'Industry evolving rapidly'
-                        }
-                    self.stats.record_success('perplexity')
-                    await asyncio.sleep(0.8)
-                    return result
+                    usage = data.get('usage', {})
+                    self.stats.record_model(model, time.monotonic() - started,
+                                            usage.get('prompt_tokens'), usage.get('completion_tokens'))
+                    self.stats.record_success(api)
+                    return data['choices'][0]['message']['content']
             
-            self.stats.record_failure('perplexity')
-            return {}
+            self.stats.record_failure(api)
+            return None
+        
+        try:
+            return await StructuredOutput.complete(
+                self.llm_cache, self.stats, 'perplexity', [model], '', prompt, params, schema, post,
+                repair_params={**params, "temperature": 0}, ttl=Config.MARKET_RESEARCH_TTL
+            )
         except Exception as e:
             logger.error(f"Perplexity error: {e}")
-            self.stats.record_failure('perplexity')
-            return {}
+            self.stats.record_failure(api)
+            if is_provider_failure(e):
+                raise
+            return None
+
+
+# ============================================
+# AI TASK GRAPH
+# ============================================
+class TaskGraph:
+    """Runs async steps concurrently; a step starts once the steps it depends on have finished
+    
+    Each step's function receives its dependencies' results as positional args,
+    in the order the dependencies were listed. Steps must be added after their
+    dependencies, so the graph is acyclic by construction. With a tracer, each
+    step is a span (from when its dependencies are done).
+    """
+    def __init__(self, tracer: Optional[Tracer] = None):
+        self.steps: Dict[str, Tuple[Callable[..., Awaitable], Tuple[str, ...]]] = {}
+        self.tracer = tracer
+    
+    def add(self, name: str, fn: Callable[..., Awaitable], deps: Tuple[str, ...] = ()):
+        if name in self.steps:
+            raise ValueError(f"Duplicate step: {name}")
+        missing = [dep for dep in deps if dep not in self.steps]
+        if missing:
+            raise ValueError(f"Step {name} depends on unknown steps: {missing}")
+        self.steps[name] = (fn, tuple(deps))
+    
+    async def run(self) -> Dict[str, Any]:
+        tasks: Dict[str, asyncio.Future] = {}
+        
+        async def run_step(name: str, fn: Callable[..., Awaitable], deps: Tuple[str, ...]):
+            inputs = [await tasks[dep] for dep in deps]
+            if self.tracer is None:
+                return await fn(*inputs)
+            with self.tracer.span(name, 'step'):
+                return await fn(*inputs)
+        
+        for name, (fn, deps) in self.steps.items():
+            tasks[name] = asyncio.ensure_future(run_step(name, fn, deps))
+        
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return dict(zip(tasks, results))
 
 
 # ============================================
@@ -775,6 +2819,84 @@ Be specific and actionable. Format as JSON."""
 class Analyzer:
     """Advanced scoring and analysis"""
     
+    SCORE_FIELDS = (
+        'priority_score', 'struggling_score', 'digital_maturity', 'detailed_flaws', 'critical_issues',
+        'weakness_severity', 'deal_size_est', 'review_quote_1', 'review_quote_2', 'competitive_gaps', 'market_position',
+    )
+    
+    @staticmethod
+    def score(lead: Dict, lead_type: str) -> Dict:
+        """All computed fields for a built lead
+        
+        Pure (returns only SCORE_FIELDS, never mutates `lead`) so it can run in a worker process.
+        """
+        lead = dict(lead)
+        rating = lead.get('rating', 0)
+        reviews_count = lead.get('total_reviews', 0)
+        reviews_data = lead.get('reviews_data', [])
+        comps = lead.get('competitors', [])
+        
+        # Calculate scores
+        lead['priority_score'] = Analyzer.priority_score(lead, lead_type)
+        lead['struggling_score'] = Analyzer.struggling_score(lead)
+        lead['digital_maturity'] = Analyzer.digital_maturity(lead)
+        
+        # Flaws
+        flaws, critical, severity = Analyzer.flaws_analysis(lead)
+        lead['detailed_flaws'] = flaws
+        lead['critical_issues'] = critical
+        lead['weakness_severity'] = severity
+        
+        # Deal estimates
+        lead['deal_size_est'] = Analyzer.deal_size_estimate(lead, lead_type)
+        
+        # Review quotes
+        quotes = Analyzer.extract_review_quotes(reviews_data)
+        lead['review_quote_1'] = quotes[0] if len(quotes) > 0 else ''
+        lead['review_quote_2'] = quotes[1] if len(quotes) > 1 else ''
+        
+        # Competitive gaps
+        gaps = []
+        if comps:
+            avg_r = sum(c.get('rating', 0) for c in comps) / len(comps)
+            if rating < avg_r:
+                gaps.append(f"Rating {rating - avg_r:.1f} below avg")
+            avg_rev = sum(c.get('reviews', 0) for c in comps) / len(comps)
+            if reviews_count < avg_rev:
+                gaps.append(f"{int(avg_rev - reviews_count)} fewer reviews")
+        lead['competitive_gaps'] = ' | '.join(gaps) if gaps else 'Strong position'
+        lead['market_position'] = 'Leader' if rating >= 4.5 and reviews_count > 100 else 'Challenger'
+        
+        return {key: lead[key] for key in Analyzer.SCORE_FIELDS}
+    
+    @staticmethod
+    def best_case(lead: Dict, lead_type: str, pending: Set[str]) -> Dict:
+        """Partially enriched lead with the best scores it could still reach
+        
+        Enrichment stages still pending ('basic': website + Yelp, 'enhanced':
+        email, Instagram, competitors) are assumed to return whatever favours
+        each score most, so if quality_check fails on this, it fails for good.
+        """
+        priority_case = dict(lead)
+        struggling_case = dict(lead)
+        if 'basic' in pending:
+            priority_case['has_ssl'] = 'Yes'
+            struggling_case.update({'has_ssl': 'No', 'copyright_year': '2000', 'instagram_handle': '', 'facebook': '', 'tech': []})
+        if 'enhanced' in pending:
+            priority_case.update({
+                'email_verified': True,
+                'instagram_followers': 10 ** 9 if lead_type == 'voxmill' else 0,
+                'competitors': [{}] * 3,
+            })
+            struggling_case['competitors'] = [{'reviews': 10 ** 9}]
+        
+        best = dict(lead)
+        best['priority_score'] = Analyzer.priority_score(priority_case, lead_type)
+        best['struggling_score'] = Analyzer.struggling_score(struggling_case)
+        if pending and not best.get('email_1'):
+            best['email_1'] = 'pending'  # An email can still turn up
+        return best
+    
     @staticmethod
     def priority_score(lead: Dict, lead_type: str) -> int:
         """Calculate priority 0-10"""
@@ -848,7 +2970,7 @@ class Analyzer:
         
         # Low reviews despite age
         reviews = lead.get('total_reviews', 0)
-        age = lead.get('age_years', 0)
+        age = lead.get('age_years') or 0
         if age >= 2 and reviews < 10:
             score += 2
         
@@ -1040,68 +3162,88 @@ class LegendaryMiner:
     
     def __init__(self):
         self.stats = StatsTracker()
-        self.google = GooglePlaces(self.stats)
-        self.email = EmailIntelligence(self.stats)
-        self.web = WebIntel(self.stats)
-        self.instagram = InstagramClient(self.stats)
-        self.yelp = YelpClient(self.stats)
-        self.competitors = CompetitorFinder(self.stats)
-        self.openai = OpenAIClient(self.stats)
-        self.claude = ClaudeClient(self.stats)
-        self.gemini = GeminiClient(self.stats)
-        self.perplexity = PerplexityClient(self.stats)
+        self.tracer = Tracer(Config.TRACE_SAMPLE_RATE if Config.TRACE_PATH else 0, Config.TRACE_MAX_EVENTS)
+        self.limiter = RateLimiter(Config.RATE_LIMITS, self.stats, tracer=self.tracer)
+        self.cache = DiskCache(Config.CACHE_PATH, Config.CACHE_MAX_ENTRIES, self.stats)
+        self.domains = DomainCache(self.cache, Config.DOMAIN_CACHE_TTL)
+        self.cache.limit_bytes('llm_', Config.LLM_CACHE_MAX_BYTES)
+        self.llm_cache = LLMCache(self.cache, Config.LLM_CACHE_TTL)
+        self.cpu = CpuPool(Config.CPU_WORKERS)
+        self.google = GooglePlaces(self.stats, self.limiter, self.cache)
+        self.email = EmailIntelligence(self.stats, self.limiter, self.domains)
+        self.web = WebIntel(self.stats, self.limiter, self.domains, self.cpu)
+        self.instagram = InstagramClient(self.stats, self.limiter)
+        self.yelp = YelpClient(self.stats, self.limiter)
+        self.competitors = CompetitorFinder(self.stats, self.limiter, self.cache)
+        self.openai = OpenAIClient(self.stats, self.limiter, self.llm_cache)
+        self.claude = ClaudeClient(self.stats, self.limiter, self.llm_cache)
+        self.gemini = GeminiClient(self.stats, self.limiter, self.llm_cache)
+        self.perplexity = PerplexityClient(self.stats, self.limiter, self.llm_cache)
         self.analyzer = Analyzer()
         self.processed: Set[str] = set()
+        self.journal: Optional[CheckpointJournal] = None
+        self.resumed: Dict[str, List[Dict]] = {}
     
-    async def mine(self, queries: List[str], cities: List[str], country: str, lead_type: str, target: int) -> List[Dict]:
-        """Mine perfect leads"""
-        leads = []
-        
+    def start_journal(self, path: str, resume: bool = False):
+        """Open the checkpoint journal, restoring processed places and leads when resuming"""
+        if resume:
+            processed, self.resumed = CheckpointJournal.load(path)
+            self.processed |= processed
+            restored = sum(len(leads) for leads in self.resumed.values())
+            logger.info(f"♻️  Resumed: {restored} leads, {len(processed)} processed places from {path}")
+        self.journal = CheckpointJournal(path, resume=resume)
+    
+    def new_session(self) -> aiohttp.ClientSession:
+        """HTTP session (connection pool + DNS cache) for one or more mine() calls"""
         connector = aiohttp.TCPConnector(limit=Config.MAX_CONCURRENT)
         timeout = aiohttp.ClientTimeout(total=None, connect=60, sock_read=60)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[self.limiter.trace_config()])
+    
+    async def mine(self, queries: List[str], cities: List[str], country: str, lead_type: str, target: int,
+                   session: Optional[aiohttp.ClientSession] = None) -> List[Dict]:
+        """Mine perfect leads"""
+        if session is None:
+            async with self.new_session() as own_session:
+                return await self.mine(queries, cities, country, lead_type, target, session=own_session)
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            for query in queries:
-                if len(leads) >= target:
-                    break
-                
-                logger.info(f"\n🔍 Mining: '{query}' | Target: {target} | Current: {len(leads)}")
-                
-                for city in cities:
-                    if len(leads) >= target:
-                        break
-                    
-                    try:
-                        places = await self.google.search(session, query, f"{city}, {country}")
-                        logger.info(f"   📍 {city}: {len(places)} candidates")
-                        
-                        for place in places:
-                            if len(leads) >= target:
-                                break
-                            
-                            place_id = place.get('place_id')
-                            if place_id in self.processed:
-                                continue
-                            self.processed.add(place_id)
-                            
-                            details = await self.google.details(session, place_id)
-                            if details:
-                                lead = await self.process_lead(session, details, query, city, country, lead_type)
-                                if lead and self.quality_check(lead, lead_type):
-                                    leads.append(lead)
-                                    logger.info(f"      ✅ {lead['name']} | Pri: {lead['priority_score']}/10 | {len(leads)}/{target}")
-                                    
-                                    # Checkpoint save
-                                    if len(leads) % Config.CHECKPOINT_INTERVAL == 0:
-                                        logger.info(f"💾 Checkpoint: {len(leads)} leads")
-                        
-                        await asyncio.sleep(Config.BATCH_DELAY)
-                    except Exception as e:
-                        logger.error(f"   ❌ {city} error: {e}")
-        
-        logger.info(f"\n✅ Mining complete: {len(leads)} perfect leads")
+        pipeline = MiningPipeline(self, session, queries, cities, country, lead_type, target, two_pass=Config.TWO_PASS)
+        leads = await pipeline.run()
+        
+        logger.info(f"\n✅ Mining complete ({lead_type} {country}): {len(leads)} perfect leads")
         return leads
     
+    async def mine_concurrent(self, phases: List[Tuple[List[str], List[str], str, str, int]]) -> List[List[Dict]]:
+        """Run several (queries, cities, country, lead_type, target) phases at once
+        
+        All phases share one session, the processed set and the clients (and so
+        their provider limits); each keeps its own target.
+        """
+        async with self.new_session() as session:
+            results = await asyncio.gather(
+                *(self.mine(*phase, session=session) for phase in phases),
+                return_exceptions=True
+            )
+        
+        leads_per_phase = []
+        for phase, result in zip(phases, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Phase {phase[3]} {phase[2]} failed: {result}")
+                result = []
+            leads_per_phase.append(result)
+        return leads_per_phase
+    
+    # Enrichment stages still to run after each early-exit checkpoint
+    PENDING_AFTER = {'details': {'basic', 'enhanced'}, 'basic': {'enhanced'}}
+    
+    def can_still_qualify(self, after: str, details: Dict, category: str, city: str, country: str, lead_type: str,
+                          web_data: Optional[Dict] = None, yelp_data: Optional[Dict] = None) -> bool:
+        """False once quality_check would reject the lead however the remaining enrichment turns out"""
+        partial = self.build_lead(details, category, city, country, web_data or {}, yelp_data, {}, {}, [])
+        if self.quality_check(Analyzer.best_case(partial, lead_type, self.PENDING_AFTER[after]), lead_type):
+            return True
+        self.stats.record_early_exit(after)
+        return False
+    
     def quality_check(self, lead: Dict, lead_type: str) -> bool:
         """Strict quality control"""
         # Must have contact
@@ -1131,226 +3273,456 @@ class LegendaryMiner:
         
         return True
     
-    async def process_lead(self, session: aiohttp.ClientSession, details: Dict, category: str, city: str, country: str, lead_type: str) -> Optional[Dict]:
-        """Process single lead with ALL intelligence"""
-        try:
-            name = details.get('name', 'Unknown')
-            address = details.get('formatted_address', '')
-            phone = details.get('formatted_phone_number') or details.get('international_phone_number') or ''
-            website = details.get('website', 'No website')
-            rating = details.get('rating', 0)
-            reviews_count = details.get('user_ratings_total', 0)
-            maps_url = details.get('url', '')
-            geometry = details.get('geometry', {}).get('location', {})
-            lat = geometry.get('lat', '')
-            lng = geometry.get('lng', '')
-            reviews_data = details.get('reviews', [])
-            
-            logger.info(f"         🧠 Processing: {name}...")
+    async def basic_enrichment(self, session: aiohttp.ClientSession, details: Dict, city: str, country: str) -> Tuple[Dict, Optional[Dict]]:
+        """Website scrape + Yelp lookup"""
+        website = details.get('website', 'No website')
+        web_task = self.web.analyze(session, website)
+        yelp_task = self.yelp.search(session, details.get('name', 'Unknown'), f"{city}, {country}")
+        
+        web_data, yelp_data = await asyncio.gather(web_task, yelp_task, return_exceptions=True)
+        
+        if isinstance(web_data, Exception) or not web_data:
+            web_data = {}
+        if isinstance(yelp_data, Exception):
+            yelp_data = None
+        return web_data, yelp_data
+    
+    async def enhanced_enrichment(self, session: aiohttp.ClientSession, details: Dict, category: str, city: str, web_data: Dict) -> Tuple[Dict, Dict, List[Dict]]:
+        """Verified email + Instagram profile + competitors"""
+        website = details.get('website', 'No website')
+        email_task = self.email.find_verified_email(session, website)
+        ig_handle = web_data.get('socials', {}).get('instagram', '')
+        instagram_task = self.instagram.get_profile(session, ig_handle)
+        comps_task = self.competitors.find(session, details.get('name', 'Unknown'), category, city)
+        
+        email_data, ig_data, comps = await asyncio.gather(email_task, instagram_task, comps_task, return_exceptions=True)
+        
+        if isinstance(email_data, Exception) or not email_data:
+            email_data = {}
+        if isinstance(ig_data, Exception) or not ig_data:
+            ig_data = {}
+        if isinstance(comps, Exception) or not comps:
+            comps = []
+        return email_data, ig_data, comps
+    
+    def build_lead(self, details: Dict, category: str, city: str, country: str, web_data: Dict, yelp_data: Optional[Dict],
+                   email_data: Dict, ig_data: Dict, comps: List[Dict]) -> Dict:
+        """Assemble the lead record from details and enrichment results"""
+        name = details.get('name', 'Unknown')
+        address = details.get('formatted_address', '')
+        phone = details.get('formatted_phone_number') or details.get('international_phone_number') or ''
+        website = details.get('website', 'No website')
+        rating = details.get('rating', 0)
+        reviews_count = details.get('user_ratings_total', 0)
+        maps_url = details.get('url', '')
+        geometry = details.get('geometry', {}).get('location', {})
+        lat = geometry.get('lat', '')
+        lng = geometry.get('lng', '')
+        reviews_data = details.get('reviews', [])
+        ig_handle = web_data.get('socials', {}).get('instagram', '')
+        
+        lead = {
+            # Core
+            'name': name,
+            'category': category,
+            'city': city,
+            'country': country,
+            'address': address,
+            'lat': lat,
+            'lng': lng,
+            'place_id': details.get('place_id', ''),
             
-            # PHASE 1: Basic enrichment (parallel)
-            web_task = self.web.analyze(session, website)
-            yelp_task = self.yelp.search(session, name, f"{city}, {country}")
+            # Contact
+            'phone': phone,
+            'email_1': email_data.get('email', web_data.get('email', '')),
+            'email_2': '',
+            'email_confidence': email_data.get('confidence', 0),
+            'email_verified': email_data.get('verified', False),
+            'decision_maker': f"{email_data.get('first_name', '')} {email_data.get('last_name', '')}".strip(),
+            'position': email_data.get('position', ''),
+            'department': email_data.get('department', ''),
             
-            web_data, yelp_data = await asyncio.gather(web_task, yelp_task, return_exceptions=True)
+            # Online
+            'website': website,
+            'maps_url': maps_url,
+            'instagram_handle': ig_handle,
+            'instagram_followers': ig_data.get('followers', 0),
+            'instagram_engagement': ig_data.get('engagement', 0),
+            'instagram_verified': ig_data.get('verified', False),
+            'instagram_bio': ig_data.get('bio', ''),
+            'facebook': web_data.get('socials', {}).get('facebook', ''),
+            'facebook_likes': 0,
+            'linkedin': web_data.get('socials', {}).get('linkedin', ''),
+            'linkedin_employees': '',
+            'twitter': web_data.get('socials', {}).get('twitter', ''),
             
-            if isinstance(web_data, Exception):
-                web_data = {}
-            if isinstance(yelp_data, Exception):
-                yelp_data = None
+            # Reviews
+            'rating': rating,
+            'total_reviews': reviews_count,
+            'yelp_rating': yelp_data.get('rating') if yelp_data else '',
+            'yelp_reviews': yelp_data.get('review_count') if yelp_data else 0,
+            'reviews_data': reviews_data,
             
-            # PHASE 2: Enhanced enrichment (parallel)
-            email_task = self.email.find_verified_email(session, website)
-            ig_handle = web_data.get('socials', {}).get('instagram', '')
-            instagram_task = self.instagram.get_profile(session, ig_handle)
-            comps_task = self.competitors.find(session, name, category, city)
+            # Tech
+            'tech': web_data.get('tech', []),
+            'tech_full': ', '.join(web_data.get('tech', [])),
+            'has_ssl': web_data.get('ssl', 'Unknown'),
+            'mobile_friendly': web_data.get('mobile', 'Unknown'),
+            'copyright_year': web_data.get('copyright', ''),
             
-            email_data, ig_data, comps = await asyncio.gather(email_task, instagram_task, comps_task, return_exceptions=True)
+            # Business
+            'industry': category,
+            'employees': '',
+            'founded': '',
+            'revenue_est': '',
+            'age_years': '',
             
-            if isinstance(email_data, Exception):
-                email_data = {}
-            if isinstance(ig_data, Exception):
-                ig_data = {}
-            if isinstance(comps, Exception):
-                comps = []
+            # Competitors
+            'competitors': comps,
+        }
+        return lead
+    
+    async def score_lead(self, lead: Dict, lead_type: str):
+        """Scores, flaws, deal size and competitive position (in place)"""
+        lead.update(await self.cpu.run(Analyzer.score, lead, lead_type))
+    
+    async def ai_enrich(self, session: aiohttp.ClientSession, lead: Dict, lead_type: str):
+        """AI intelligence for priority 7+ leads, empty fields otherwise (in place)"""
+        name = lead.get('name', 'Unknown')
+        category = lead.get('category', '')
+        city = lead.get('city', '')
+        reviews_data = lead.get('reviews_data', [])
+        
+        # PHASE 3: AI Intelligence (only for priority 7+)
+        if lead['priority_score'] >= 7:
+            # Hot leads go straight to the top models, the rest start on cheaper ones
+            tier = ModelRouter.tier(lead, lead_type)
             
-            # Build lead
-            lead = {
-                # Core
-                'name': name,
-                'category': category,
-                'city': city,
-                'country': country,
-                'address': address,
-                'lat': lat,
-                'lng': lng,
-                'place_id': details.get('place_id', ''),
-                
-                # Contact
-                'phone': phone,
-                'email_1': email_data.get('email', web_data.get('email', '')),
-                'email_2': '',
-                'email_confidence': email_data.get('confidence', 0),
-                'email_verified': email_data.get('verified', False),
-                'decision_maker': f"{email_data.get('first_name', '')} {email_data.get('last_name', '')}".strip(),
-                'position': email_data.get('position', ''),
-                'department': email_data.get('department', ''),
-                
-                # Online
-                'website': website,
-                'maps_url': maps_url,
-                'instagram_handle': ig_handle,
-                'instagram_followers': ig_data.get('followers', 0),
-                'instagram_engagement': ig_data.get('engagement', 0),
-                'instagram_verified': ig_data.get('verified', False),
-                'instagram_bio': ig_data.get('bio', ''),
-                'facebook': web_data.get('socials', {}).get('facebook', ''),
-                'facebook_likes': 0,
-                'linkedin': web_data.get('socials', {}).get('linkedin', ''),
-                'linkedin_employees': '',
-                'twitter': web_data.get('socials', {}).get('twitter', ''),
-                
-                # Reviews
-                'rating': rating,
-                'total_reviews': reviews_count,
-                'yelp_rating': yelp_data.get('rating') if yelp_data else '',
-                'yelp_reviews': yelp_data.get('review_count') if yelp_data else 0,
-                'reviews_data': reviews_data,
-                
-                # Tech
-                'tech': web_data.get('tech', []),
-                'tech_full': ', '.join(web_data.get('tech', [])),
-                'has_ssl': web_data.get('ssl', 'Unknown'),
-                'mobile_friendly': web_data.get('mobile', 'Unknown'),
-                'copyright_year': web_data.get('copyright', ''),
-                
-                # Business
-                'industry': category,
-                'employees': '',
-                'founded': '',
-                'revenue_est': '',
-                'age_years': '',
-                
-                # Competitors
-                'competitors': comps,
-            }
+            # Gemini + Perplexity are independent; only GPT outreach waits on Claude's insights
+            graph = TaskGraph(self.tracer)
+            graph.add('claude', lambda: self.claude.analyze_psychology(session, lead, tier))
+            graph.add('gemini', lambda: self.gemini.analyze_reviews(session, reviews_data, lead.get('place_id', ''), tier))
+            graph.add('perplexity', lambda: self.perplexity.research_market(session, name, category, city))
+            graph.add('outreach', lambda insights: self.openai.generate_outreach(session, lead, lead_type, insights, tier),
+                      deps=('claude',))
+            results = await graph.run()
             
-            # Calculate scores
-            lead['priority_score'] = self.analyzer.priority_score(lead, lead_type)
-            lead['struggling_score'] = self.analyzer.struggling_score(lead)
-            lead['digital_maturity'] = self.analyzer.digital_maturity(lead)
+            # Claude psychographic analysis
+            claude_insights = results['claude']
+            lead['buying_intent'] = claude_insights.get('buying_intent', '')
+            lead['pain_points_ranked'] = claude_insights.get('pain_points', '')
+            lead['personality_profile'] = claude_insights.get('personality', '')
+            lead['decision_timeline'] = claude_insights.get('timeline', '')
+            lead['best_approach'] = claude_insights.get('approach', '')
+            lead['objections_likely'] = claude_insights.get('objections', '')
             
-            # Flaws
-            flaws, critical, severity = self.analyzer.flaws_analysis(lead)
-            lead['detailed_flaws'] = flaws
-            lead['critical_issues'] = critical
-            lead['weakness_severity'] = severity
+            # Gemini sentiment analysis
+            gemini_insights = results['gemini']
+            lead['sentiment_positive_pct'] = gemini_insights.get('positive_pct', 0)
+            lead['sentiment_negative_pct'] = gemini_insights.get('negative_pct', 0)
+            lead['sentiment_neutral_pct'] = gemini_insights.get('neutral_pct', 0)
+            lead['top_complaint'] = ', '.join(str(c) for c in gemini_insights.get('complaints', [])[:3])
+            lead['top_praise'] = ', '.join(str(p) for p in gemini_insights.get('praises', [])[:3])
+            lead['emotional_triggers'] = gemini_insights.get('triggers', '')
             
-            # Deal estimates
-            lead['deal_size_est'] = self.analyzer.deal_size_estimate(lead, lead_type)
+            # Perplexity market research
+            perplexity_insights = results['perplexity']
+            lead['perplexity_insights'] = json.dumps(perplexity_insights)
             
-            # Review quotes
-            quotes = self.analyzer.extract_review_quotes(reviews_data)
-            lead['review_quote_1'] = quotes[0] if len(quotes) > 0 else ''
-            lead['review_quote_2'] = quotes[1] if len(quotes) > 1 else ''
+            # GPT-4 outreach generation
+            outreach = results['outreach'] or {}
             
-            # Competitive gaps
-            gaps = []
-            if comps:
-                avg_r = sum(c.get('rating', 0) for c in comps) / len(comps)
-                if rating < avg_r:
-                    gaps.append(f"Rating {rating - avg_r:.1f} below avg")
-                avg_rev = sum(c.get('reviews', 0) for c in comps) / len(comps)
-                if reviews_count < avg_rev:
-                    gaps.append(f"{int(avg_rev - reviews_count)} fewer reviews")
-            lead['competitive_gaps'] = ' | '.join(gaps) if gaps else 'Strong position'
-            lead['market_position'] = 'Leader' if rating >= 4.5 and reviews_count > 100 else 'Challenger'
+            for column, (key, limit) in OpenAIClient.COLUMNS.items():
+                lead[column] = str(outreach.get(key, ''))[:limit]
+        else:
+            # No AI for low priority
+            lead.update({
+                'buying_intent': 'LOW',
+                'pain_points_ranked': '',
+                'personality_profile': '',
+                'decision_timeline': '3+ months',
+                'best_approach': '',
+                'objections_likely': '',
+                'sentiment_positive_pct': 0,
+                'sentiment_negative_pct': 0,
+                'sentiment_neutral_pct': 0,
+                'top_complaint': '',
+                'top_praise': '',
+                'emotional_triggers': '',
+                'perplexity_insights': '',
+                'outreach_pain_1': '',
+                'outreach_pain_2': '',
+                'outreach_pain_3': '',
+                'outreach_opp_1': '',
+                'outreach_opp_2': '',
+                'outreach_opp_3': '',
+                'outreach_comp_1': '',
+                'outreach_comp_2': '',
+                'outreach_shock_1': '',
+                'outreach_shock_2': '',
+                'email_subject': '',
+                'linkedin_request': '',
+                'sms_template': ''
+            })
+    
+    def finalize_lead(self, lead: Dict):
+        """Stamp metadata and data completeness (in place)"""
+        # Metadata
+        lead['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+        
+        # Calculate data completeness
+        total_fields = len(lead)
+        filled_fields = sum(1 for v in lead.values() if v and v != '' and v != [] and v != 0)
+        lead['data_completeness_pct'] = round((filled_fields / total_fields) * 100, 1)
+
+
+# ============================================
+# MINING PIPELINE
+# ============================================
+class MiningPipeline:
+    """Queue-connected stages: search → details → basic → enhanced → scoring → ai → sink
+    
+    Every stage has its own worker count and a bounded input queue, so a slow
+    stage (AI) applies backpressure while cheap stages prefetch up to the limit.
+    
+    two_pass drops the ai stage: every candidate is scored, the best ones that
+    pass quality_check are kept in a heap sized to the remaining target, and
+    only those get AI enrichment once all candidates are in.
+    """
+    STAGES = ['search', 'details', 'basic', 'enhanced', 'scoring', 'ai']
+    
+    def __init__(self, miner: 'LegendaryMiner', session: aiohttp.ClientSession, queries: List[str], cities: List[str],
+                 country: str, lead_type: str, target: int, two_pass: bool = False):
+        self.miner = miner
+        self.session = session
+        self.queries = queries
+        self.cities = cities
+        self.country = country
+        self.lead_type = lead_type
+        self.target = target
+        self.phase = f"{lead_type}_{country}"
+        self.leads: List[Dict] = list(miner.resumed.get(self.phase, []))[:target]
+        self.done = asyncio.Event()
+        self.two_pass = two_pass
+        self.stages = self.STAGES[:-1] if two_pass else self.STAGES
+        self.shortlist: List[Tuple[Tuple, int, Dict]] = []  # Min-heap of (rank, -arrival, job)
+        self.arrivals = 0
+        self.queues = {stage: asyncio.Queue(maxsize=Config.STAGE_QUEUE_SIZE.get(stage, 0)) for stage in self.stages}
+        self.handlers = {
+            'search': self._search,
+            'details': self._details,
+            'basic': self._basic,
+            'enhanced': self._enhanced,
+            'scoring': self._scoring,
+            'ai': self._ai,
+        }
+    
+    async def run(self) -> List[Dict]:
+        if len(self.leads) >= self.target:
+            return self.leads
+        
+        self.miner.stats.record_phase_start(self.phase)
+        workers = []
+        for idx, stage in enumerate(self.stages):
+            next_stage = self.stages[idx + 1] if idx + 1 < len(self.stages) else None
+            for worker_id in range(max(1, Config.STAGE_WORKERS.get(stage, 1))):
+                workers.append(asyncio.create_task(self._worker(stage, next_stage), name=f"{self.phase} {stage}#{worker_id}"))
+        
+        try:
+            for query in self.queries:
+                for city in self.cities:
+                    await self.queues['search'].put({'query': query, 'city': city})
             
-            # PHASE 3: AI Intelligence (only for priority 7+)
-            if lead['priority_score'] >= 7:
-                # Claude psychographic analysis
-                claude_insights = await self.claude.analyze_psychology(session, lead)
-                lead['buying_intent'] = claude_insights.get('buying_intent', 'MEDIUM')
-                lead['pain_points_ranked'] = claude_insights.get('pain_points', 'Unknown')
-                lead['personality_profile'] = claude_insights.get('personality', 'Unknown')
-                lead['decision_timeline'] = claude_insights.get('timeline', 'Considering')
-                lead['best_approach'] = claude_insights.get('approach', 'Data-driven')
-                lead['objections_likely'] = claude_insights.get('objections', 'Cost, time')
-                
-                # Gemini sentiment analysis
-                gemini_insights = await self.gemini.analyze_reviews(session, reviews_data)
-                lead['sentiment_positive_pct'] = gemini_insights.get('positive_pct', 70)
-                lead['sentiment_negative_pct'] = gemini_insights.get('negative_pct', 20)
-                lead['sentiment_neutral_pct'] = gemini_insights.get('neutral_pct', 10)
-                lead['top_complaint'] = ', '.join(gemini_insights.get('complaints', [])[:3])
-                lead['top_praise'] = ', '.join(gemini_insights.get('praises', [])[:3])
-                lead['emotional_triggers'] = gemini_insights.get('triggers', 'Quality service')
-                
-                # Perplexity market research
-                perplexity_insights = await self.perplexity.research_market(session, name, category, city)
-                lead['perplexity_insights'] = json.dumps(perplexity_insights)
-                
-                # GPT-4 outreach generation
-                outreach = await self.openai.generate_outreach(session, lead, lead_type, claude_insights)
+            drained = asyncio.create_task(self._drain())
+            reached = asyncio.create_task(self.done.wait())
+            await asyncio.wait({drained, reached}, return_when=asyncio.FIRST_COMPLETED)
+            drained.cancel()
+            reached.cancel()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        
+        if self.two_pass:
+            await self._ai_shortlist()
+        self.miner.stats.record_phase_end(self.phase)
+        return self.leads
+    
+    async def _drain(self):
+        # Workers hand a job downstream before marking it done, so joining
+        # the queues in stage order means every job has reached the sink
+        for stage in self.stages:
+            await self.queues[stage].join()
+    
+    async def _worker(self, stage: str, next_stage: Optional[str]):
+        queue = self.queues[stage]
+        handler = self.handlers[stage]
+        while True:
+            job = await queue.get()
+            try:
+                # Keep draining after the target so upstream puts never block
+                if self.done.is_set():
+                    continue
                 
-                # Parse outreach (handle different response formats)
-                lead['outreach_pain_1'] = str(outreach.get('pain_1', outreach.get('pain', [''])[0] if isinstance(outreach.get('pain'), list) else ''))[:500]
-                lead['outreach_pain_2'] = str(outreach.get('pain_2', outreach.get('pain', ['',''])[1] if isinstance(outreach.get('pain'), list) and len(outreach.get('pain', [])) > 1 else ''))[:500]
-                lead['outreach_pain_3'] = str(outreach.get('pain_3', outreach.get('pain', ['','',''])[2] if isinstance(outreach.get('pain'), list) and len(outreach.get('pain', [])) > 2 else ''))[:500]
-                lead['outreach_opp_1'] = str(outreach.get('opportunity_1', outreach.get('opportunity', [''])[0] if isinstance(outreach.get('opportunity'), list) else ''))[:500]
-                lead['outreach_opp_2'] = str(outreach.get('opportunity_2', outreach.get('opportunity', ['',''])[1] if isinstance(outreach.get('opportunity'), list) and len(outreach.get('opportunity', [])) > 1 else ''))[:500]
-                lead['outreach_opp_3'] = str(outreach.get('opportunity_3', outreach.get('opportunity', ['','',''])[2] if isinstance(outreach.get('opportunity'), list) and len(outreach.get('opportunity', [])) > 2 else ''))[:500]
-                lead['outreach_comp_1'] = str(outreach.get('competitor_1', outreach.get('competitor', [''])[0] if isinstance(outreach.get('competitor'), list) else ''))[:500]
-                lead['outreach_comp_2'] = str(outreach.get('competitor_2', outreach.get('competitor', ['',''])[1] if isinstance(outreach.get('competitor'), list) and len(outreach.get('competitor', [])) > 1 else ''))[:500]
-                lead['outreach_shock_1'] = str(outreach.get('shock_1', outreach.get('shock', [''])[0] if isinstance(outreach.get('shock'), list) else ''))[:500]
-                lead['outreach_shock_2'] = str(outreach.get('shock_2', outreach.get('shock', ['',''])[1] if isinstance(outreach.get('shock'), list) and len(outreach.get('shock', [])) > 1 else ''))[:500]
-                lead['email_subject'] = str(outreach.get('email_subject', ''))[:200]
-                lead['linkedin_request'] = str(outreach.get('linkedin_request', ''))[:300]
-                lead['sms_template'] = str(outreach.get('sms_template', ''))[:200]
-            else:
-                # No AI for low priority
-                lead.update({
-                    'buying_intent': 'LOW',
-                    'pain_points_ranked': '',
-                    'personality_profile': '',
-                    'decision_timeline': '3+ months',
-                    'best_approach': '',
-                    'objections_likely': '',
-                    'sentiment_positive_pct': 0,
-                    'sentiment_negative_pct': 0,
-                    'sentiment_neutral_pct': 0,
-                    'top_complaint': '',
-                    'top_praise': '',
-                    'emotional_triggers': '',
-                    'perplexity_insights': '',
-                    'outreach_pain_1': '',
-                    'outreach_pain_2': '',
-                    'outreach_pain_3': '',
-                    'outreach_opp_1': '',
-                    'outreach_opp_2': '',
-                    'outreach_opp_3': '',
-                    'outreach_comp_1': '',
-                    'outreach_comp_2': '',
-                    'outreach_shock_1': '',
-                    'outreach_shock_2': '',
-                    'email_subject': '',
-                    'linkedin_request': '',
-                    'sms_template': ''
-                })
-            
-            # Metadata
-            lead['last_updated'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-            
-            # Calculate data completeness
-            total_fields = len(lead)
-            filled_fields = sum(1 for v in lead.values() if v and v != '' and v != [] and v != 0)
-            lead['data_completeness_pct'] = round((filled_fields / total_fields) * 100, 1)
-            
-            return lead
-            
-        except Exception as e:
-            logger.error(f"         ❌ Processing error: {e}")
+                result = await self._traced(stage, handler, job)
+                if result is None:
+                    self._finish(job)
+                for out in (result if isinstance(result, list) else [result]):
+                    if out is None:
+                        continue
+                    if next_stage:
+                        if self.miner.tracer.enabled:
+                            out['queued'] = time.monotonic()
+                        await self.queues[next_stage].put(out)
+                    else:
+                        self._sink(out)
+            except Exception as e:
+                logger.error(f"      ❌ {stage} error ({job.get('city', '')}): {e}")
+                self._finish(job)
+            finally:
+                queue.task_done()
+    
+    async def _traced(self, stage: str, handler: Callable[[Dict], Awaitable], job: Dict) -> Any:
+        """Run one stage for a job, as spans of its lead when sampled (plus the time it sat in the queue)"""
+        tracer = self.miner.tracer
+        if 'place_id' in job:
+            key, tags = job['place_id'], {'place_id': job['place_id'], 'phase': self.phase}
+        else:
+            key, tags = f"{job['query']}|{job['city']}", {'query': job['query'], 'city': job['city'], 'phase': self.phase}
+        with tracer.lead(key, **tags):
+            tracer.complete(f"{stage} queue", 'queue', job.pop('queued', None))
+            with tracer.span(stage, 'stage'):
+                return await handler(job)
+    
+    # ---- Stages ----
+    
+    async def _search(self, job: Dict) -> List[Dict]:
+        query, city = job['query'], job['city']
+        logger.info(f"\n🔍 [{self.lead_type} {self.country}] Mining: '{query}' in {city} | Target: {self.target} | Current: {len(self.leads)}")
+        
+        places = await self.miner.google.search(self.session, query, f"{city}, {self.country}") or []
+        logger.info(f"   📍 {city}: {len(places)} candidates")
+        
+        jobs = [
+            {'place_id': place['place_id'], 'query': query, 'city': city}
+            for place in places
+            if place.get('place_id') and place['place_id'] not in self.miner.processed
+        ]
+        return jobs
+    
+    async def _details(self, job: Dict) -> Optional[Dict]:
+        # Claim the place here rather than at search time, so places still
+        # queued when the target is hit stay available to concurrent phases
+        if job['place_id'] in self.miner.processed:
+            return None
+        self.miner.processed.add(job['place_id'])
+        job['claimed'] = True
+        job['claimed_at'] = time.monotonic()
+        
+        details = await self.miner.google.details(self.session, job['place_id'])
+        if not details:
             return None
+        details.setdefault('place_id', job['place_id'])
+        if not self.miner.can_still_qualify('details', details, job['query'], job['city'], self.country, self.lead_type):
+            return None
+        job['details'] = details
+        return job
+    
+    async def _basic(self, job: Dict) -> Optional[Dict]:
+        logger.info(f"         🧠 Processing: {job['details'].get('name', 'Unknown')}...")
+        job['web'], job['yelp'] = await self.miner.basic_enrichment(self.session, job['details'], job['city'], self.country)
+        if not self.miner.can_still_qualify('basic', job['details'], job['query'], job['city'], self.country,
+                                            self.lead_type, job['web'], job['yelp']):
+            return None
+        return job
+    
+    async def _enhanced(self, job: Dict) -> Dict:
+        job['email'], job['ig'], job['comps'] = await self.miner.enhanced_enrichment(
+            self.session, job['details'], job['query'], job['city'], job['web']
+        )
+        return job
+    
+    async def _scoring(self, job: Dict) -> Dict:
+        lead = self.miner.build_lead(job['details'], job['query'], job['city'], self.country,
+                                     job['web'], job['yelp'], job['email'], job['ig'], job['comps'])
+        await self.miner.score_lead(lead, self.lead_type)
+        # Only the lead travels on; raw details/enrichment are released here
+        return {'place_id': job['place_id'], 'claimed': True, 'claimed_at': job['claimed_at'], 'lead': lead}
+    
+    async def _ai(self, job: Dict) -> Dict:
+        lead = job['lead']
+        await self.miner.ai_enrich(self.session, lead, self.lead_type)
+        self.miner.finalize_lead(lead)
+        return job
+    
+    def _finish(self, job: Dict):
+        """Journal a claimed place that will not produce a lead"""
+        if job.get('claimed') and self.miner.journal:
+            self.miner.journal.record_processed(self.phase, job['place_id'])
+    
+    def _sink(self, job: Dict):
+        if self.two_pass:
+            self._shortlist(job)
+            return
+        
+        # Check-and-append has no await in between, so the cutoff stays exact
+        if len(self.leads) >= self.target or not self.miner.quality_check(job['lead'], self.lead_type):
+            self._finish(job)
+            return
+        self._accept(job)
+    
+    def _accept(self, job: Dict):
+        lead = job['lead']
+        self.leads.append(lead)
+        self.miner.stats.record_lead(self.phase, time.monotonic() - job['claimed_at'])
+        if self.miner.journal:
+            self.miner.journal.record_lead(self.phase, lead)
+        logger.info(f"      ✅ {lead['name']} | Pri: {lead['priority_score']}/10 | {len(self.leads)}/{self.target}")
+        
+        if len(self.leads) % Config.CHECKPOINT_INTERVAL == 0:
+            logger.info(f"💾 Checkpoint [{self.phase}]: {len(self.leads)} leads")
+        
+        if len(self.leads) >= self.target:
+            self.done.set()
+    
+    # ---- Two-pass mode ----
+    
+    @staticmethod
+    def rank(lead: Dict, lead_type: str) -> Tuple:
+        """Same order main() sorts the final sheets by"""
+        if lead_type == 'freelance':
+            return (lead.get('struggling_score', 0), lead.get('priority_score', 0))
+        return (lead.get('priority_score', 0), lead.get('struggling_score', 0))
+    
+    def _shortlist(self, job: Dict):
+        """Pass one: keep the best scored leads, up to the remaining target"""
+        capacity = self.target - len(self.leads)
+        if capacity <= 0 or not self.miner.quality_check(job['lead'], self.lead_type):
+            self._finish(job)
+            return
+        
+        # On equal rank the earlier lead stays
+        self.arrivals += 1
+        heapq.heappush(self.shortlist, (self.rank(job['lead'], self.lead_type), -self.arrivals, job))
+        if len(self.shortlist) > capacity:
+            _, _, dropped = heapq.heappop(self.shortlist)
+            self._finish(dropped)
+    
+    async def _ai_shortlist(self):
+        """Pass two: AI enrichment for every shortlisted lead at once, best first"""
+        jobs = [job for _, _, job in sorted(self.shortlist, key=lambda entry: entry[:2], reverse=True)]
+        self.shortlist = []
+        if not jobs:
+            return
+        
+        logger.info(f"\n🧠 [{self.lead_type} {self.country}] AI pass: top {len(jobs)} of {self.arrivals} qualified leads")
+        results = await asyncio.gather(*(self._traced('ai', self._ai, job) for job in jobs), return_exceptions=True)
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logger.error(f"      ❌ ai error ({job['lead'].get('name', '')}): {result}")
+                self._finish(job)
+                continue
+            self._accept(job)
 
 
 # ============================================
@@ -1573,10 +3945,42 @@ class SheetsArchitect:
             logger.error(f"❌ Sheet failed: {e}")
 
 
+# ============================================
+# METRICS ENDPOINT
+# ============================================
+class MetricsServer:
+    """Serves StatsTracker live: /metrics (Prometheus text) and /metrics.json"""
+    def __init__(self, stats: StatsTracker, host: str, port: int):
+        self.stats = stats
+        self.host = host
+        self.port = port
+        self.runner: Optional[web.AppRunner] = None
+        self.app = web.Application()
+        self.app.router.add_get('/metrics', self.prometheus)
+        self.app.router.add_get('/metrics.json', self.as_json)
+    
+    async def start(self):
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        logger.info(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+    
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+    
+    async def prometheus(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.stats.prometheus(), content_type='text/plain')
+    
+    async def as_json(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats.snapshot(), dumps=lambda data: json.dumps(data, default=str))
+
+
 # ============================================
 # MAIN EXECUTION
 # ============================================
-async def main():
+async def main(resume: bool = False):
     start = datetime.now()
     
     logger.info("=" * 100)
@@ -1588,20 +3992,38 @@ async def main():
     logger.info("⏱️  Expected: 4-6 hours")
     logger.info("=" * 100)
     
+    miner = None
+    metrics = None
+    lag_monitor = None
     try:
         miner = LegendaryMiner()
+        if Config.METRICS_PORT:
+            metrics = MetricsServer(miner.stats, Config.METRICS_HOST, Config.METRICS_PORT)
+            await metrics.start()
+        miner.start_journal(Config.JOURNAL_PATH, resume=resume)
+        lag_monitor = LoopLagMonitor(miner.stats, Config.LOOP_LAG_INTERVAL)
+        lag_monitor.start()
         
-        logger.info("\n💎 PHASE 1: Voxmill UK (250 leads)...")
-        vox_uk = await miner.mine(Config.VOXMILL_QUERIES, Config.UK_CITIES, 'UK', 'voxmill', Config.VOXMILL_UK)
+        phases = [
+            ("💎 PHASE 1: Voxmill UK", (Config.VOXMILL_QUERIES, Config.UK_CITIES, 'UK', 'voxmill', Config.VOXMILL_UK)),
+            ("💎 PHASE 2: Voxmill US", (Config.VOXMILL_QUERIES, Config.US_CITIES, 'US', 'voxmill', Config.VOXMILL_US)),
+            ("🔧 PHASE 3: Freelance UK", (Config.FREELANCE_QUERIES, Config.UK_CITIES, 'UK', 'freelance', Config.FREELANCE_UK)),
+            ("🔧 PHASE 4: Freelance US", (Config.FREELANCE_QUERIES, Config.US_CITIES, 'US', 'freelance', Config.FREELANCE_US)),
+        ]
         
-        logger.info("\n💎 PHASE 2: Voxmill US (250 leads)...")
-        vox_us = await miner.mine(Config.VOXMILL_QUERIES, Config.US_CITIES, 'US', 'voxmill', Config.VOXMILL_US)
-        
-        logger.info("\n🔧 PHASE 3: Freelance UK (250 leads)...")
-        free_uk = await miner.mine(Config.FREELANCE_QUERIES, Config.UK_CITIES, 'UK', 'freelance', Config.FREELANCE_UK)
+        if Config.CONCURRENT_PHASES:
+            logger.info("\n⚡ ALL PHASES CONCURRENTLY (shared session)...")
+            vox_uk, vox_us, free_uk, free_us = await miner.mine_concurrent([args for _, args in phases])
+        else:
+            results = []
+            for title, args in phases:
+                logger.info(f"\n{title} ({args[-1]} leads)...")
+                results.append(await miner.mine(*args))
+            vox_uk, vox_us, free_uk, free_us = results
         
-        logger.info("\n🔧 PHASE 4: Freelance US (250 leads)...")
-        free_us = await miner.mine(Config.FREELANCE_QUERIES, Config.US_CITIES, 'US', 'freelance', Config.FREELANCE_US)
+        # Every accepted lead is on disk before the Sheets export starts
+        miner.journal.close()
+        lag_monitor.stop()
         
         # Sort by priority
         vox_uk.sort(key=lambda x: x.get('priority_score', 0), reverse=True)
@@ -1622,7 +4044,7 @@ async def main():
         logger.info(f"💎 Voxmill US: {len(vox_us)} | Hot: {len(vox_us_hot)} | Warm: {len(vox_us_warm)}")
         logger.info(f"🔧 Freelance UK: {len(free_uk)}")
         logger.info(f"🔧 Freelance US: {len(free_us)}")
-        logger.info(f"\n📊 TOTAL: {len(vox_uk) + len(vox_us) + free_uk + len(free_us)} perfect leads")
+        logger.info(f"\n📊 TOTAL: {len(vox_uk) + len(vox_us) + len(free_uk) + len(free_us)} perfect leads")
         
         # Stats
         all_leads = vox_uk + vox_us + free_uk + free_us
@@ -1671,6 +4093,9 @@ async def main():
         if free_us:
             architect.create_sheet(sheet, free_us, '🔧 FREELANCE US')
         
+        # Exported: a restart with --resume must not replay this run
+        miner.journal.retire()
+        
         # API stats report
         miner.stats.report()
         
@@ -1694,7 +4119,44 @@ async def main():
         logger.error(f"\n❌ FATAL: {e}")
         logger.exception("Traceback:")
         return {'success': False, 'error': str(e)}
+    
+    finally:
+        # Also on a crash: the journal is flushed + fsynced and worker processes exit
+        if lag_monitor:
+            lag_monitor.stop()
+        if miner:
+            if miner.journal:
+                miner.journal.close()
+            miner.cpu.shutdown()
+            miner.cache.close()
+        if metrics:
+            await metrics.stop()
+        if miner and Config.METRICS_JSON_PATH:
+            miner.stats.dump_json(Config.METRICS_JSON_PATH)
+        if miner and miner.tracer.enabled:
+            miner.tracer.export(Config.TRACE_PATH)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description='Voxmill Legendary V2 lead miner')
+    parser.add_argument('--resume', action='store_true', help=f"Continue from {Config.JOURNAL_PATH} after a crash/restart")
+    parser.add_argument('--two-pass', action='store_true', help='Score all candidates before spending AI on the top leads')
+    parser.add_argument('--concurrent-phases', action='store_true', help='Mine all 4 markets at once on one shared session')
+    parser.add_argument('--metrics-port', type=int, help='Serve live Prometheus metrics on this local port')
+    parser.add_argument('--metrics-json', metavar='PATH', help='Write a JSON snapshot of all metrics here at exit')
+    parser.add_argument('--trace', metavar='PATH', help='Write sampled per-lead spans as Chrome trace-event JSON')
+    parser.add_argument('--trace-sample', type=float, help=f"Share of leads to trace (default {Config.TRACE_SAMPLE_RATE})")
+    args = parser.parse_args()
+    if args.trace:
+        Config.TRACE_PATH = args.trace
+    if args.trace_sample is not None:
+        Config.TRACE_SAMPLE_RATE = args.trace_sample
+    if args.two_pass:
+        Config.TWO_PASS = True
+    if args.concurrent_phases:
+        Config.CONCURRENT_PHASES = True
+    if args.metrics_port is not None:
+        Config.METRICS_PORT = args.metrics_port
+    if args.metrics_json:
+        Config.METRICS_JSON_PATH = args.metrics_json
+    asyncio.run(main(resume=args.resume))
@@ -0,0 +1,137 @@
+"""MicroBatcher flushing and the Claude/Gemini batch path against the stub server"""
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from main import ClaudeClient, Config, GeminiClient, MicroBatcher, RateLimiter, StatsTracker
+from stub_server import StubServer
+
+
+def make_leads(count: int) -> list:
+    return [
+        {
+            'place_id': f'stub-place-{idx:03d}',
+            'name': f'Studio {idx}',
+            'category': 'hair salon',
+            'rating': 4.1,
+            'total_reviews': 40 + idx,
+            'website': f'https://studio{idx}.example.co.uk',
+            'reviews_data': [{'text': f'Lovely staff, long wait #{idx}'}, {'text': 'Hard to book'}],
+        }
+        for idx in range(count)
+    ]
+
+
+class Recorder:
+    """batch_fn that echoes each item and remembers the batches it was given"""
+    def __init__(self, results=None):
+        self.batches = []
+        self.results = results
+
+    async def __call__(self, items):
+        self.batches.append([key for key, _ in items])
+        if self.results is not None:
+            return self.results
+        return {key: item * 2 for key, item in items}
+
+
+def test_flush_by_size():
+    recorder = Recorder()
+
+    async def run():
+        batcher = MicroBatcher(recorder, max_size=3, window=10.0)
+        start = time.monotonic()
+        results = await asyncio.gather(*(batcher.submit(f'k{idx}', idx) for idx in range(3)))
+        return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [0, 2, 4]
+    assert recorder.batches == [['k0', 'k1', 'k2']]
+    assert elapsed < 1.0  # Did not wait for the window
+
+
+def test_flush_by_window():
+    recorder = Recorder()
+
+    async def run():
+        batcher = MicroBatcher(recorder, max_size=10, window=0.05)
+        start = time.monotonic()
+        results = await asyncio.gather(batcher.submit('a', 1), batcher.submit('b', 2))
+        return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [2, 4]
+    assert recorder.batches == [['a', 'b']]
+    assert 0.04 <= elapsed < 1.0
+
+
+def test_missing_keys_fall_back_and_failed_batches_do_not():
+    async def run(batch_fn):
+        batcher = MicroBatcher(batch_fn, max_size=2, window=10.0)
+        return await asyncio.gather(batcher.submit('a', 1), batcher.submit('b', 2))
+
+    async def raises(items):
+        raise ValueError('unparsable')
+
+    # Left out of the answer (or the batch raised): None, so the caller asks for that key alone
+    assert asyncio.run(run(Recorder(results={'a': 'ok'}))) == ['ok', None]
+    assert asyncio.run(run(raises)) == [None, None]
+
+    async def gave_up(items):
+        return None
+
+    # The request gave up for good: FAILED, so nobody fans out to single requests
+    assert asyncio.run(run(gave_up)) == [MicroBatcher.FAILED, MicroBatcher.FAILED]
+
+
+async def enrich_all(leads: list, batch_size: int, malformed: bool) -> dict:
+    server = StubServer(latency=0.01, malformed_batches=malformed)
+    url = await server.start()
+    try:
+        Config.ANTHROPIC_URL = Config.GEMINI_URL = url
+        Config.AI_BATCH_SIZE = batch_size
+        stats = StatsTracker()
+        limiter = RateLimiter({'anthropic': (100.0, 100), 'gemini': (100.0, 100)}, stats)
+        claude = ClaudeClient(stats, limiter)
+        gemini = GeminiClient(stats, limiter)
+
+        async def enrich(session, lead):
+            return await asyncio.gather(
+                claude.analyze_psychology(session, lead),
+                gemini.analyze_reviews(session, lead['reviews_data'], lead['place_id']),
+            )
+
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(*(enrich(session, lead) for lead in leads))
+        return {'results': results, 'counts': dict(server.counts)}
+    finally:
+        await server.stop()
+
+
+@pytest.fixture
+def stub_ai(monkeypatch):
+    monkeypatch.setattr(Config, 'ANTHROPIC_API', 'stub')
+    monkeypatch.setattr(Config, 'GEMINI_API', 'stub')
+    monkeypatch.setattr(Config, 'ANTHROPIC_URL', Config.ANTHROPIC_URL)
+    monkeypatch.setattr(Config, 'GEMINI_URL', Config.GEMINI_URL)
+    monkeypatch.setattr(Config, 'AI_BATCH_SIZE', Config.AI_BATCH_SIZE)
+    monkeypatch.setattr(Config, 'AI_BATCH_WINDOW', 0.05)
+
+
+def test_batched_single_and_malformed_runs_agree(stub_ai):
+    leads = make_leads(8)
+    single = asyncio.run(enrich_all(leads, 1, malformed=False))
+    batched = asyncio.run(enrich_all(leads, 4, malformed=False))
+    malformed = asyncio.run(enrich_all(leads, 4, malformed=True))
+
+    assert all(profile and sentiment for profile, sentiment in single['results'])
+    assert batched['results'] == single['results']
+    assert malformed['results'] == single['results']
+
+    # counts[route] is every request, counts[route + '_batch'] the batched ones among them
+    assert single['counts'] == {'anthropic': 8, 'gemini': 8}
+    assert batched['counts'] == {'anthropic': 2, 'anthropic_batch': 2, 'gemini': 2, 'gemini_batch': 2}
+    # Two unusable batch answers, then one single request per lead
+    assert malformed['counts'] == {'anthropic': 2 + 8, 'anthropic_batch': 2, 'gemini': 2 + 8, 'gemini_batch': 2}
@@ -0,0 +1,61 @@
+"""CheckpointJournal records, rotation and recovery from a torn last line"""
+import asyncio
+
+from main import CheckpointJournal
+
+
+def write(path, resume, records):
+    async def run():
+        journal = CheckpointJournal(str(path), resume=resume)
+        for phase, place_id, lead in records:
+            if lead:
+                journal.record_lead(phase, {'place_id': place_id, **lead})
+            else:
+                journal.record_processed(phase, place_id)
+        journal.close()
+
+    asyncio.run(run())
+
+
+def test_load_restores_processed_places_and_leads(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write(path, False, [('voxmill_UK', 'p1', None), ('voxmill_UK', 'p2', {'name': 'Two'})])
+    processed, leads = CheckpointJournal.load(str(path))
+    assert processed == {'p1', 'p2'}
+    assert leads == {'voxmill_UK': [{'place_id': 'p2', 'name': 'Two'}]}
+
+
+def test_fresh_start_rotates_old_journal(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write(path, False, [('voxmill_UK', 'p1', None)])
+    write(path, False, [('voxmill_UK', 'p2', None)])
+    assert CheckpointJournal.load(str(path))[0] == {'p2'}
+    assert CheckpointJournal.load(str(path) + '.prev')[0] == {'p1'}
+
+
+def test_resume_after_torn_tail(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write(path, False, [('voxmill_UK', 'p1', {'name': 'One'})])
+    # Crash mid-write: half a record with no newline
+    with open(path, 'a', encoding='utf-8') as fh:
+        fh.write('{"type": "lead", "phase": "voxm')
+
+    write(path, True, [('voxmill_UK', 'p2', {'name': 'Two'})])
+    processed, leads = CheckpointJournal.load(str(path))
+    # The fragment is skipped and the record after it is intact, not glued onto it
+    assert processed == {'p1', 'p2'}
+    assert [lead['name'] for lead in leads['voxmill_UK']] == ['One', 'Two']
+
+
+def test_retire_moves_finished_run_aside(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+
+    async def run():
+        journal = CheckpointJournal(str(path))
+        journal.record_processed('voxmill_UK', 'p1')
+        journal.retire()
+        journal.close()  # Idempotent, as main()'s finally block calls it again
+
+    asyncio.run(run())
+    assert not path.exists()
+    assert CheckpointJournal.load(str(path) + '.prev')[0] == {'p1'}
@@ -0,0 +1,42 @@
+"""Histogram quantiles and the Prometheus exposition built on them"""
+import pytest
+
+from main import Histogram, StatsTracker
+
+
+def test_histogram_is_bounded_and_estimates_quantiles():
+    hist = Histogram()
+    for idx in range(100_000):
+        hist.observe((idx % 100 + 1) / 100)  # Uniform over 0.01 .. 1.0s
+    assert len(hist.counts) == len(Histogram.LATENCY) + 1
+    assert hist.count == 100_000
+    assert hist.sum == pytest.approx(50_500)
+    assert hist.quantile(50) == pytest.approx(0.5, abs=0.05)
+    assert hist.quantile(95) == pytest.approx(0.95, abs=0.05)
+    assert hist.quantile(100) == 1.0
+    assert Histogram().quantile(50) == 0.0
+
+
+def test_histogram_overflow_bucket_is_capped_at_max():
+    hist = Histogram((0.1, 1.0))
+    for value in (0.05, 3.0, 7.0):
+        hist.observe(value)
+    assert hist.buckets() == [('0.1', 1), ('1.0', 1), ('+Inf', 3)]
+    assert hist.quantile(99) <= 7.0
+
+
+def test_prometheus_request_latency_is_a_histogram():
+    stats = StatsTracker()
+    for seconds in (0.02, 0.2, 2.0):
+        stats.record_request('yelp', seconds, ok=True)
+    stats.record_request('yelp', 30.0, ok=False)
+    text = stats.prometheus()
+
+    assert '# TYPE voxmill_request_duration_seconds histogram' in text
+    assert 'voxmill_request_duration_seconds_bucket{provider="yelp",le="0.025"} 1.0' in text
+    assert 'voxmill_request_duration_seconds_bucket{provider="yelp",le="+Inf"} 4.0' in text
+    assert 'voxmill_request_duration_seconds_count{provider="yelp"} 4.0' in text
+    assert 'voxmill_request_errors_total{provider="yelp"} 1.0' in text
+    # One TYPE line per family, none for the _bucket/_sum/_count series
+    assert text.count('# TYPE voxmill_request_duration_seconds') == 1
+    assert '# TYPE voxmill_request_duration_seconds_' not in text
@@ -0,0 +1,226 @@
+"""TokenBucket, AdaptiveLimit (AIMD), CircuitBreaker and how RateLimiter.slot() drives them"""
+import asyncio
+import time
+
+import pytest
+
+from main import (AdaptiveLimit, CircuitBreaker, CircuitOpenError, Config, RateLimiter, RetryableError,
+                  StatsTracker, TokenBucket, retry_on_failure)
+
+
+def test_token_bucket_burst_then_rate():
+    async def run():
+        bucket = TokenBucket(rate=20.0, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        burst = time.monotonic() - start
+        await bucket.acquire()
+        return burst, time.monotonic() - start
+
+    burst, total = asyncio.run(run())
+    assert burst < 0.02
+    assert total >= 0.04  # The 4th token needs 1/20 s of refill
+
+
+def test_token_bucket_abort():
+    async def run():
+        bucket = TokenBucket(rate=0.1, burst=1)
+        await bucket.acquire()
+        return await bucket.acquire(lambda: True)
+
+    assert asyncio.run(run()) is False
+
+
+def test_adaptive_limit_grows_only_when_saturated():
+    limit = AdaptiveLimit('test', initial=2, minimum=1, maximum=4, latency_signal=False)
+
+    async def run():
+        # One request in flight out of 2: no evidence the cap is too low
+        await limit.acquire()
+        limit.release(time.monotonic())
+        assert limit.limit == 2
+        # Both slots used: each success adds 1/limit
+        await limit.acquire()
+        await limit.acquire()
+        limit.release(time.monotonic())
+        assert limit.limit == pytest.approx(2.5)
+
+    asyncio.run(run())
+
+
+def test_adaptive_limit_cuts_once_per_round():
+    limit = AdaptiveLimit('test', initial=8, minimum=2, maximum=16, latency_signal=False)
+
+    async def run():
+        started = time.monotonic()
+        for _ in range(3):
+            await limit.acquire()
+        # Three overloaded requests from the same round: one cut, not three
+        for _ in range(3):
+            limit.release(started, overloaded=True)
+        assert limit.limit == 8 * Config.AIMD_BACKOFF
+        # Later rounds keep halving down to the floor
+        for _ in range(4):
+            await limit.acquire()
+            limit.release(time.monotonic(), overloaded=True)
+        assert limit.limit == 2
+
+    asyncio.run(run())
+
+
+def test_adaptive_limit_queues_fifo():
+    limit = AdaptiveLimit('test', initial=1, minimum=1, maximum=1, latency_signal=False)
+    order = []
+
+    async def run():
+        await limit.acquire()
+
+        async def wait(name):
+            await limit.acquire()
+            order.append(name)
+            limit.release(None)
+
+        waiters = [asyncio.ensure_future(wait(name)) for name in 'abc']
+        await asyncio.sleep(0)
+        assert limit.in_flight == 1 and len(limit.waiters) == 3
+        limit.release(None)
+        await asyncio.gather(*waiters)
+
+    asyncio.run(run())
+    assert order == ['a', 'b', 'c']
+    assert limit.in_flight == 0
+
+
+@pytest.fixture
+def fast_breaker(monkeypatch):
+    monkeypatch.setattr(Config, 'BREAKER_CONSECUTIVE', 3)
+    monkeypatch.setattr(Config, 'BREAKER_COOLDOWN', 0.05)
+
+
+def test_breaker_opens_probes_and_closes(fast_breaker):
+    breaker = CircuitBreaker('test')
+    for _ in range(2):
+        breaker.record(False)
+    assert breaker.state == 'closed'
+    breaker.record(False)
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    # Cooldown over: exactly one probe
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_reopens(fast_breaker):
+    breaker = CircuitBreaker('test')
+    for _ in range(3):
+        breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+
+def test_breaker_opens_on_failure_rate(monkeypatch):
+    monkeypatch.setattr(Config, 'BREAKER_CONSECUTIVE', 100)
+    breaker = CircuitBreaker('test')
+    # Alternating outcomes never reach the consecutive limit, but half the window failed
+    for idx in range(Config.BREAKER_MIN_CALLS):
+        breaker.record(idx % 2 == 0)
+    assert breaker.state == 'open'
+
+
+class Client:
+    """Minimal retry_on_failure user: a cache in front of one rate-limited provider"""
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self.stats = limiter.stats
+        self.cache = {'cached': 'from cache'}
+        self.failing = True
+        self.requests = 0
+
+    @retry_on_failure(max_attempts=1, api='yelp', fallback=lambda: 'fallback')
+    async def get(self, key: str) -> str:
+        if key in self.cache:
+            return self.cache[key]
+        async with self.limiter.slot('yelp'):
+            self.requests += 1
+            if self.failing:
+                raise RetryableError('HTTP 503', status=503)
+            return 'fresh'
+
+
+def test_only_real_requests_move_the_breaker(fast_breaker):
+    async def run():
+        limiter = RateLimiter({'yelp': (1000.0, 1000)}, StatsTracker())
+        client = Client(limiter)
+        breaker = limiter.breakers['yelp']
+        for _ in range(3):
+            assert await client.get('miss') == 'fallback'
+        assert breaker.state == 'open'
+
+        # Open: cached data is still served, requests short-circuit without reaching the provider
+        assert await client.get('cached') == 'from cache'
+        assert await client.get('miss') == 'fallback'
+        assert client.requests == 3
+        assert limiter.stats.short_circuits['yelp'] == 1
+
+        # After the cooldown a cache hit is not taken as the probe
+        await asyncio.sleep(0.06)
+        assert await client.get('cached') == 'from cache'
+        assert breaker.state == 'open'
+        client.failing = False
+        assert await client.get('miss') == 'fresh'
+        assert breaker.state == 'closed'
+
+        # Cache hits neither reset the failure count nor fill the window
+        recent = len(breaker.recent)
+        for _ in range(10):
+            await client.get('cached')
+        assert len(breaker.recent) == recent
+
+    asyncio.run(run())
+
+
+def test_breakers_are_per_limiter(fast_breaker):
+    async def run():
+        first = RateLimiter({'yelp': (1000.0, 1000)}, StatsTracker())
+        second = RateLimiter({'yelp': (1000.0, 1000)}, StatsTracker())
+        for _ in range(3):
+            await Client(first).get('miss')
+        assert first.breakers['yelp'].state == 'open'
+        assert second.breakers['yelp'].state == 'closed'
+        with pytest.raises(CircuitOpenError):
+            async with first.slot('yelp'):
+                pass
+
+    asyncio.run(run())
+
+
+def test_cancelled_request_frees_its_slot_silently():
+    async def run():
+        stats = StatsTracker()
+        limiter = RateLimiter({'openai': (1000.0, 1000)}, stats)
+
+        async def request():
+            async with limiter.slot('openai'):
+                await asyncio.sleep(10)
+
+        tasks = [asyncio.ensure_future(request()) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return limiter.limits['openai'], stats
+
+    limit, stats = asyncio.run(run())
+    assert limit.in_flight == 0
+    assert limit.limit == Config.CONCURRENCY['openai'][0]
+    assert 'openai' not in stats.requests
@@ -0,0 +1,78 @@
+"""StructuredOutput parsing, coercion, repair and escalation"""
+import asyncio
+import json
+
+from main import Config, DiskCache, LLMCache, StatsTracker, StructuredOutput
+
+SCHEMA = {'intent': str, 'score': float, 'points': list}
+
+
+def test_extracts_json_from_fences_and_prose():
+    assert StructuredOutput.extract('```json\n{"a": 1}\n```') == {'a': 1}
+    assert StructuredOutput.extract('Sure! Here it is: {"a": [1, 2]} Hope that helps.') == {'a': [1, 2]}
+    assert StructuredOutput.extract('no json here') is None
+
+
+def test_check_coerces_near_misses():
+    result, problems = StructuredOutput.check('{"intent": ["HIGH", "urgent"], "score": "70%", "points": "slow site"}', SCHEMA)
+    assert problems == []
+    assert result == {'intent': 'HIGH; urgent', 'score': 70, 'points': ['slow site']}
+
+
+def test_check_reports_problems():
+    result, problems = StructuredOutput.check('{"intent": "LOW", "score": "n/a"}', SCHEMA)
+    assert result is None
+    assert problems == ['"score" must be a number', '"points" is missing']
+
+
+class Model:
+    """post() stand-in answering from a queue and recording (model, prompt) per request"""
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    async def __call__(self, model, system, user, params):
+        self.calls.append((model, user))
+        return self.answers.pop(0)
+
+
+def complete(post, cache=None, models=('standard-model', 'hot-model')):
+    stats = StatsTracker()
+    result = asyncio.run(StructuredOutput.complete(
+        cache or LLMCache(None, 0), stats, 'anthropic', list(models), '', 'profile this', {}, SCHEMA, post
+    ))
+    return result, stats
+
+
+def test_valid_output_needs_one_request():
+    post = Model('{"intent": "HIGH", "score": 9, "points": ["a"]}')
+    result, _ = complete(post)
+    assert result == {'intent': 'HIGH', 'score': 9, 'points': ['a']}
+    assert len(post.calls) == 1
+
+
+def test_invalid_output_is_repaired_not_regenerated(tmp_path):
+    broken = 'Intent: HIGH. Score 9. Points: slow site'
+    post = Model(broken, '{"intent": "HIGH", "score": 9, "points": ["slow site"]}')
+    disk = DiskCache(str(tmp_path / 'cache.sqlite'), 1000, StatsTracker())
+    cache = LLMCache(disk, 60)
+    try:
+        result, stats = complete(post, cache)
+        assert result == {'intent': 'HIGH', 'score': 9, 'points': ['slow site']}
+        # The repair goes to the provider's standard model and carries the broken text
+        repair_model, repair_prompt = post.calls[1]
+        assert repair_model == Config.MODEL_TIERS['anthropic']['standard']
+        assert broken in repair_prompt and 'no JSON object found' in repair_prompt
+        assert stats.models[repair_model]['repaired'] == 1
+        # Only the repaired object is cached, under the original prompt
+        assert json.loads(cache.get('anthropic', 'standard-model', '', 'profile this', {})) == result
+    finally:
+        disk.close()
+
+
+def test_failed_repair_escalates_to_next_model():
+    post = Model('garbage', 'still garbage', '{"intent": "LOW", "score": 2, "points": ["x"]}')
+    result, stats = complete(post)
+    assert result == {'intent': 'LOW', 'score': 2, 'points': ['x']}
+    assert [model for model, _ in post.calls][-1] == 'hot-model'
+    assert stats.models['standard-model']['escalations'] == 1